@@ -0,0 +1,26 @@
+-- Migração: tabela level_scores (ver "documentation/Estrutura de Dados.md").
+-- Scores pré-calculados após cada ingestão para cada (nível de surf, spot, hora), usando as
+-- preferências de level_spot_preferences. Servem os usuários sem preferências próprias.
+--
+-- Executar uma vez no banco (idempotente):
+--     psql "$DATABASE_URL" -f "documentation/migrations/001_create_level_scores.sql"
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS level_scores (
+    surf_level VARCHAR(50) NOT NULL,
+    spot_id INTEGER NOT NULL,
+    timestamp_utc TIMESTAMP WITH TIME ZONE NOT NULL,
+    suitability_score DOUBLE PRECISION NOT NULL,
+    wave_score DOUBLE PRECISION NOT NULL,
+    wind_score DOUBLE PRECISION NOT NULL,
+    tide_score DOUBLE PRECISION NOT NULL,
+    water_temperature_score DOUBLE PRECISION NOT NULL,
+    air_temperature_score DOUBLE PRECISION NOT NULL,
+    current_score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    CONSTRAINT fk_spot_level_scores FOREIGN KEY (spot_id) REFERENCES spots(spot_id),
+    CONSTRAINT pk_level_scores PRIMARY KEY (surf_level, spot_id, timestamp_utc)
+);
+
+COMMIT;
@@ -3,6 +3,10 @@ def create_app():
     from fastapi import FastAPI
     from fastapi.middleware.cors import CORSMiddleware
     from src.db.connection import init_async_db_pool
+    from src.db.notifications import (
+        start_cache_invalidation_listener, stop_cache_invalidation_listener, ingestion_complete_callbacks
+    )
+    from src.utils.config import PRESET_PREWARM_ENABLED
 
     app = FastAPI()
     app.add_middleware(
@@ -21,6 +25,7 @@ def create_app():
     from .routes.preset_routes import router as preset_router
     from .routes.level_spot_preferences_routes import router as level_spot_preferences_router # NOVO
     from .routes.user_spot_preferences_routes import router as user_spot_preferences_router # NOVO
+    from .routes.metrics_routes import router as metrics_router
 
     app.include_router(recommendation_router)
     app.include_router(forecast_router)
@@ -29,9 +34,24 @@ def create_app():
     app.include_router(preset_router)
     app.include_router(level_spot_preferences_router) # NOVO
     app.include_router(user_spot_preferences_router) # NOVO
+    app.include_router(metrics_router)
+
+    from .prewarm import schedule_default_preset_prewarm, stop_default_preset_prewarm
 
     @app.on_event("startup")
     async def startup_event():
         await init_async_db_pool()
+        await start_cache_invalidation_listener()
+        if PRESET_PREWARM_ENABLED:
+            # Pré-aquece os presets padrão agora e após cada ingestão completa, em segundo plano.
+            ingestion_complete_callbacks.append(schedule_default_preset_prewarm)
+            schedule_default_preset_prewarm()
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await stop_cache_invalidation_listener()
+        if schedule_default_preset_prewarm in ingestion_complete_callbacks:
+            ingestion_complete_callbacks.remove(schedule_default_preset_prewarm)
+        await stop_default_preset_prewarm()
 
     return app
\ No newline at end of file
@@ -0,0 +1,72 @@
+import asyncio
+from src.db.queries import get_active_default_presets
+from src.db.cache import preset_result_cache
+from src.api.routes.preset_routes import run_preset_logic
+from src.utils.config import PRESET_PREWARM_CONCURRENCY
+from src.utils.utils import gather_with_concurrency
+
+# Pré-aquecimento do cache de presets (preset_result_cache) deste worker.
+# Depois de uma ingestão completa, todos os usuários abrem o app de uma vez e cada um roda
+# o seu preset padrão: calculá-los antes faz a primeira requisição do dia ser um acerto de cache.
+
+_prewarm_task = None
+_prewarm_pending = False
+
+async def prewarm_default_presets(concurrency=PRESET_PREWARM_CONCURRENCY):
+    """
+    Executa os presets padrão ativos de todos os usuários, no máximo `concurrency` ao mesmo
+    tempo, guardando os resultados em preset_result_cache. Retorna quantos foram calculados.
+
+    Só cabem preset_result_cache.max_entries resultados: além disso, cada preset calculado
+    expulsaria outro já pré-aquecido, então os excedentes ficam para a primeira requisição.
+    """
+    presets = await get_active_default_presets()
+    if len(presets) > preset_result_cache.max_entries:
+        print(
+            f"{len(presets)} presets padrão ativos e PRESET_CACHE_MAX_ENTRIES = {preset_result_cache.max_entries}: "
+            f"só os {preset_result_cache.max_entries} primeiros serão pré-aquecidos."
+        )
+        presets = presets[:preset_result_cache.max_entries]
+
+    async def prewarm(preset):
+        try:
+            _, status_code = await run_preset_logic(preset['user_id'], preset)
+            return status_code == 200
+        except Exception as e:
+            print(f"Erro ao pré-aquecer o preset {preset['preset_id']}: {e}")
+            return False
+
+    results = await gather_with_concurrency(concurrency, *(prewarm(preset) for preset in presets))
+    print(f"{sum(results)}/{len(presets)} presets padrão pré-aquecidos.")
+    return sum(results)
+
+async def _run_prewarm():
+    global _prewarm_task, _prewarm_pending
+    try:
+        # Uma ingestão que termina durante o pré-aquecimento invalida o que já foi calculado:
+        # roda de novo, uma única vez, ao final.
+        while True:
+            _prewarm_pending = False
+            try:
+                await prewarm_default_presets()
+            except Exception as e:
+                print(f"Erro no pré-aquecimento dos presets padrão: {e}")
+            if not _prewarm_pending:
+                break
+    finally:
+        if _prewarm_task is asyncio.current_task():
+            _prewarm_task = None
+
+def schedule_default_preset_prewarm():
+    """Agenda o pré-aquecimento em segundo plano; pedidos durante uma execução são agrupados."""
+    global _prewarm_task, _prewarm_pending
+    if _prewarm_task is not None:
+        _prewarm_pending = True
+        return
+    _prewarm_task = asyncio.get_running_loop().create_task(_run_prewarm())
+
+async def stop_default_preset_prewarm():
+    global _prewarm_task
+    if _prewarm_task is not None:
+        task, _prewarm_task = _prewarm_task, None
+        task.cancel()
@@ -0,0 +1,27 @@
+import decimal
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+def _orjson_default(obj):
+    # Colunas NUMERIC do Postgres chegam como Decimal.
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    # OPT_SERIALIZE_NUMPY só cobre arrays contíguos de tipos nativos (não fatias com passo, por exemplo).
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada de uma só vez com orjson.
+    Aceita Decimal, datetime e arrays/escalares NumPy sem conversão prévia.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def ndjson_line(record) -> bytes:
+    """Serializa um registro como uma linha NDJSON (application/x-ndjson)."""
+    return orjson.dumps(record, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
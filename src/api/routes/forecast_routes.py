@@ -1,9 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+import contextlib
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import datetime
-from src.db.queries import get_spot_by_id, get_forecasts_from_db, get_tides_forecast_from_db
-from src.utils.utils import determine_tide_phase
+from src.api.responses import FastJSONResponse, ndjson_line
+from src.db.records import ForecastHour
+from src.db.queries import (
+    get_spots_by_ids,
+    get_forecasts_for_spots_from_db,
+    get_tides_forecast_for_spots_from_db,
+    stream_forecast_rows_for_days
+)
+from src.db.cache import tide_cache
+from src.utils.tide_index import TideIndex
+from src.utils.tide_model import get_tide_model, time_grid
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 router = APIRouter(prefix="/forecasts", tags=["forecasts"])
 
@@ -11,49 +24,195 @@ class ForecastRequest(BaseModel):
     spot_ids: list[int]
     day_offset: list[int]
 
+class TideCurveRequest(BaseModel):
+    spot_ids: list[int]
+    day_offset: list[int]
+    step_minutes: int = 15
+
+def forecast_entry_with_spot(spot, tide_phase, forecast_entry):
+    return {
+        "spot_id": spot['spot_id'],
+        "spot_name": spot['spot_name'],
+        "latitude": spot['latitude'],
+        "longitude": spot['longitude'],
+        "timezone": spot['timezone'],
+        "tide_phase": tide_phase,
+        **forecast_entry.as_dict()
+    }
+
+async def load_stream_context(spot_ids, base_dates):
+    """
+    Spots e extremos de maré usados por stream_forecasts_ndjson. Buscados antes de criar o
+    StreamingResponse, para que uma falha aqui vire um erro HTTP normal e não um stream
+    interrompido depois do status 200. Só os extremos de maré ficam em memória: são poucos por spot-dia.
+    """
+    if not base_dates:
+        return await get_spots_by_ids(spot_ids), {}
+    window_start = datetime.datetime.combine(min(base_dates), datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+    window_end = datetime.datetime.combine(max(base_dates), datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+    spots_by_id, tides_by_spot = await asyncio.gather(
+        get_spots_by_ids(spot_ids),
+        get_tides_forecast_for_spots_from_db(spot_ids, window_start, window_end)
+    )
+    return spots_by_id, tides_by_spot
+
+async def stream_forecasts_ndjson(spot_ids, base_dates, spots_by_id, tides_by_spot):
+    """
+    Gera as mesmas entradas de /forecasts, uma por linha NDJSON, à medida que as linhas
+    chegam do cursor do banco. Os erros vêm ao final, como registros {"error": "..."}.
+    `spots_by_id` e `tides_by_spot` vêm de load_stream_context.
+    """
+    error_messages = []
+    if base_dates:
+        day_ranges = [
+            (
+                datetime.datetime.combine(base_date, datetime.time.min).replace(tzinfo=datetime.timezone.utc),
+                datetime.datetime.combine(base_date, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+            )
+            for base_date in base_dates
+        ]
+        found = set()
+        # As linhas chegam agrupadas por spot-dia: um TideIndex por grupo.
+        tide_index_key, tide_index = None, None
+        try:
+            async with contextlib.aclosing(stream_forecast_rows_for_days(spot_ids, day_ranges)) as rows:
+                async for row in rows:
+                    forecast_entry = ForecastHour.from_record(row)
+                    day_index = row['day_index']
+                    spot_index = row['spot_index']
+                    found.add((day_index, spot_index))
+                    spot = spots_by_id.get(row['spot_id'])
+                    if not spot:
+                        continue
+                    if tide_index_key != (day_index, spot_index):
+                        tide_index_key = (day_index, spot_index)
+                        tide_index = TideIndex(tides_by_spot.get(spot['spot_id'], {}).get(base_dates[day_index], []))
+                    tide_phase = tide_index.phase(forecast_entry.timestamp_utc)
+                    yield ndjson_line(forecast_entry_with_spot(spot, tide_phase, forecast_entry))
+        except Exception as e:
+            yield ndjson_line({"error": f"Erro ao buscar previsões: {e}"})
+            return
+
+        for day_index, base_date in enumerate(base_dates):
+            for spot_index, spot_id in enumerate(spot_ids):
+                if spot_id not in spots_by_id:
+                    error_messages.append(f"Spot com ID {spot_id} não encontrado.")
+                elif (day_index, spot_index) not in found:
+                    error_messages.append(f"Previsões não encontradas para o spot {spot_id} na data {base_date.isoformat()}.")
+    for error_message in error_messages:
+        yield ndjson_line({"error": error_message})
+
 @router.post("")
-async def get_combined_forecasts_endpoint(request: ForecastRequest):
+async def get_combined_forecasts_endpoint(request: ForecastRequest, http_request: Request):
+    """
+    Retorna as previsões dos spots/dias pedidos. Com `Accept: application/x-ndjson`, as
+    entradas são enviadas em streaming, uma por linha, com os erros ao final.
+    """
     data = request.dict()
     spot_ids = data["spot_ids"]
     day_offsets = data["day_offset"]
 
+    if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        base_dates = [today + datetime.timedelta(days=day_offset) for day_offset in day_offsets]
+        spots_by_id, tides_by_spot = await load_stream_context(spot_ids, base_dates)
+        return StreamingResponse(
+            stream_forecasts_ndjson(spot_ids, base_dates, spots_by_id, tides_by_spot), media_type=NDJSON_MEDIA_TYPE
+        )
+
     flat_forecast_entries = []
     has_errors = False
     error_messages = []
 
-    for day_offset in day_offsets:
-        base_date = datetime.datetime.now(datetime.timezone.utc).date() + datetime.timedelta(days=day_offset)
-        start_utc = datetime.datetime.combine(base_date, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
-        end_utc = datetime.datetime.combine(base_date, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+    # Busca spots, previsões e marés de todos os spots e dias em uma janela única.
+    # As três consultas são independentes e rodam em paralelo.
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    base_dates = [today + datetime.timedelta(days=day_offset) for day_offset in day_offsets]
+    window_dates = base_dates or [today]
+    window_start = datetime.datetime.combine(min(window_dates), datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+    window_end = datetime.datetime.combine(max(window_dates), datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+    spots_by_id, forecasts_by_spot, tides_by_spot = await asyncio.gather(
+        get_spots_by_ids(spot_ids),
+        get_forecasts_for_spots_from_db(spot_ids, window_start, window_end),
+        get_tides_forecast_for_spots_from_db(spot_ids, window_start, window_end)
+    )
 
+    for base_date in base_dates:
         for spot_id in spot_ids:
-            spot = await get_spot_by_id(spot_id)
+            spot = spots_by_id.get(spot_id)
             if not spot:
                 error_messages.append(f"Spot com ID {spot_id} não encontrado.")
                 has_errors = True
                 continue
 
-            forecasts = await get_forecasts_from_db(spot_id, start_utc, end_utc)
-            tides_extremes = await get_tides_forecast_from_db(spot_id, start_utc, end_utc)
-
+            forecasts = forecasts_by_spot.get(spot_id, {}).get(base_date, [])
+            tides_extremes = tides_by_spot.get(spot_id, {}).get(base_date, [])
 
             if not forecasts:
                 error_messages.append(f"Previsões não encontradas para o spot {spot_id} na data {base_date.isoformat()}.")
                 has_errors = True
             else:
-                for forecast_entry in forecasts:
-                    tide_phase = determine_tide_phase(forecast_entry['timestamp_utc'], tides_extremes)
-                    entry_with_spot_and_tide = {
-                        "spot_id": spot_id,
-                        "spot_name": spot['spot_name'],
-                        "latitude": spot['latitude'],
-                        "longitude": spot['longitude'],
-                        "timezone": spot['timezone'],
-                        "tide_phase": tide_phase,
-                        **forecast_entry
-                    }
-                    flat_forecast_entries.append(entry_with_spot_and_tide)
+                tide_phases = TideIndex(tides_extremes).phases([forecast_entry.timestamp_utc for forecast_entry in forecasts])
+                for forecast_entry, tide_phase in zip(forecasts, tide_phases.tolist()):
+                    flat_forecast_entries.append(forecast_entry_with_spot(spot, tide_phase, forecast_entry))
 
     if has_errors:
-        return JSONResponse(status_code=207, content={"message": "Alguns dados não puderam ser recuperados.", "errors": error_messages, "data": flat_forecast_entries})
-    return flat_forecast_entries
\ No newline at end of file
+        return FastJSONResponse(status_code=207, content={"message": "Alguns dados não puderam ser recuperados.", "errors": error_messages, "data": flat_forecast_entries})
+    return flat_forecast_entries
+
+@router.post("/tides")
+async def get_tide_curves_endpoint(request: TideCurveRequest):
+    """
+    Altura e fase da maré de cada spot/dia pedido em uma grade de `step_minutes` minutos
+    (padrão 15), interpoladas entre os extremos de tides_forecast (src/utils/tide_model.py).
+    A altura é null onde não há dois extremos consecutivos para interpolar.
+    """
+    data = request.dict()
+    spot_ids = data["spot_ids"]
+    day_offsets = data["day_offset"]
+    step_minutes = data["step_minutes"]
+    if not 1 <= step_minutes <= 60:
+        raise HTTPException(status_code=400, detail="step_minutes deve estar entre 1 e 60.")
+    step = datetime.timedelta(minutes=step_minutes)
+
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    base_dates = [today + datetime.timedelta(days=day_offset) for day_offset in day_offsets]
+    window_dates = base_dates or [today]
+    # Um dia a mais de cada lado: o modelo usa os extremos vizinhos para cobrir o dia inteiro.
+    window_start = datetime.datetime.combine(min(window_dates) - datetime.timedelta(days=1), datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+    window_end = datetime.datetime.combine(max(window_dates) + datetime.timedelta(days=1), datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+    tide_generation = tide_cache.generation
+    spots_by_id, tides_by_spot = await asyncio.gather(
+        get_spots_by_ids(spot_ids),
+        get_tides_forecast_for_spots_from_db(spot_ids, window_start, window_end)
+    )
+
+    curves = []
+    error_messages = []
+    for base_date in base_dates:
+        day_start = datetime.datetime.combine(base_date, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+        timestamps = time_grid(day_start, day_start + datetime.timedelta(days=1) - step, step)
+        for spot_id in spot_ids:
+            spot = spots_by_id.get(spot_id)
+            if not spot:
+                error_messages.append(f"Spot com ID {spot_id} não encontrado.")
+                continue
+            tides_by_day = tides_by_spot.get(spot_id, {})
+            if not tides_by_day.get(base_date):
+                error_messages.append(f"Extremos de maré não encontrados para o spot {spot_id} na data {base_date.isoformat()}.")
+                continue
+            heights, phases = get_tide_model(spot_id, base_date, tides_by_day, tide_generation).evaluate(timestamps)
+            curves.append({
+                "spot_id": spot_id,
+                "spot_name": spot['spot_name'],
+                "date": base_date.isoformat(),
+                "step_minutes": step_minutes,
+                "points": [
+                    {"timestamp_utc": timestamp, "tide_height": height, "tide_phase": phase}
+                    for timestamp, height, phase in zip(timestamps, heights.tolist(), phases.tolist())
+                ]
+            })
+
+    if error_messages:
+        return FastJSONResponse(status_code=207, content={"message": "Alguns dados não puderam ser recuperados.", "errors": error_messages, "data": curves})
+    return FastJSONResponse(content=curves)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from src.db.connection import get_pool_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/db")
+async def get_db_metrics_endpoint():
+    """
+    Métricas do pool de conexões deste worker: tamanho do pool, espera para obter uma
+    conexão, conexões em uso/em espera (atuais e pico) e latência por função de consulta.
+    Cada worker tem o seu pool, então os valores são por processo.
+    """
+    return get_pool_metrics()
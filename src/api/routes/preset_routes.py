@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import datetime
+from zoneinfo import ZoneInfo
 from src.db.queries import (
     create_user_recommendation_preset,
     get_user_recommendation_presets,
@@ -9,8 +10,14 @@ from src.db.queries import (
     update_user_recommendation_preset,
     delete_user_recommendation_preset,
     get_user_by_id,
-    get_default_user_recommendation_preset
+    get_default_user_recommendation_preset,
+    get_spots_by_ids
 )
+from src.db.cache import preset_result_cache, data_version
+from src.api.routes.recommendation_routes import generate_recommendations_logic
+from src.api.responses import FastJSONResponse
+from src.utils.config import FORECAST_DAYS
+from src.utils.utils import preset_weekday, spot_timezone
 
 router = APIRouter(prefix="/presets", tags=["presets"])
 
@@ -99,6 +106,117 @@ async def get_presets_endpoint(user_id: str = Query(...)):
         return jsonify({"error": f"Falha ao buscar presets: {e}"}), 500
 
 
+def preset_day_offsets(weekdays, today, forecast_days=FORECAST_DAYS):
+    """
+    Day offsets (0 = hoje até forecast_days) cujos dias da semana estão em `weekdays`
+    (0 = Domingo ... 6 = Sábado). Sem weekdays, todos os dias do horizonte de previsão.
+    """
+    offsets = list(range(forecast_days + 1))
+    if not weekdays:
+        return offsets
+    weekdays = set(weekdays)
+    return [offset for offset in offsets if preset_weekday(today + datetime.timedelta(days=offset)) in weekdays]
+
+def spot_local_dates(spots, now_utc=None):
+    """
+    {fuso: data local de hoje} dos fusos de `spots`. Fusos inválidos ficam de fora: esses
+    spots já saem com erro em generate_recommendations_logic. `now_utc` é o instante de
+    referência (padrão: agora), como em spot_local_window.
+    """
+    now_utc = now_utc or datetime.datetime.now(datetime.timezone.utc)
+    local_dates = {}
+    for spot in spots:
+        timezone = spot_timezone(spot)
+        try:
+            local_dates[timezone] = now_utc.astimezone(ZoneInfo(timezone)).date()
+        except Exception:
+            continue
+    return local_dates
+
+def local_dates_current(local_dates):
+    """True se a data local de hoje de cada fuso ainda é a de `local_dates`."""
+    return all(datetime.datetime.now(ZoneInfo(timezone)).date() == date for timezone, date in local_dates.items())
+
+async def run_preset_logic(user_id, preset):
+    """
+    Executa um preset: calcula as recomendações de todos os spots e dias em uma única chamada
+    de generate_recommendations_logic. Os `weekdays` são verificados na data local de cada
+    spot, a mesma usada nas janelas de horário.
+
+    O resultado fica em cache por (usuário, preset, updated_at, data_version()), junto com a
+    data local de hoje dos fusos dos spots: alterar o preset ou qualquer invalidação de
+    previsões/preferências gera uma nova chave, e a virada do dia em algum desses fusos
+    descarta o resultado. Retorna (resultado, status_code).
+    """
+    # Versão lida antes do cálculo: se os dados mudarem no meio, o resultado fica sob a chave antiga.
+    cache_key = (str(user_id), preset['preset_id'], preset.get('updated_at'), data_version())
+    cached = preset_result_cache.get(cache_key)
+    if cached is not None and local_dates_current(cached[0]):
+        return cached[1], 200
+
+    spots_by_id = await get_spots_by_ids(preset['spot_ids'])
+    local_dates = spot_local_dates(spots_by_id.values())
+    weekdays = preset.get('weekdays')
+    recommendations, status_code = await generate_recommendations_logic(
+        user_id, preset['spot_ids'], list(range(FORECAST_DAYS + 1)),
+        preset['start_time'].strftime('%H:%M'), preset['end_time'].strftime('%H:%M'),
+        weekdays=weekdays
+    )
+    if status_code != 200:
+        return recommendations, status_code
+    result = {
+        "preset_id": preset['preset_id'],
+        "preset_name": preset['preset_name'],
+        # Offsets de todos os spots; com fusos em datas diferentes, cada spot traz os seus em "recommendations".
+        "day_offsets": sorted({
+            offset for today in set(local_dates.values()) for offset in preset_day_offsets(weekdays, today)
+        }),
+        "recommendations": recommendations
+    }
+    preset_result_cache.set(cache_key, (local_dates, result))
+    return result, 200
+
+# As rotas /default, /default/run e /{preset_id}/run vêm antes de /{preset_id}: o FastAPI
+# usa a primeira rota que casa com o caminho.
+
+# GET default preset
+@router.get("/default")
+async def get_default_preset_endpoint(user_id: str = Query(...)):
+    user = await get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail=f"Usuário com ID {user_id} não encontrado.")
+    try:
+        preset = await get_default_user_recommendation_preset(user_id)
+        if not preset:
+            return {"message": "Nenhum preset padrão encontrado para este usuário."}
+        if isinstance(preset.get('start_time'), datetime.time):
+            preset['start_time'] = preset['start_time'].strftime('%H:%M:%S')
+        if isinstance(preset.get('end_time'), datetime.time):
+            preset['end_time'] = preset['end_time'].strftime('%H:%M:%S')
+        return preset
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Falha ao buscar preset padrão: {e}")
+
+@router.get("/default/run")
+async def run_default_preset_endpoint(user_id: str = Query(...)):
+    preset = await get_default_user_recommendation_preset(user_id)
+    if not preset:
+        raise HTTPException(status_code=404, detail=f"Nenhum preset padrão encontrado para o usuário {user_id}.")
+    result, status_code = await run_preset_logic(user_id, preset)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=result)
+    return FastJSONResponse(result)
+
+@router.get("/{preset_id}/run")
+async def run_preset_endpoint(preset_id: int, user_id: str = Query(...)):
+    preset = await get_user_recommendation_preset_by_id(preset_id, user_id)
+    if not preset:
+        raise HTTPException(status_code=404, detail=f"Preset com ID {preset_id} não encontrado para o usuário {user_id}.")
+    result, status_code = await run_preset_logic(user_id, preset)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=result)
+    return FastJSONResponse(result)
+
 # GET preset by id
 @router.get("/{preset_id}")
 async def get_preset_by_id_endpoint(preset_id: int, user_id: str = Query(...)):
@@ -197,21 +315,3 @@ async def delete_preset_endpoint(preset_id: int, user_id: str = Query(...)):
             raise HTTPException(status_code=404, detail="Preset não encontrado ou não autorizado para desativação.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Falha ao desativar preset: {e}")
-
-# GET default preset
-@router.get("/default")
-async def get_default_preset_endpoint(user_id: str = Query(...)):
-    user = await get_user_by_id(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail=f"Usuário com ID {user_id} não encontrado.")
-    try:
-        preset = await get_default_user_recommendation_preset(user_id)
-        if not preset:
-            return {"message": "Nenhum preset padrão encontrado para este usuário."}
-        if isinstance(preset.get('start_time'), datetime.time):
-            preset['start_time'] = preset['start_time'].strftime('%H:%M:%S')
-        if isinstance(preset.get('end_time'), datetime.time):
-            preset['end_time'] = preset['end_time'].strftime('%H:%M:%S')
-        return preset
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Falha ao buscar preset padrão: {e}")
\ No newline at end of file
@@ -1,19 +1,29 @@
 
+import asyncio
 import numpy as np
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import datetime
 from src.db.queries import (
-    get_spot_by_id,
+    get_all_spots,
+    get_spots_by_ids,
     get_user_by_id,
-    get_spot_preferences,
-    get_forecasts_from_db,
-    get_tides_forecast_from_db,
-    get_level_spot_preferences
+    get_effective_spot_preferences,
+    get_forecast_windows_from_db,
+    get_tides_forecast_for_spots_from_db,
+    get_level_score_windows_from_db
 )
-from src.recommendation.recommendation_logic import calculate_suitability_score
-from src.utils.utils import convert_to_localtime_string, determine_tide_phase
+from src.recommendation.recommendation_logic import (
+    build_forecast_matrix,
+    calculate_suitability_scores_batch,
+    DETAILED_SCORE_KEYS
+)
+from src.recommendation.ranking import top_n_indices, merge_consecutive_slots
+from src.utils.config import FORECAST_DAYS
+from src.api.responses import FastJSONResponse
+from src.utils.utils import convert_to_localtime_string, spot_local_window, preset_weekday
+from src.utils.tide_index import TideIndex
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
@@ -35,7 +45,27 @@ class RecommendationRequest(BaseModel):
     start_time: str
     end_time: str
 
-async def generate_recommendations_logic(user_id, spot_ids_list, day_offsets, start_time_str, end_time_str):
+class TopRecommendationRequest(BaseModel):
+    user_id: str
+    spot_ids: list[int] | None = None # None: todos os spots
+    day_offset: list[int] | None = None # None: de hoje até FORECAST_DAYS
+    start_time: str = "00:00"
+    end_time: str = "23:59"
+    top_n: int = 10
+    min_score: float | None = None
+    merge_sessions: bool = False # Junta horas consecutivas do mesmo spot em sessões
+
+async def score_recommendation_candidates(user_id, spot_ids_list, day_offsets, start_time_str, end_time_str, weekdays=None):
+    """
+    Busca os dados e calcula os scores de todos os spots × horas pedidos.
+    Com `weekdays` (0 = Domingo ... 6 = Sábado), cada spot fica só com os day offsets cuja
+    data local do spot cai em um desses dias da semana.
+    Retorna ((all_spot_recommendations, scoring_rows), 200) ou (erro, status_code).
+    Em all_spot_recommendations cada spot/dia já tem seus erros e os dicts "day_offset_data"
+    (com "recommendations" vazio); cada linha de scoring_rows traz o spot, as previsões e
+    fases de maré de todos os dias concatenadas, "days" e os scores ("final_scores" e
+    "detailed_scores", listas alinhadas com "forecasts").
+    """
     user = await get_user_by_id(user_id)
     if not user:
         return {"error": f"Usuário com ID {user_id} não encontrado."}, 404
@@ -54,9 +84,23 @@ async def generate_recommendations_logic(user_id, spot_ids_list, day_offsets, st
     except ValueError as e:
         return {"error": f"Formato de hora inválido. Use HH:MM ou HH:MM:SS: {e}"}, 400
 
+    start_time = datetime.time(start_hour, start_minute)
+    end_time = datetime.time(end_hour, end_minute)
+
+    # Spots e preferências efetivas primeiro: as janelas dependem do fuso de cada spot.
+    spots_by_id, preferences_by_spot = await asyncio.gather(
+        get_spots_by_ids(spot_ids_list),
+        get_effective_spot_preferences(user_id, spot_ids_list, surf_level)
+    )
+
     all_spot_recommendations = []
+    # Linhas da matriz de scoring: uma por spot, com as horas de todos os dias concatenadas.
+    scoring_rows = []
+    # Janela (spot_id, início UTC, fim UTC) de cada spot/dia, com o day_offset_data correspondente.
+    windows = []
+    window_days = []
     for spot_id in spot_ids_list:
-        spot = await get_spot_by_id(spot_id)
+        spot = spots_by_id.get(spot_id)
         if not spot:
             all_spot_recommendations.append({
                 "spot_name": f"Spot ID {spot_id}",
@@ -65,88 +109,252 @@ async def generate_recommendations_logic(user_id, spot_ids_list, day_offsets, st
             })
             continue
 
+        preference_source, spot_preferences = preferences_by_spot.get(spot_id, (None, None))
         spot_recommendations_data = {
             "spot_name": spot['spot_name'],
             "spot_id": spot_id,
             "preferences_used_for_spot": {},
+            "preference_source": preference_source,
             "day_offsets": []
         }
+        all_spot_recommendations.append(spot_recommendations_data)
 
-        spot_preferences = await get_spot_preferences(user_id, spot_id, preference_type='user')
-        if not spot_preferences:
-            spot_preferences = await get_spot_preferences(user_id, spot_id, preference_type='model')
         if not spot_preferences:
-            spot_preferences = await get_level_spot_preferences(surf_level, spot_id)
-            if not spot_preferences:
-                spot_recommendations_data["error"] = f"Nenhuma preferência configurada para o spot {spot['spot_name']} para este usuário/nível."
-                all_spot_recommendations.append(spot_recommendations_data)
+            spot_recommendations_data["error"] = f"Nenhuma preferência configurada para o spot {spot['spot_name']} para este usuário/nível."
+            continue
+        spot_recommendations_data["preferences_used_for_spot"] = spot_preferences.as_dict()
+        scoring_row = {
+            "spot": spot,
+            "preference_source": preference_source,
+            "spot_preferences": spot_preferences,
+            "forecasts": [],
+            "tide_phases": [],
+            "days": [],  # (day_offset_data, quantidade de horas)
+            "windows": []  # (spot_id, start_utc, end_utc) de cada dia em "days"
+        }
+        # O horário pedido (HH:MM) é o horário local do spot, e "hoje" também é o dia local.
+        try:
+            spot_windows = [
+                (day_offset_single, spot_local_window(spot, day_offset_single, start_time, end_time))
+                for day_offset_single in day_offsets
+            ]
+        except Exception as e:
+            spot_recommendations_data["error"] = f"Fuso horário inválido para o spot {spot['spot_name']}: {e}"
+            continue
+        for day_offset_single, (local_date, start_utc, end_utc) in spot_windows:
+            if weekdays and preset_weekday(local_date) not in weekdays:
                 continue
-        spot_recommendations_data["preferences_used_for_spot"] = spot_preferences
-        for day_offset_single in day_offsets:
-            base_date_for_offset = datetime.datetime.utcnow().date() + datetime.timedelta(days=day_offset_single)
-            start_utc = datetime.datetime.combine(base_date_for_offset, datetime.time(start_hour, start_minute)).replace(tzinfo=datetime.timezone.utc)
-            end_utc = datetime.datetime.combine(base_date_for_offset, datetime.time(end_hour, end_minute, 59, 999999)).replace(tzinfo=datetime.timezone.utc)
-            day_start = datetime.datetime.combine(base_date_for_offset, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
-            day_end = datetime.datetime.combine(base_date_for_offset, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
-            forecasts = await get_forecasts_from_db(spot_id, day_start, day_end)
-            tides_extremes = await get_tides_forecast_from_db(spot_id, day_start, day_end)
             day_offset_data = {
                 "day_offset": day_offset_single,
                 "recommendations": []
             }
-            if not forecasts:
-                day_offset_data["error"] = f"Previsões não encontradas para o spot {spot['spot_name']} para o dia {day_offset_single}."
-                spot_recommendations_data["day_offsets"].append(day_offset_data)
-                continue
-            filtered_forecasts = [
-                f for f in forecasts
-                if start_utc <= f['timestamp_utc'] <= end_utc
-            ]
-            if not filtered_forecasts:
-                day_offset_data["error"] = f"Nenhuma previsão encontrada para o spot {spot['spot_name']} entre {start_time_str} e {end_time_str} para o dia {day_offset_single}."
-                spot_recommendations_data["day_offsets"].append(day_offset_data)
-                continue
+            spot_recommendations_data["day_offsets"].append(day_offset_data)
+            windows.append((spot_id, start_utc, end_utc))
+            window_days.append((scoring_row, day_offset_data))
+        scoring_rows.append(scoring_row)
+
+    # Só as horas das janelas são lidas do banco. Os extremos de maré são poucos por dia,
+    # então vêm dos dias UTC inteiros em cache, com um dia a mais de cada lado para que
+    # as horas antes do primeiro/depois do último extremo da janela tenham fase.
+    forecasts_by_window, tides_by_spot = [], {}
+    if windows:
+        window_spot_ids = list(dict.fromkeys(spot_id for spot_id, _, _ in windows))
+        forecasts_by_window, tides_by_spot = await asyncio.gather(
+            get_forecast_windows_from_db(windows),
+            get_tides_forecast_for_spots_from_db(
+                window_spot_ids,
+                min(start_utc for _, start_utc, _ in windows) - datetime.timedelta(days=1),
+                max(end_utc for _, _, end_utc in windows) + datetime.timedelta(days=1)
+            )
+        )
+    tide_indexes = {
+        spot_id: TideIndex([extreme for day in sorted(days) for extreme in days[day]])
+        for spot_id, days in tides_by_spot.items()
+    }
+
+    for (scoring_row, day_offset_data), window, forecasts in zip(window_days, windows, forecasts_by_window):
+        spot = scoring_row["spot"]
+        if not forecasts:
+            day_offset_data["error"] = f"Nenhuma previsão encontrada para o spot {spot['spot_name']} entre {start_time_str} e {end_time_str} para o dia {day_offset_data['day_offset']}."
+            continue
+        scoring_row["forecasts"].extend(forecasts)
+        scoring_row["tide_phases"].extend(
+            tide_indexes.get(spot['spot_id'], TideIndex([])).phases([forecast_entry.timestamp_utc for forecast_entry in forecasts]).tolist()
+        )
+        scoring_row["days"].append((day_offset_data, len(forecasts)))
+        scoring_row["windows"].append(window)
+
+    # Spots com as preferências padrão do nível usam os scores pré-calculados na ingestão
+    # (level_scores), desde que existam para todas as horas pedidas.
+    level_rows = [row for row in scoring_rows if row["preference_source"] == 'level' and row["forecasts"]]
+    # As janelas são as mesmas da busca das previsões, uma por dia.
+    if level_rows:
+        level_windows = [window for row in level_rows for window in row["windows"]]
+        stored_scores_by_window = iter(await get_level_score_windows_from_db(surf_level, level_windows))
+        for row in level_rows:
+            stored_by_timestamp = {
+                entry.timestamp_utc: entry
+                for _ in row["windows"]
+                for entry in next(stored_scores_by_window)
+            }
+            stored = [stored_by_timestamp.get(forecast_entry.timestamp_utc) for forecast_entry in row["forecasts"]]
+            if all(entry is not None for entry in stored):
+                row["final_scores"] = [entry.suitability_score for entry in stored]
+                row["detailed_scores"] = {key: [getattr(entry, key) for entry in stored] for key in DETAILED_SCORE_KEYS}
+
+    # Calcula os scores dos demais spots × horas de uma vez.
+    rows_to_score = [row for row in scoring_rows if "final_scores" not in row]
+    if rows_to_score:
+        forecast_matrix = build_forecast_matrix(
+            [row["forecasts"] for row in rows_to_score],
+            [row["tide_phases"] for row in rows_to_score]
+        )
+        final_scores, detailed_scores = calculate_suitability_scores_batch(
+            forecast_matrix, [row["spot_preferences"] for row in rows_to_score]
+        )
+        for i, row in enumerate(rows_to_score):
+            row["final_scores"] = final_scores[i].tolist()
+            row["detailed_scores"] = {key: values[i].tolist() for key, values in detailed_scores.items()}
+
+    return (all_spot_recommendations, scoring_rows), 200
+
+FORECAST_CONDITION_FIELDS = (
+    'wave_height_sg', 'wave_direction_sg', 'wave_period_sg',
+    'swell_height_sg', 'swell_direction_sg', 'swell_period_sg',
+    'secondary_swell_height_sg', 'secondary_swell_direction_sg', 'secondary_swell_period_sg',
+    'wind_speed_sg', 'wind_direction_sg', 'water_temperature_sg', 'air_temperature_sg',
+    'current_speed_sg', 'current_direction_sg', 'sea_level_sg',
+)
+
+# Colunas por hora do modo compacto. Sem `fields`, vão o score final e os scores detalhados.
+COMPACT_DEFAULT_FIELDS = ('suitability_score',) + DETAILED_SCORE_KEYS
+COMPACT_HOURLY_FIELDS = COMPACT_DEFAULT_FIELDS + FORECAST_CONDITION_FIELDS + ('tide_phase',)
+# Dados estáticos do spot, enviados uma vez por spot.
+COMPACT_STATIC_FIELDS = ('spot_characteristics', 'preferences_used_for_spot')
+
+def forecast_conditions(forecast_entry, tide_phase):
+    conditions = {field: getattr(forecast_entry, field) for field in FORECAST_CONDITION_FIELDS}
+    conditions["tide_phase"] = tide_phase
+    return conditions
+
+def spot_characteristics(spot):
+    return {
+        "bottom_type": spot.get('bottom_type'),
+        "coast_orientation": spot.get('coast_orientation'),
+        "general_characteristics": spot.get('general_characteristics')
+    }
+
+def parse_compact_fields(fields_str):
+    """
+    Converte o parâmetro `fields` (nomes separados por vírgula) na lista de campos do modo compacto.
+    Retorna (campos, None) ou (None, mensagem de erro).
+    """
+    if fields_str is None:
+        return list(COMPACT_DEFAULT_FIELDS) + ['spot_characteristics'], None
+    fields = [field.strip() for field in fields_str.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in COMPACT_HOURLY_FIELDS + COMPACT_STATIC_FIELDS]
+    if unknown:
+        return None, f"Campos desconhecidos em fields: {', '.join(unknown)}. Disponíveis: {', '.join(COMPACT_HOURLY_FIELDS + COMPACT_STATIC_FIELDS)}."
+    return list(dict.fromkeys(fields)), None
+
+def build_compact_recommendations(all_spot_recommendations, scoring_rows, fields):
+    """
+    Monta a resposta compacta: por spot, os dados estáticos uma única vez e, por dia,
+    um array por campo ("timestamp_utc" sempre incluído) em vez de um objeto por hora.
+    """
+    hourly_fields = [field for field in fields if field in COMPACT_HOURLY_FIELDS]
+    # Localiza as horas de cada dia na linha de scoring correspondente.
+    hours_by_day = {}
+    for row in scoring_rows:
+        hour_index = 0
+        for day_offset_data, hours_count in row["days"]:
+            hours_by_day[id(day_offset_data)] = (row, hour_index, hour_index + hours_count)
+            hour_index += hours_count
+
+    compact_spots = []
+    for spot_data in all_spot_recommendations:
+        compact_spot = {"spot_id": spot_data["spot_id"], "spot_name": spot_data["spot_name"]}
+        if "preference_source" in spot_data:
+            compact_spot["preference_source"] = spot_data["preference_source"]
+        if "error" in spot_data:
+            compact_spot["error"] = spot_data["error"]
+        if "preferences_used_for_spot" in fields and "preferences_used_for_spot" in spot_data:
+            compact_spot["preferences_used_for_spot"] = spot_data["preferences_used_for_spot"]
+
+        compact_days = []
+        for day_offset_data in spot_data.get("day_offsets", []):
+            compact_day = {"day_offset": day_offset_data["day_offset"]}
+            if "error" in day_offset_data:
+                compact_day["error"] = day_offset_data["error"]
+            located = hours_by_day.get(id(day_offset_data))
+            if located:
+                row, start, end = located
+                if "spot_characteristics" in fields and "spot_characteristics" not in compact_spot:
+                    compact_spot["spot_characteristics"] = spot_characteristics(row["spot"])
+                forecasts = row["forecasts"][start:end]
+                compact_day["timestamp_utc"] = [forecast_entry.timestamp_utc for forecast_entry in forecasts]
+                for field in hourly_fields:
+                    if field == 'suitability_score':
+                        compact_day[field] = row["final_scores"][start:end]
+                    elif field in row["detailed_scores"]:
+                        compact_day[field] = row["detailed_scores"][field][start:end]
+                    elif field == 'tide_phase':
+                        compact_day[field] = row["tide_phases"][start:end]
+                    else:
+                        compact_day[field] = [getattr(forecast_entry, field) for forecast_entry in forecasts]
+            compact_days.append(compact_day)
+        if "day_offsets" in spot_data:
+            compact_spot["day_offsets"] = compact_days
+        compact_spots.append(compact_spot)
+    return compact_spots
+
+async def generate_recommendations_logic(user_id, spot_ids_list, day_offsets, start_time_str, end_time_str, compact_fields=None, weekdays=None):
+    """
+    Gera as recomendações hora a hora de cada spot/dia. Com `compact_fields`
+    (ver parse_compact_fields), retorna a resposta compacta em colunas. `weekdays` filtra
+    os dias como em score_recommendation_candidates.
+    """
+    result, status_code = await score_recommendation_candidates(
+        user_id, spot_ids_list, day_offsets, start_time_str, end_time_str, weekdays
+    )
+    if status_code != 200:
+        return result, status_code
+    all_spot_recommendations, scoring_rows = result
+    if compact_fields is not None:
+        return build_compact_recommendations(all_spot_recommendations, scoring_rows, compact_fields), 200
+
+    for row in scoring_rows:
+        spot = row["spot"]
+        spot_final_scores = row["final_scores"]
+        spot_detailed_scores = row["detailed_scores"]
+        hour_index = 0
+        for day_offset_data, hours_count in row["days"]:
             hourly_recommendations_for_day = []
-            for forecast_entry in filtered_forecasts:
-                tide_phase = determine_tide_phase(forecast_entry['timestamp_utc'], tides_extremes)
-                suitability_score, detailed_scores = calculate_suitability_score(forecast_entry, spot_preferences, spot, tide_phase, user)
+            for h in range(hour_index, hour_index + hours_count):
+                forecast_entry = row["forecasts"][h]
                 recommendation_entry = {
-                    "timestamp_utc": forecast_entry['timestamp_utc'].isoformat(),
-                    "suitability_score": suitability_score,
-                    "detailed_scores": detailed_scores,
-                    "forecast_conditions": {
-                        "wave_height_sg": forecast_entry.get('wave_height_sg'),
-                        "wave_direction_sg": forecast_entry.get('wave_direction_sg'),
-                        "wave_period_sg": forecast_entry.get('wave_period_sg'),
-                        "swell_height_sg": forecast_entry.get('swell_height_sg'),
-                        "swell_direction_sg": forecast_entry.get('swell_direction_sg'),
-                        "swell_period_sg": forecast_entry.get('swell_period_sg'),
-                        "secondary_swell_height_sg": forecast_entry.get('secondary_swell_height_sg'),
-                        "secondary_swell_direction_sg": forecast_entry.get('secondary_swell_direction_sg'),
-                        "secondary_swell_period_sg": forecast_entry.get('secondary_swell_period_sg'),
-                        "wind_speed_sg": forecast_entry.get('wind_speed_sg'),
-                        "wind_direction_sg": forecast_entry.get('wind_direction_sg'),
-                        "water_temperature_sg": forecast_entry.get('water_temperature_sg'),
-                        "air_temperature_sg": forecast_entry.get('air_temperature_sg'),
-                        "current_speed_sg": forecast_entry.get('current_speed_sg'),
-                        "current_direction_sg": forecast_entry.get('current_direction_sg'),
-                        "sea_level_sg": forecast_entry.get('sea_level_sg'),
-                        "tide_phase": tide_phase,
-                    },
-                    "spot_characteristics": {
-                        "bottom_type": spot.get('bottom_type'),
-                        "coast_orientation": spot.get('coast_orientation'),
-                        "general_characteristics": spot.get('general_characteristics')
-                    }
+                    "timestamp_utc": forecast_entry.timestamp_utc.isoformat(),
+                    "suitability_score": spot_final_scores[h],
+                    "detailed_scores": {key: values[h] for key, values in spot_detailed_scores.items()},
+                    "forecast_conditions": forecast_conditions(forecast_entry, row["tide_phases"][h]),
+                    "spot_characteristics": spot_characteristics(spot)
                 }
                 hourly_recommendations_for_day.append(recommendation_entry)
             day_offset_data["recommendations"] = hourly_recommendations_for_day
-            spot_recommendations_data["day_offsets"].append(day_offset_data)
-        all_spot_recommendations.append(spot_recommendations_data)
+            hour_index += hours_count
     return convert_numpy_to_python_types(all_spot_recommendations), 200
 
 @router.post("")
-async def get_recommendations_endpoint(request: RecommendationRequest):
+async def get_recommendations_endpoint(request: RecommendationRequest, compact: bool = False, fields: str | None = None):
+    """
+    Com `?compact=true` ou `?fields=campo1,campo2`, retorna arrays por spot-dia em vez de
+    um objeto por hora, serializados com orjson.
+    """
+    compact_fields = None
+    if compact or fields is not None:
+        compact_fields, error = parse_compact_fields(fields)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
     data = request.dict()
     user_id = data.get('user_id')
     spot_ids = data.get('spot_ids')
@@ -165,8 +373,77 @@ async def get_recommendations_endpoint(request: RecommendationRequest):
     except (ValueError, TypeError) as e:
         raise HTTPException(status_code=400, detail="day_offset deve ser um número inteiro ou uma lista de números inteiros.")
     recommendations_data, status_code = await generate_recommendations_logic(
-        user_id, spot_ids, day_offsets, start_time, end_time
+        user_id, spot_ids, day_offsets, start_time, end_time, compact_fields
     )
     if status_code != 200:
         raise HTTPException(status_code=status_code, detail=recommendations_data)
-    return recommendations_data
\ No newline at end of file
+    if compact_fields is not None:
+        return FastJSONResponse(recommendations_data)
+    return recommendations_data
+
+async def generate_top_recommendations_logic(user_id, spot_ids_list, day_offsets, start_time_str, end_time_str, top_n, min_score=None, merge_sessions=False):
+    """
+    Calcula os scores de todos os spots × horas da janela e retorna apenas os `top_n` melhores
+    horários (ou, com merge_sessions, as sessões formadas por eles).
+    """
+    result, status_code = await score_recommendation_candidates(user_id, spot_ids_list, day_offsets, start_time_str, end_time_str)
+    if status_code != 200:
+        return result, status_code
+    _, scoring_rows = result
+
+    # Vetor único com os scores de todas as linhas, e de onde veio cada posição.
+    row_indices = []
+    hour_indices = []
+    day_offsets_by_hour = []
+    for i, row in enumerate(scoring_rows):
+        row_indices.extend([i] * len(row["final_scores"]))
+        hour_indices.extend(range(len(row["final_scores"])))
+        for day_offset_data, hours_count in row["days"]:
+            day_offsets_by_hour.extend([day_offset_data["day_offset"]] * hours_count)
+    all_scores = np.array([score for row in scoring_rows for score in row["final_scores"]], dtype=float)
+
+    slots = []
+    for index in top_n_indices(all_scores, top_n, min_score).tolist():
+        row = scoring_rows[row_indices[index]]
+        h = hour_indices[index]
+        forecast_entry = row["forecasts"][h]
+        slots.append({
+            "spot_id": row["spot"]['spot_id'],
+            "spot_name": row["spot"]['spot_name'],
+            "day_offset": day_offsets_by_hour[index],
+            "timestamp_utc": forecast_entry.timestamp_utc,
+            "suitability_score": row["final_scores"][h],
+            "detailed_scores": {key: values[h] for key, values in row["detailed_scores"].items()},
+            "forecast_conditions": forecast_conditions(forecast_entry, row["tide_phases"][h]),
+        })
+
+    if merge_sessions:
+        sessions = merge_consecutive_slots(slots)
+        for session in sessions:
+            session["spot_name"] = session["slots"][0]["spot_name"]
+            session["start_utc"] = session["start_utc"].isoformat()
+            session["end_utc"] = session["end_utc"].isoformat()
+        response = {"sessions": sessions}
+    else:
+        response = {"slots": slots}
+    for slot in slots:
+        slot["timestamp_utc"] = slot["timestamp_utc"].isoformat()
+    return convert_numpy_to_python_types(response), 200
+
+@router.post("/top")
+async def get_top_recommendations_endpoint(request: TopRecommendationRequest):
+    spot_ids = request.spot_ids
+    if spot_ids is None:
+        spot_ids = [spot['spot_id'] for spot in await get_all_spots()]
+    day_offsets = request.day_offset
+    if day_offsets is None:
+        day_offsets = list(range(FORECAST_DAYS + 1))
+    if request.top_n <= 0:
+        raise HTTPException(status_code=400, detail="top_n deve ser um número inteiro positivo.")
+    top_data, status_code = await generate_top_recommendations_logic(
+        request.user_id, spot_ids, day_offsets, request.start_time, request.end_time,
+        request.top_n, request.min_score, request.merge_sessions
+    )
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=top_data)
+    return top_data
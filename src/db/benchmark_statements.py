@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+import asyncpg
+from src.db.connection import init_async_db_pool, acquire_db_connection
+import src.db.queries  # registra os statements frequentes antes de o pool criar as conexões
+from src.utils.config import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+
+# Mede, para cada statement registrado em queries.py, a latência do statement preparado na
+# conexão do pool contra o caminho ad-hoc (o mesmo SQL enviado com conn.fetch), com e sem
+# o cache de statements do asyncpg. Usa os dados existentes no banco como parâmetros.
+#
+#   python -m src.db.benchmark_statements --iterations 500
+
+async def sample_arguments(conn):
+    """Parâmetros de exemplo de cada statement, a partir do primeiro spot, usuário e preset do banco."""
+    spot_id = await conn.fetchval("SELECT spot_id FROM spots ORDER BY spot_id LIMIT 1;")
+    user = await conn.fetchrow("SELECT user_id::text AS user_id, surf_level FROM users LIMIT 1;")
+    preset = await conn.fetchrow("SELECT preset_id, user_id::text AS user_id FROM user_recommendation_presets LIMIT 1;")
+    start_utc = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end_utc = start_utc + datetime.timedelta(days=1)
+
+    arguments = {}
+    if spot_id is not None:
+        arguments.update({
+            'all_spots': (),
+            'spot_by_id': (spot_id,),
+            'spots_by_ids': ([spot_id],),
+            'forecast_rows': ([spot_id], start_utc, end_utc),
+            'forecast_window_rows': ([spot_id], [start_utc], [end_utc]),
+            'tide_rows': ([spot_id], start_utc, end_utc),
+            'forecast_columns': ([spot_id], start_utc, end_utc),
+            'level_spot_preferences_for_spot': (spot_id,),
+        })
+    if user is not None:
+        arguments.update({
+            'user_by_id': (user['user_id'],),
+            'user_surf_level': (user['user_id'],),
+            'default_user_preset': (user['user_id'],),
+        })
+    if spot_id is not None and user is not None:
+        arguments.update({
+            'level_score_window_rows': (user['surf_level'], [spot_id], [start_utc], [end_utc]),
+            'user_spot_preferences': (user['user_id'], spot_id),
+            'model_spot_preferences': (user['user_id'], spot_id),
+            'level_spot_preferences': (user['surf_level'], spot_id),
+            'effective_spot_preferences': ([spot_id], user['user_id'], user['surf_level']),
+        })
+    if preset is not None:
+        arguments['user_preset_by_id'] = (preset['preset_id'], preset['user_id'])
+    return arguments
+
+async def measure(run, iterations, warmup):
+    """Mediana e p95 (em ms) de `iterations` chamadas de `run`, depois de `warmup` chamadas descartadas."""
+    for _ in range(warmup):
+        await run()
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await run()
+        durations.append(1000 * (time.perf_counter() - started))
+    return statistics.median(durations), statistics.quantiles(durations, n=20)[-1]
+
+async def main(iterations, warmup):
+    await init_async_db_pool()
+    # Conexão avulsa sem cache de statements: cada chamada ad-hoc faz parse + execução,
+    # como atrás do PgBouncer em modo transaction.
+    uncached_conn = await asyncpg.connect(
+        user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT, database=DB_NAME,
+        statement_cache_size=0
+    )
+    try:
+        async with acquire_db_connection("benchmark_statements") as conn:
+            if not conn.prepared_statements:
+                print("Nenhum statement preparado no pool. Verifique DB_PREPARED_STATEMENTS_ENABLED.")
+                return
+            arguments = await sample_arguments(conn)
+            print(f"{'statement':<34}{'preparado':>16}{'ad-hoc':>16}{'sem cache':>16}{'ganho':>9}")
+            print(f"{'':<34}{'mediana/p95 ms':>16}{'mediana/p95 ms':>16}{'mediana/p95 ms':>16}")
+            for name, statement in conn.prepared_statements.items():
+                if name not in arguments:
+                    print(f"{name:<34}sem dados de exemplo no banco")
+                    continue
+                args = arguments[name]
+                sql = statement.get_query()
+                prepared = await measure(lambda: statement.fetch(*args), iterations, warmup)
+                ad_hoc = await measure(lambda: conn.fetch(sql, *args), iterations, warmup)
+                uncached = await measure(lambda: uncached_conn.fetch(sql, *args), iterations, warmup)
+                gain = 100 * (ad_hoc[0] - prepared[0]) / ad_hoc[0] if ad_hoc[0] else 0.0
+                print(
+                    f"{name:<34}"
+                    f"{prepared[0]:>9.3f}/{prepared[1]:<6.2f}"
+                    f"{ad_hoc[0]:>9.3f}/{ad_hoc[1]:<6.2f}"
+                    f"{uncached[0]:>9.3f}/{uncached[1]:<6.2f}"
+                    f"{gain:>8.1f}%"
+                )
+    finally:
+        await uncached_conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara os statements preparados de queries.py com o caminho ad-hoc.")
+    parser.add_argument('--iterations', type=int, default=200, help="Execuções medidas por statement e caminho.")
+    parser.add_argument('--warmup', type=int, default=20, help="Execuções descartadas antes de medir.")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.warmup))
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from src.utils.config import (
+    FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_TTL_SECONDS,
+    PREFERENCE_CACHE_MAX_ENTRIES, PREFERENCE_CACHE_TTL_SECONDS,
+    PRESET_CACHE_MAX_ENTRIES, PRESET_CACHE_TTL_SECONDS
+)
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Cache em memória com política LRU e expiração por TTL.
+
+    As chaves de previsões e marés são tuplas (spot_id, dia UTC), o que permite
+    invalidar todas as entradas de um spot de uma vez.
+
+    `generation` é incrementado a cada invalidação. Quem busca dados no banco deve
+    ler a geração antes da consulta e passá-la para `set`: se houve uma invalidação
+    nesse meio tempo, o valor (possivelmente antigo) é descartado.
+    """
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_spot(self, spot_id):
+        """Remove todas as entradas (spot_id, ...) do spot informado."""
+        self.generation += 1
+        for key in [key for key in self._entries if key[0] == spot_id]:
+            del self._entries[key]
+
+    def invalidate_days(self, spot_id, first_day, last_day):
+        """Remove as entradas (spot_id, dia) com dia entre first_day e last_day (inclusive)."""
+        self.generation += 1
+        for key in [key for key in self._entries if key[0] == spot_id and first_day <= key[1] <= last_day]:
+            del self._entries[key]
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# Caches de leitura das tabelas forecasts e tides_forecast, chaveados por (spot_id, dia UTC)
+# ou, para janelas de horário, (spot_id, dia UTC, início, fim).
+forecast_cache = TTLCache(FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_TTL_SECONDS)
+tide_cache = TTLCache(FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_TTL_SECONDS)
+# Scores pré-calculados por nível (level_scores), chaveados por (spot_id, dia UTC, início, fim, surf_level).
+level_score_cache = TTLCache(FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_TTL_SECONDS)
+# Modelos de maré interpolados (src/utils/tide_model.py), chaveados por (spot_id, dia UTC).
+# Cada entrada guarda a geração de tide_cache em que foi montada e deixa de valer quando tide_cache é invalidado.
+tide_model_cache = TTLCache(FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_TTL_SECONDS)
+
+# Preferências efetivas por (user_id, surf_level, spot_id). invalidate_spot(user_id)
+# remove todas as entradas de um usuário.
+preference_cache = TTLCache(PREFERENCE_CACHE_MAX_ENTRIES, PREFERENCE_CACHE_TTL_SECONDS)
+
+# Resultados de /presets/{id}/run, chaveados por (user_id, preset_id, updated_at, data_version()).
+# Cada valor é (data local de hoje por fuso dos spots, resultado).
+preset_result_cache = TTLCache(PRESET_CACHE_MAX_ENTRIES, PRESET_CACHE_TTL_SECONDS)
+
+def data_version():
+    """
+    Versão dos dados usados nas recomendações neste worker: muda a cada invalidação de
+    previsões, marés, scores por nível ou preferências.
+    """
+    return (forecast_cache.generation, tide_cache.generation, level_score_cache.generation, preference_cache.generation)
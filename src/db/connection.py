@@ -1,8 +1,135 @@
+import asyncio
+import contextlib
+import time
 import asyncpg
-from src.utils.config import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+from src.utils.config import (
+	DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME,
+	DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME,
+	DB_POOL_ACQUIRE_TIMEOUT_SECONDS, DB_POOL_SLOW_ACQUIRE_SECONDS,
+	DB_COMMAND_TIMEOUT_SECONDS, DB_STATEMENT_CACHE_SIZE, DB_PREPARED_STATEMENTS_ENABLED
+)
 
 _async_pool = None
 
+# Limites superiores (em segundos) das faixas do histograma de espera por conexão.
+ACQUIRE_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+class PoolMetrics:
+	"""
+	Métricas do pool deste worker: espera para obter uma conexão, conexões em uso e em
+	espera, e a latência de cada função de consulta (tempo com a conexão em mãos).
+	"""
+
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self.acquire_count = 0
+		self.acquire_timeouts = 0
+		self.acquire_wait_total = 0.0
+		self.acquire_wait_max = 0.0
+		self.acquire_wait_buckets = [0] * (len(ACQUIRE_WAIT_BUCKETS) + 1)
+		self.waiting = 0
+		self.waiting_peak = 0
+		self.in_use = 0
+		self.in_use_peak = 0
+		# query_name -> [chamadas, erros, tempo total, tempo máximo]
+		self.queries = {}
+
+	def record_acquire(self, wait):
+		self.acquire_count += 1
+		self.acquire_wait_total += wait
+		self.acquire_wait_max = max(self.acquire_wait_max, wait)
+		bucket = next((i for i, limit in enumerate(ACQUIRE_WAIT_BUCKETS) if wait <= limit), len(ACQUIRE_WAIT_BUCKETS))
+		self.acquire_wait_buckets[bucket] += 1
+
+	def record_query(self, query_name, elapsed, failed):
+		stats = self.queries.setdefault(query_name, [0, 0, 0.0, 0.0])
+		stats[0] += 1
+		stats[1] += int(failed)
+		stats[2] += elapsed
+		stats[3] = max(stats[3], elapsed)
+
+	def snapshot(self):
+		bucket_labels = [str(limit) for limit in ACQUIRE_WAIT_BUCKETS] + ['+Inf']
+		return {
+			"acquire": {
+				"count": self.acquire_count,
+				"timeouts": self.acquire_timeouts,
+				"wait_avg_ms": 1000 * self.acquire_wait_total / self.acquire_count if self.acquire_count else 0.0,
+				"wait_max_ms": 1000 * self.acquire_wait_max,
+				"wait_seconds_buckets": dict(zip(bucket_labels, self.acquire_wait_buckets))
+			},
+			"in_use": self.in_use,
+			"in_use_peak": self.in_use_peak,
+			"waiting": self.waiting,
+			"waiting_peak": self.waiting_peak,
+			"queries": {
+				query_name: {
+					"count": count,
+					"errors": errors,
+					"avg_ms": 1000 * total / count,
+					"max_ms": 1000 * maximum
+				}
+				for query_name, (count, errors, total, maximum) in sorted(self.queries.items())
+			}
+		}
+
+pool_metrics = PoolMetrics()
+
+# Consultas frequentes de queries.py, registradas com register_statement e preparadas uma vez
+# em cada conexão do pool, no hook `init`. A execução reutiliza o statement preparado, sem
+# enviar o SQL nem procurá-lo no cache de statements do asyncpg a cada chamada.
+_registered_statements = {}
+# Statements cujo prepare já falhou e foi registrado no log (uma vez por nome, não por conexão).
+_unprepared_statements = set()
+
+def register_statement(name, sql):
+	"""Registra `sql` para ser preparado em cada nova conexão do pool. Retorna `name`."""
+	_registered_statements[name] = sql
+	return name
+
+class _PreparedStatementsConnection(asyncpg.Connection):
+	# Statements de _registered_statements já preparados nesta conexão, por nome.
+	__slots__ = ('prepared_statements',)
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.prepared_statements = {}
+
+async def _prepare_registered_statements(conn):
+	if not DB_PREPARED_STATEMENTS_ENABLED:
+		return
+	for name, sql in _registered_statements.items():
+		try:
+			conn.prepared_statements[name] = await conn.prepare(sql)
+		except asyncpg.PostgresError as e:
+			# Ex.: tabela ainda não criada (level_scores). Não impede a criação do pool: o
+			# statement segue pelo caminho normal em _run_statement nesta conexão.
+			if name not in _unprepared_statements:
+				_unprepared_statements.add(name)
+				print(f"Could not prepare statement {name} ({e}). Running it without a prepared statement.")
+
+async def _run_statement(conn, method, name, args):
+	statement = getattr(conn, 'prepared_statements', {}).get(name)
+	if statement is None:
+		# Registro desligado ou prepare com falha: mesmo SQL pelo caminho normal.
+		return await getattr(conn, method)(_registered_statements[name], *args)
+	try:
+		return await getattr(statement, method)(*args)
+	except asyncpg.exceptions.InvalidCachedStatementError:
+		# O schema mudou depois do prepare: prepara de novo e repete uma vez.
+		statement = conn.prepared_statements[name] = await conn.prepare(_registered_statements[name])
+		return await getattr(statement, method)(*args)
+
+async def fetch_statement(conn, name, *args):
+	"""Como conn.fetch, mas executa o statement registrado `name`."""
+	return await _run_statement(conn, 'fetch', name, args)
+
+async def fetchrow_statement(conn, name, *args):
+	"""Como conn.fetchrow, mas executa o statement registrado `name`."""
+	return await _run_statement(conn, 'fetchrow', name, args)
+
 async def init_async_db_pool():
 	global _async_pool
 	if _async_pool is None:
@@ -12,18 +139,74 @@ async def init_async_db_pool():
 			host=DB_HOST,
 			port=DB_PORT,
 			database=DB_NAME,
-			min_size=1,
-			max_size=10
+			min_size=DB_POOL_MIN_SIZE,
+			max_size=DB_POOL_MAX_SIZE,
+			max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME,
+			command_timeout=DB_COMMAND_TIMEOUT_SECONDS,
+			statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+			connection_class=_PreparedStatementsConnection,
+			init=_prepare_registered_statements
 		)
 	return _async_pool
 
-async def get_async_db_connection():
-	global _async_pool
+@contextlib.asynccontextmanager
+async def acquire_db_connection(query_name):
+	"""
+	Obtém uma conexão do pool e a devolve ao sair do bloco:
+
+		async with acquire_db_connection("get_all_spots") as conn:
+			...
+
+	A espera é limitada por DB_POOL_ACQUIRE_TIMEOUT_SECONDS (asyncio.TimeoutError), e a
+	espera, as conexões em uso e o tempo do bloco ficam em pool_metrics sob `query_name`.
+	"""
 	if _async_pool is None:
 		raise Exception("Async DB pool not initialized. Call init_async_db_pool() first.")
-	return await _async_pool.acquire()
 
-async def release_async_db_connection(conn):
-	global _async_pool
-	if _async_pool and conn:
+	pool_metrics.waiting += 1
+	pool_metrics.waiting_peak = max(pool_metrics.waiting_peak, pool_metrics.waiting)
+	started = time.perf_counter()
+	try:
+		conn = await _async_pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT_SECONDS)
+	except asyncio.TimeoutError:
+		pool_metrics.acquire_timeouts += 1
+		print(
+			f"Timeout ({DB_POOL_ACQUIRE_TIMEOUT_SECONDS}s) waiting for a DB connection for {query_name}: "
+			f"{pool_metrics.in_use} in use, {pool_metrics.waiting - 1} other waiting."
+		)
+		raise
+	finally:
+		pool_metrics.waiting -= 1
+
+	acquired = time.perf_counter()
+	wait = acquired - started
+	pool_metrics.record_acquire(wait)
+	if wait >= DB_POOL_SLOW_ACQUIRE_SECONDS:
+		print(
+			f"Slow DB connection acquire for {query_name}: {wait:.3f}s "
+			f"({pool_metrics.in_use} in use, {pool_metrics.waiting} waiting)."
+		)
+	pool_metrics.in_use += 1
+	pool_metrics.in_use_peak = max(pool_metrics.in_use_peak, pool_metrics.in_use)
+	failed = False
+	try:
+		yield conn
+	except Exception:
+		failed = True
+		raise
+	finally:
+		pool_metrics.in_use -= 1
+		pool_metrics.record_query(query_name, time.perf_counter() - acquired, failed)
 		await _async_pool.release(conn)
+
+def get_pool_metrics():
+	"""Tamanho atual do pool somado às métricas de pool_metrics."""
+	pool = None
+	if _async_pool is not None:
+		pool = {
+			"size": _async_pool.get_size(),
+			"idle": _async_pool.get_idle_size(),
+			"min_size": _async_pool.get_min_size(),
+			"max_size": _async_pool.get_max_size()
+		}
+	return {"pool": pool, **pool_metrics.snapshot()}
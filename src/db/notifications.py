@@ -0,0 +1,128 @@
+import asyncio
+import datetime
+import json
+import asyncpg
+from src.db.cache import (
+    forecast_cache, tide_cache, preference_cache, level_score_cache, tide_model_cache, preset_result_cache
+)
+from src.utils.config import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME, FORECAST_UPDATES_CHANNEL
+
+# Conexão dedicada (fora do pool) que fica escutando FORECAST_UPDATES_CHANNEL.
+# LISTEN precisa de uma sessão persistente: atrás de um PgBouncer em modo transaction,
+# DB_HOST/DB_PORT devem apontar para a conexão direta do Postgres.
+_listener_conn = None
+_reconnect_task = None
+_stopping = False
+
+RECONNECT_DELAY_SECONDS = 5
+
+_caches_by_table = {
+    'forecasts': forecast_cache,
+    'tides_forecast': tide_cache,
+    'level_scores': level_score_cache,
+}
+
+# Funções chamadas (sem argumentos) quando uma ingestão completa termina; registradas
+# pela aplicação, ex.: o pré-aquecimento dos presets padrão.
+ingestion_complete_callbacks = []
+
+def _clear_read_caches():
+    """
+    Descarta todos os caches de leitura deste worker. Os modelos de maré e os resultados de
+    presets já deixariam de valer com a nova geração de tide_cache/data_version(), mas são
+    limpos junto para não ocuparem memória até expirar.
+    """
+    for cache in (forecast_cache, tide_cache, preference_cache, level_score_cache, tide_model_cache, preset_result_cache):
+        cache.clear()
+
+def _handle_ingestion_complete():
+    for callback in ingestion_complete_callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error running ingestion complete callback {callback}: {e}")
+
+def _handle_forecast_update(connection, pid, channel, payload):
+    """
+    Remove do cache os dias (UTC) do spot atualizados pela ingestão.
+    Payload: {"table", "spot_id", "start_utc", "end_utc"}, ou {"table": "user_spot_preferences", "user_id"}
+    quando as preferências de um usuário mudam, ou {"event": "ingestion_complete"} ao fim de uma ingestão.
+    """
+    try:
+        update = json.loads(payload)
+        if update.get('event') == 'ingestion_complete':
+            _handle_ingestion_complete()
+            return
+        if update['table'] == 'user_spot_preferences':
+            preference_cache.invalidate_spot(update['user_id'])
+            return
+        cache = _caches_by_table[update['table']]
+        first_day = datetime.datetime.fromisoformat(update['start_utc']).astimezone(datetime.timezone.utc).date()
+        last_day = datetime.datetime.fromisoformat(update['end_utc']).astimezone(datetime.timezone.utc).date()
+        cache.invalidate_days(update['spot_id'], first_day, last_day)
+    except Exception as e:
+        # Na dúvida, é melhor descartar tudo do que servir previsões antigas.
+        print(f"Invalid forecast update notification '{payload}': {e}")
+        _clear_read_caches()
+
+def _handle_listener_termination(connection):
+    global _listener_conn, _reconnect_task
+    _listener_conn = None
+    if _stopping:
+        return
+    # Notificações podem ter sido perdidas enquanto a conexão estava fora.
+    _clear_read_caches()
+    print("Forecast updates listener disconnected. Reconnecting...")
+    _reconnect_task = asyncio.get_running_loop().create_task(_reconnect())
+
+async def _connect_listener():
+    global _listener_conn
+    conn = await asyncpg.connect(
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME
+    )
+    await conn.add_listener(FORECAST_UPDATES_CHANNEL, _handle_forecast_update)
+    conn.add_termination_listener(_handle_listener_termination)
+    _listener_conn = conn
+    return conn
+
+async def _reconnect():
+    while not _stopping and _listener_conn is None:
+        try:
+            await _connect_listener()
+            # Dados podem ter mudado entre a queda e a reconexão.
+            _clear_read_caches()
+            print("Forecast updates listener reconnected.")
+        except Exception as e:
+            print(f"Error reconnecting forecast updates listener: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+async def start_cache_invalidation_listener():
+    """
+    Abre a conexão dedicada e passa a escutar as notificações da ingestão.
+    Se a conexão inicial falhar, tenta novamente em segundo plano.
+    """
+    global _stopping, _reconnect_task
+    _stopping = False
+    if _listener_conn is not None:
+        return _listener_conn
+    try:
+        return await _connect_listener()
+    except Exception as e:
+        print(f"Error starting forecast updates listener: {e}")
+        _reconnect_task = asyncio.get_running_loop().create_task(_reconnect())
+        return None
+
+async def stop_cache_invalidation_listener():
+    global _listener_conn, _stopping, _reconnect_task
+    _stopping = True
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
+    if _listener_conn is not None:
+        conn, _listener_conn = _listener_conn, None
+        await conn.remove_listener(FORECAST_UPDATES_CHANNEL, _handle_forecast_update)
+        await conn.close()
@@ -1,8 +1,13 @@
 
 import os
+import json
 import datetime
 import asyncpg
-from src.db.connection import get_async_db_connection, release_async_db_connection
+import numpy as np
+from src.db.connection import acquire_db_connection, register_statement, fetch_statement, fetchrow_statement
+from src.db.cache import forecast_cache, tide_cache, preference_cache, level_score_cache
+from src.db.records import ForecastHour, TideExtreme, LevelScoreHour, SpotPreferences
+from src.utils.config import FORECAST_UPDATES_CHANNEL
 
 
 # --- Funções Assíncronas de Escrita de Dados (INSERT/UPDATE) ---
@@ -14,8 +19,7 @@ async def add_spot_to_db(name, latitude, longitude, timezone):
     Add a new beach (spot) to the database.
     If the beach already exists, it will not be added again.
     """
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("add_spot_to_db") as conn:
         row = await conn.fetchrow("SELECT spot_id FROM spots WHERE spot_name = $1", name)
         if row:
             print(f"Spot '{name}' already exists in the database.")
@@ -30,24 +34,156 @@ async def add_spot_to_db(name, latitude, longitude, timezone):
         )
         print(f"Spot '{name}' (ID: {new_id}, Lat: {latitude}, Lng: {longitude}, Timezone: {timezone}) addition completed!")
         return new_id
-    finally:
-        await release_async_db_connection(conn)
+
+async def _notify_forecast_update(conn, table, spot_id, timestamps):
+    """
+    Publishes a NOTIFY on FORECAST_UPDATES_CHANNEL so every API worker evicts the
+    cached days of `spot_id` covered by `timestamps`.
+    """
+    if not timestamps:
+        return
+    payload = json.dumps({
+        "table": table,
+        "spot_id": spot_id,
+        "start_utc": min(timestamps).isoformat(),
+        "end_utc": max(timestamps).isoformat()
+    })
+    try:
+        await conn.execute("SELECT pg_notify($1, $2);", FORECAST_UPDATES_CHANNEL, payload)
+    except Exception as e:
+        print(f"Error notifying {table} update for {spot_id}: {e}")
+
+async def notify_ingestion_complete():
+    """
+    Publishes an {"event": "ingestion_complete"} NOTIFY on FORECAST_UPDATES_CHANNEL after a
+    whole ingestion run, so every API worker can prewarm its default presets.
+    """
+    try:
+        async with acquire_db_connection("notify_ingestion_complete") as conn:
+            await conn.execute(
+                "SELECT pg_notify($1, $2);", FORECAST_UPDATES_CHANNEL, json.dumps({"event": "ingestion_complete"})
+            )
+        print("Ingestion complete notification sent.")
+    except Exception as e:
+        print(f"Error notifying ingestion complete: {e}")
+
+FORECAST_COLUMNS = (
+    'spot_id', 'timestamp_utc', 'wave_height_sg', 'wave_direction_sg', 'wave_period_sg',
+    'swell_height_sg', 'swell_direction_sg', 'swell_period_sg', 'secondary_swell_height_sg',
+    'secondary_swell_direction_sg', 'secondary_swell_period_sg', 'wind_speed_sg',
+    'wind_direction_sg', 'water_temperature_sg', 'air_temperature_sg', 'current_speed_sg',
+    'current_direction_sg', 'sea_level_sg'
+)
+
+# As colunas NUMERIC chegariam como decimal.Decimal. As leituras fazem o cast para float8
+# no próprio SELECT, e o asyncpg já entrega floats. (Um codec numeric→float no pool não
+# serve: o COPY binário de _bulk_upsert exige codecs binários.)
+def _float_columns(columns, alias=''):
+    return ', '.join(f"{alias}{column}::float8 AS {column}" for column in columns)
+
+_FORECAST_VALUE_COLUMNS = FORECAST_COLUMNS[2:]
+
+_FORECAST_UPSERT_CONFLICT = """
+    ON CONFLICT (spot_id, timestamp_utc) DO UPDATE SET
+        wave_height_sg = EXCLUDED.wave_height_sg,
+        wave_direction_sg = EXCLUDED.wave_direction_sg,
+        wave_period_sg = EXCLUDED.wave_period_sg,
+        swell_height_sg = EXCLUDED.swell_height_sg,
+        swell_direction_sg = EXCLUDED.swell_direction_sg,
+        swell_period_sg = EXCLUDED.swell_period_sg,
+        secondary_swell_height_sg = EXCLUDED.secondary_swell_height_sg,
+        secondary_swell_direction_sg = EXCLUDED.secondary_swell_direction_sg,
+        secondary_swell_period_sg = EXCLUDED.secondary_swell_period_sg,
+        wind_speed_sg = EXCLUDED.wind_speed_sg,
+        wind_direction_sg = EXCLUDED.wind_direction_sg,
+        water_temperature_sg = EXCLUDED.water_temperature_sg,
+        air_temperature_sg = EXCLUDED.air_temperature_sg,
+        current_speed_sg = EXCLUDED.current_speed_sg,
+        current_direction_sg = EXCLUDED.current_direction_sg,
+        sea_level_sg = EXCLUDED.sea_level_sg;
+"""
+
+TIDE_COLUMNS = ('spot_id', 'timestamp_utc', 'tide_type', 'height')
+
+_TIDE_UPSERT_CONFLICT = """
+    ON CONFLICT (spot_id, timestamp_utc, tide_type) DO UPDATE SET
+        tide_type = EXCLUDED.tide_type,
+        height = EXCLUDED.height;
+"""
+
+async def _bulk_upsert(conn, table, columns, records, conflict_clause):
+    """
+    Streams `records` into a temporary staging table with COPY and merges them into
+    `table` with a single INSERT ... SELECT ... ON CONFLICT, all in one transaction.
+    The staging table copies the column types of `table` and is dropped on commit.
+    """
+    staging_table = f"{table}_staging"
+    column_list = ", ".join(columns)
+    async with conn.transaction():
+        await conn.execute(
+            f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS SELECT {column_list} FROM {table} WITH NO DATA;"
+        )
+        await conn.copy_records_to_table(staging_table, records=records, columns=columns)
+        await conn.execute(
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging_table} {conflict_clause}"
+        )
+
+async def _row_by_row_upsert(conn, table, columns, records, conflict_clause, describe_record):
+    """
+    Upserts one record per statement, reporting each failing row.
+    Used as a fallback when the bulk path fails, to find out which rows are invalid.
+    Each row runs in its own conn.transaction(): inside an outer transaction that is a
+    savepoint, so a failing row is rolled back and skipped without aborting the outer one.
+    Returns the records that were written.
+    """
+    column_list = ", ".join(columns)
+    placeholders = ", ".join(f"${i + 1}" for i in range(len(columns)))
+    written = []
+    for record in records:
+        try:
+            async with conn.transaction():
+                await conn.execute(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders}) {conflict_clause}", *record)
+            written.append(record)
+        except Exception as e:
+            print(f"Error inserting/updating {describe_record(record)}: {e}")
+    return written
+
+LEVEL_SCORE_COLUMNS = (
+    'surf_level', 'spot_id', 'timestamp_utc', 'suitability_score', 'wave_score', 'wind_score',
+    'tide_score', 'water_temperature_score', 'air_temperature_score', 'current_score'
+)
+
+_LEVEL_SCORE_UPSERT_CONFLICT = """
+    ON CONFLICT (surf_level, spot_id, timestamp_utc) DO UPDATE SET
+        suitability_score = EXCLUDED.suitability_score,
+        wave_score = EXCLUDED.wave_score,
+        wind_score = EXCLUDED.wind_score,
+        tide_score = EXCLUDED.tide_score,
+        water_temperature_score = EXCLUDED.water_temperature_score,
+        air_temperature_score = EXCLUDED.air_temperature_score,
+        current_score = EXCLUDED.current_score,
+        computed_at = NOW();
+"""
 
 async def insert_forecast_data(spot_id, forecast_data):
     """
     Inserts/Updates the forecast data into the forecasts table.
-    Usa context manager para conexão e cursor.
+    All rows are loaded with COPY into a staging table and merged with a single upsert,
+    in one transaction. Invalid rows are reported and skipped; if the merge itself fails,
+    falls back to row-by-row upserts so every failing row is reported.
     """
     if not forecast_data:
         print("No hourly data to insert.")
         return
 
     print(f"Starting insertion/update of {len(forecast_data)} hourly forecasts...")
-    conn = await get_async_db_connection()
-    try:
-        for entry in forecast_data:
+    # Chaveado por timestamp: se a mesma hora aparecer duas vezes, vale a última (como no upsert linha a linha).
+    records_by_timestamp = {}
+    for entry in forecast_data:
+        timestamp_utc = entry.get('time')
+        try:
             timestamp_utc = datetime.datetime.fromisoformat(entry['time'])
-            values_to_insert = (
+            records_by_timestamp[timestamp_utc] = (
                 spot_id,
                 timestamp_utc,
                 entry.get('waveHeight_sg'),
@@ -67,158 +203,450 @@ async def insert_forecast_data(spot_id, forecast_data):
                 entry.get('currentDirection_sg'),
                 entry.get('seaLevel_sg')
             )
+        except Exception as e:
+            print(f"Error inserting/updating forecast for {spot_id} at {timestamp_utc}: {e}")
+    records = list(records_by_timestamp.values())
+
+    async with acquire_db_connection("insert_forecast_data") as conn:
+        try:
             try:
-                await conn.execute(
-                    """
-                    INSERT INTO forecasts (
-                        spot_id, timestamp_utc, wave_height_sg, wave_direction_sg, wave_period_sg,
-                        swell_height_sg, swell_direction_sg, swell_period_sg, secondary_swell_height_sg,
-                        secondary_swell_direction_sg, secondary_swell_period_sg, wind_speed_sg,
-                        wind_direction_sg, water_temperature_sg, air_temperature_sg, current_speed_sg,
-                        current_direction_sg, sea_level_sg
-                    ) VALUES (
-                        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18
-                    )
-                    ON CONFLICT (spot_id, timestamp_utc) DO UPDATE SET
-                        wave_height_sg = EXCLUDED.wave_height_sg,
-                        wave_direction_sg = EXCLUDED.wave_direction_sg,
-                        wave_period_sg = EXCLUDED.wave_period_sg,
-                        swell_height_sg = EXCLUDED.swell_height_sg,
-                        swell_direction_sg = EXCLUDED.swell_direction_sg,
-                        swell_period_sg = EXCLUDED.swell_period_sg,
-                        secondary_swell_height_sg = EXCLUDED.secondary_swell_height_sg,
-                        secondary_swell_direction_sg = EXCLUDED.secondary_swell_direction_sg,
-                        secondary_swell_period_sg = EXCLUDED.secondary_swell_period_sg,
-                        wind_speed_sg = EXCLUDED.wind_speed_sg,
-                        wind_direction_sg = EXCLUDED.wind_direction_sg,
-                        water_temperature_sg = EXCLUDED.water_temperature_sg,
-                        air_temperature_sg = EXCLUDED.air_temperature_sg,
-                        current_speed_sg = EXCLUDED.current_speed_sg,
-                        current_direction_sg = EXCLUDED.current_direction_sg,
-                        sea_level_sg = EXCLUDED.sea_level_sg;
-                    """,
-                    *values_to_insert
-                )
+                await _bulk_upsert(conn, 'forecasts', FORECAST_COLUMNS, records, _FORECAST_UPSERT_CONFLICT)
             except Exception as e:
-                print(f"Error inserting/updating forecast for {spot_id} at {timestamp_utc}: {e}")
-    finally:
-        await release_async_db_connection(conn)
+                print(f"Bulk forecast upsert for {spot_id} failed ({e}). Retrying row by row...")
+                records = await _row_by_row_upsert(
+                    conn, 'forecasts', FORECAST_COLUMNS, records, _FORECAST_UPSERT_CONFLICT,
+                    lambda record: f"forecast for {spot_id} at {record[1]}"
+                )
+            await _notify_forecast_update(conn, 'forecasts', spot_id, [record[1] for record in records])
+        finally:
+            forecast_cache.invalidate_spot(spot_id)
     print("Forecast insertion/update process finished.")
 
+async def _delete_tide_extremes(conn, spot_id, start_utc, end_utc):
+    """Deletes the tide extremes of `spot_id` between `start_utc` and `end_utc` (inclusive)."""
+    await conn.execute(
+        "DELETE FROM tides_forecast WHERE spot_id = $1 AND timestamp_utc BETWEEN $2 AND $3;",
+        spot_id, start_utc, end_utc
+    )
+
 async def insert_extreme_tides_data(spot_id, extremes_data):
     """
-    Inserts/Updates the tide extremes data into the tides_forecast table.
-    Usa context manager para conexão e cursor.
+    Replaces the tide extremes of `spot_id` in the ingested window (first to last extreme)
+    in the tides_forecast table. A new forecast can shift an extreme by a few minutes, and
+    the upsert key includes the timestamp, so the window is deleted first; otherwise the old
+    extremes would remain next to the new ones. The delete and the COPY + single upsert
+    (same path as insert_forecast_data) run in one transaction; so do the delete and the
+    row-by-row fallback, with a savepoint per row.
     """
     if not extremes_data:
         print("No tide extremes data to insert.")
         return
 
     print(f"Starting insertion/update of {len(extremes_data)} tide extremes...")
-    conn = await get_async_db_connection()
-    try:
-        for extreme in extremes_data:
-            timestamp_utc = datetime.datetime.fromisoformat(extreme['time'].replace('Z', '+00:00')).replace(tzinfo=datetime.timezone.utc)
+    records_by_key = {}
+    for extreme in extremes_data:
+        timestamp_utc = extreme.get('time')
+        try:
+            timestamp_utc = datetime.datetime.fromisoformat(extreme['time'].replace('Z', '+00:00'))
+            # Os horários chegam em horário local do spot: converte (não apenas rotula) para UTC.
+            if timestamp_utc.tzinfo is None:
+                timestamp_utc = timestamp_utc.replace(tzinfo=datetime.timezone.utc)
+            else:
+                timestamp_utc = timestamp_utc.astimezone(datetime.timezone.utc)
             tide_type = extreme['type']
-            tide_height = extreme.get('height')
+            records_by_key[(timestamp_utc, tide_type)] = (spot_id, timestamp_utc, tide_type, extreme.get('height'))
+        except Exception as e:
+            print(f"Error inserting/updating tide extreme for {spot_id} at {timestamp_utc}: {e}")
+    records = list(records_by_key.values())
+    if not records:
+        print(f"No valid tide extremes to insert for {spot_id}.")
+        return
+    window_start = min(record[1] for record in records)
+    window_end = max(record[1] for record in records)
+
+    async with acquire_db_connection("insert_extreme_tides_data") as conn:
+        try:
             try:
-                await conn.execute(
-                    """
-                    INSERT INTO tides_forecast (spot_id, timestamp_utc, tide_type, height)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (spot_id, timestamp_utc, tide_type) DO UPDATE SET
-                        tide_type = EXCLUDED.tide_type,
-                        height = EXCLUDED.height;
-                    """,
-                    spot_id, timestamp_utc, tide_type, tide_height
-                )
+                async with conn.transaction():
+                    await _delete_tide_extremes(conn, spot_id, window_start, window_end)
+                    await _bulk_upsert(conn, 'tides_forecast', TIDE_COLUMNS, records, _TIDE_UPSERT_CONFLICT)
             except Exception as e:
-                print(f"Error inserting/updating tide extreme for {spot_id} at {timestamp_utc}: {e}")
-    finally:
-        await release_async_db_connection(conn)
+                print(f"Bulk tide extremes upsert for {spot_id} failed ({e}). Retrying row by row...")
+                # Também em uma transação: se algo além de uma linha falhar (a conexão, o delete),
+                # os extremos antigos da janela são mantidos. Linhas inválidas só desfazem o próprio savepoint.
+                async with conn.transaction():
+                    await _delete_tide_extremes(conn, spot_id, window_start, window_end)
+                    records = await _row_by_row_upsert(
+                        conn, 'tides_forecast', TIDE_COLUMNS, records, _TIDE_UPSERT_CONFLICT,
+                        lambda record: f"tide extreme for {spot_id} at {record[1]}"
+                    )
+            # O NOTIFY cobre a janela apagada, mesmo que alguma linha nova tenha falhado.
+            await _notify_forecast_update(conn, 'tides_forecast', spot_id, [window_start, window_end])
+        finally:
+            tide_cache.invalidate_spot(spot_id)
     print("Tide extremes insertion/update process finished.")
 
     # --- Funções de Leitura de Dados (GET) ---
 
+async def insert_level_scores(spot_id, records):
+    """
+    Inserts/Updates precomputed per-level scores of a spot into the level_scores table.
+    `records` are tuples in LEVEL_SCORE_COLUMNS order. Uses the same COPY + single
+    upsert path as insert_forecast_data.
+    """
+    if not records:
+        return
+
+    async with acquire_db_connection("insert_level_scores") as conn:
+        try:
+            try:
+                await _bulk_upsert(conn, 'level_scores', LEVEL_SCORE_COLUMNS, records, _LEVEL_SCORE_UPSERT_CONFLICT)
+            except Exception as e:
+                print(f"Bulk level scores upsert for {spot_id} failed ({e}). Retrying row by row...")
+                records = await _row_by_row_upsert(
+                    conn, 'level_scores', LEVEL_SCORE_COLUMNS, records, _LEVEL_SCORE_UPSERT_CONFLICT,
+                    lambda record: f"level score for {spot_id} ({record[0]}) at {record[2]}"
+                )
+            await _notify_forecast_update(conn, 'level_scores', spot_id, [record[2] for record in records])
+        finally:
+            level_score_cache.invalidate_spot(spot_id)
+
+# As consultas frequentes abaixo são registradas com register_statement e preparadas uma vez
+# em cada conexão do pool (src/db/connection.py); o mesmo SQL não é reenviado a cada chamada.
+_SPOT_COLUMNS = "spot_id, spot_name, latitude::float8 AS latitude, longitude::float8 AS longitude, timezone"
+_ALL_SPOTS_STATEMENT = register_statement('all_spots', f"SELECT {_SPOT_COLUMNS} FROM spots ORDER BY spot_id;")
+_SPOT_BY_ID_STATEMENT = register_statement('spot_by_id', f"SELECT {_SPOT_COLUMNS} FROM spots WHERE spot_id = $1;")
+_SPOTS_BY_IDS_STATEMENT = register_statement('spots_by_ids', f"SELECT {_SPOT_COLUMNS} FROM spots WHERE spot_id = ANY($1::int[]);")
+
 async def get_all_spots():
     """
     Recupera todos os spots de surf do banco de dados.
     Retorna uma lista de dicionários, cada um representando um spot, com chaves em snake_case.
     """
-    conn = await get_async_db_connection()
-    try:
-        rows = await conn.fetch("SELECT spot_id, spot_name, latitude, longitude, timezone FROM spots ORDER BY spot_id;")
+    async with acquire_db_connection("get_all_spots") as conn:
+        rows = await fetch_statement(conn, _ALL_SPOTS_STATEMENT)
         if not rows:
             print("No spots found in the database. Please add spots.")
             return []
         return [dict(row) for row in rows]
-    finally:
-        await release_async_db_connection(conn)
 
 async def get_spot_by_id(spot_id):
     """
     Fetches details for a single surf spot by its ID.
     Returns a dictionary with keys in snake_case.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow("SELECT spot_id, spot_name, latitude, longitude, timezone FROM spots WHERE spot_id = $1;", spot_id)
+    async with acquire_db_connection("get_spot_by_id") as conn:
+        row = await fetchrow_statement(conn, _SPOT_BY_ID_STATEMENT, spot_id)
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
 
 async def get_forecasts_from_db(spot_id, start_utc, end_utc):
     """
     Fetches forecast data for a specific spot within a given UTC time range.
-    Returns a list of dictionaries with forecast entries.
+    Returns a list of ForecastHour records.
+    Served through the (spot_id, UTC day) cache; the records are immutable and shared.
     """
-    conn = await get_async_db_connection()
-    try:
-        rows = await conn.fetch(
-            """
-            SELECT
-                timestamp_utc, wave_height_sg, wave_direction_sg, wave_period_sg,
-                swell_height_sg, swell_direction_sg, swell_period_sg,
-                secondary_swell_height_sg, secondary_swell_direction_sg, secondary_swell_period_sg,
-                wind_speed_sg, wind_direction_sg, water_temperature_sg, air_temperature_sg,
-                current_speed_sg, current_direction_sg, sea_level_sg
-            FROM forecasts
-            WHERE spot_id = $1 AND timestamp_utc BETWEEN $2 AND $3
-            ORDER BY timestamp_utc;
-            """,
-            spot_id, start_utc, end_utc
-        )
-        return [dict(row) for row in rows]
-    finally:
-        await release_async_db_connection(conn)
+    grouped = await get_forecasts_for_spots_from_db([spot_id], start_utc, end_utc)
+    return [entry for day in sorted(grouped[spot_id]) for entry in grouped[spot_id][day]]
 
 async def get_tides_forecast_from_db(spot_id, start_utc, end_utc):
     """
     Fetches tide forecast data for a specific spot within a given UTC time range.
-    Returns a list of dictionaries with tide entries.
+    Returns a list of TideExtreme records.
+    Served through the (spot_id, UTC day) cache; the records are immutable and shared.
+    """
+    grouped = await get_tides_forecast_for_spots_from_db([spot_id], start_utc, end_utc)
+    return [entry for day in sorted(grouped[spot_id]) for entry in grouped[spot_id][day]]
+
+async def get_spots_by_ids(spot_ids):
+    """
+    Fetches details for many surf spots in a single query.
+    Returns a dictionary {spot_id: spot dict}; missing IDs are simply absent.
+    """
+    async with acquire_db_connection("get_spots_by_ids") as conn:
+        rows = await fetch_statement(conn, _SPOTS_BY_IDS_STATEMENT, list(spot_ids))
+        return {row['spot_id']: dict(row) for row in rows}
+
+def _group_rows_by_spot_and_day(rows, spot_ids, to_entry):
+    """
+    Groups rows that carry 'spot_id' and 'timestamp_utc' into {spot_id: {utc_date: [entries]}},
+    where each entry is `to_entry(row)` (a record from src.db.records).
+    Every requested spot gets an entry, even when it has no rows.
+    """
+    grouped = {spot_id: {} for spot_id in spot_ids}
+    for row in rows:
+        entry = to_entry(row)
+        day = entry.timestamp_utc.astimezone(datetime.timezone.utc).date()
+        grouped.setdefault(row['spot_id'], {}).setdefault(day, []).append(entry)
+    return grouped
+
+def _utc_days(start_utc, end_utc):
+    first_day = start_utc.astimezone(datetime.timezone.utc).date()
+    last_day = end_utc.astimezone(datetime.timezone.utc).date()
+    return [first_day + datetime.timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+async def _get_rows_by_spot_and_day_cached(cache, fetch_rows, to_entry, spot_ids, start_utc, end_utc, key_suffix=()):
+    """
+    Read-through lookup of whole UTC days in `cache`, keyed by (spot_id, day) + key_suffix.
+    Missing days are fetched with a single `fetch_rows(spot_ids, day_start, day_end)` call,
+    converted with `to_entry`, stored (including empty days) and the result is trimmed to
+    [start_utc, end_utc].
+    Returns {spot_id: {utc_date: [entries]}} with only the days that have rows.
+    """
+    spot_ids = list(dict.fromkeys(spot_ids))
+    days = _utc_days(start_utc, end_utc)
+    grouped = {spot_id: {} for spot_id in spot_ids}
+    missing = []
+    for spot_id in spot_ids:
+        for day in days:
+            day_rows = cache.get((spot_id, day) + key_suffix)
+            if day_rows is None:
+                missing.append((spot_id, day))
+            else:
+                grouped[spot_id][day] = day_rows
+
+    if missing:
+        generation = cache.generation
+        missing_spots = list(dict.fromkeys(spot_id for spot_id, _ in missing))
+        missing_days = [day for _, day in missing]
+        fetch_start = datetime.datetime.combine(min(missing_days), datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+        fetch_end = datetime.datetime.combine(max(missing_days), datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+        fetched = _group_rows_by_spot_and_day(await fetch_rows(missing_spots, fetch_start, fetch_end), missing_spots, to_entry)
+        for spot_id, day in missing:
+            day_rows = fetched[spot_id].get(day, [])
+            cache.set((spot_id, day) + key_suffix, day_rows, generation=generation)
+            grouped[spot_id][day] = day_rows
+
+    # Only the first and last days can be partially outside the requested range.
+    partial_days = set()
+    if start_utc > datetime.datetime.combine(days[0], datetime.time.min).replace(tzinfo=datetime.timezone.utc):
+        partial_days.add(days[0])
+    if end_utc < datetime.datetime.combine(days[-1], datetime.time.max).replace(tzinfo=datetime.timezone.utc):
+        partial_days.add(days[-1])
+    for spot_id, days_rows in grouped.items():
+        for day in list(days_rows):
+            day_rows = days_rows[day]
+            if day in partial_days:
+                day_rows = [row for row in day_rows if start_utc <= row.timestamp_utc <= end_utc]
+            if day_rows:
+                days_rows[day] = day_rows
+            else:
+                del days_rows[day]
+    return grouped
+
+def _window_day_segments(start_utc, end_utc):
+    """Splits [start_utc, end_utc] into (utc_date, segment_start, segment_end) pieces, one per UTC day."""
+    segments = []
+    for day in _utc_days(start_utc, end_utc):
+        day_start = datetime.datetime.combine(day, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+        day_end = datetime.datetime.combine(day, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+        segments.append((day, max(start_utc, day_start), min(end_utc, day_end)))
+    return segments
+
+async def _get_window_rows_cached(cache, fetch_window_rows, to_entry, windows, key_suffix=()):
+    """
+    Read-through lookup of time windows in `cache`.
+    `windows` is a list of (spot_id, start_utc, end_utc). Each window is split into UTC-day
+    segments cached under (spot_id, day, segment_start, segment_end) + key_suffix, so
+    invalidate_days/invalidate_spot still apply. A whole day cached by
+    _get_rows_by_spot_and_day_cached under (spot_id, day) + key_suffix is trimmed instead.
+    Missing segments are fetched with a single `fetch_window_rows(spot_ids, starts, ends)`
+    call whose rows carry a 0-based 'window_index' into those arrays, and are converted
+    with `to_entry`.
+    Returns a list of entry lists (ordered by timestamp) aligned with `windows`.
+    """
+    segment_rows = {}
+    missing = []
+    for spot_id, start_utc, end_utc in windows:
+        for day, segment_start, segment_end in _window_day_segments(start_utc, end_utc):
+            key = (spot_id, day, segment_start, segment_end) + key_suffix
+            if key in segment_rows:
+                continue
+            rows = cache.get(key)
+            if rows is None:
+                day_rows = cache.get((spot_id, day) + key_suffix)
+                if day_rows is not None:
+                    rows = [row for row in day_rows if segment_start <= row.timestamp_utc <= segment_end]
+            if rows is None:
+                missing.append(key)
+            segment_rows[key] = rows
+
+    if missing:
+        generation = cache.generation
+        fetched = [[] for _ in missing]
+        for row in await fetch_window_rows(
+            [key[0] for key in missing], [key[2] for key in missing], [key[3] for key in missing]
+        ):
+            fetched[row['window_index']].append(to_entry(row))
+        for key, rows in zip(missing, fetched):
+            cache.set(key, rows, generation=generation)
+            segment_rows[key] = rows
+
+    return [
+        [
+            row
+            for day, segment_start, segment_end in _window_day_segments(start_utc, end_utc)
+            for row in segment_rows[(spot_id, day, segment_start, segment_end) + key_suffix]
+        ]
+        for spot_id, start_utc, end_utc in windows
+    ]
+
+_FORECAST_ROWS_STATEMENT = register_statement('forecast_rows', f"""
+    SELECT
+        spot_id, timestamp_utc, {_float_columns(_FORECAST_VALUE_COLUMNS)}
+    FROM forecasts
+    WHERE spot_id = ANY($1::int[]) AND timestamp_utc BETWEEN $2 AND $3
+    ORDER BY spot_id, timestamp_utc;
+""")
+
+_FORECAST_WINDOW_ROWS_STATEMENT = register_statement('forecast_window_rows', f"""
+    SELECT
+        w.window_index - 1 AS window_index,
+        f.timestamp_utc, {_float_columns(_FORECAST_VALUE_COLUMNS, 'f.')}
+    FROM unnest($1::int[], $2::timestamptz[], $3::timestamptz[])
+        WITH ORDINALITY AS w(spot_id, start_utc, end_utc, window_index)
+    JOIN forecasts f ON f.spot_id = w.spot_id AND f.timestamp_utc BETWEEN w.start_utc AND w.end_utc
+    ORDER BY w.window_index, f.timestamp_utc;
+""")
+
+_TIDE_ROWS_STATEMENT = register_statement('tide_rows', """
+    SELECT
+        spot_id, timestamp_utc, tide_type, height::float8 AS height
+    FROM tides_forecast
+    WHERE spot_id = ANY($1::int[]) AND timestamp_utc BETWEEN $2 AND $3
+    ORDER BY spot_id, timestamp_utc;
+""")
+
+async def _fetch_forecast_rows(spot_ids, start_utc, end_utc):
+    async with acquire_db_connection("_fetch_forecast_rows") as conn:
+        return await fetch_statement(conn, _FORECAST_ROWS_STATEMENT, spot_ids, start_utc, end_utc)
+
+async def _fetch_forecast_window_rows(spot_ids, starts_utc, ends_utc):
+    async with acquire_db_connection("_fetch_forecast_window_rows") as conn:
+        return await fetch_statement(conn, _FORECAST_WINDOW_ROWS_STATEMENT, spot_ids, starts_utc, ends_utc)
+
+async def _fetch_tide_rows(spot_ids, start_utc, end_utc):
+    async with acquire_db_connection("_fetch_tide_rows") as conn:
+        return await fetch_statement(conn, _TIDE_ROWS_STATEMENT, spot_ids, start_utc, end_utc)
+
+async def stream_forecast_rows_for_days(spot_ids, day_ranges, prefetch=500):
+    """
+    Streams forecast rows for every (day range, spot) pair through a server-side cursor,
+    so only `prefetch` rows are held in memory at a time.
+    `day_ranges` is a list of (start_utc, end_utc). Rows are ordered by day range, then by
+    the position of the spot in `spot_ids`, then by timestamp, and carry 'day_index' and
+    'spot_index' (0-based positions in `day_ranges` and `spot_ids`).
+    """
+    async with acquire_db_connection("stream_forecast_rows_for_days") as conn:
+        # Cursores do asyncpg só existem dentro de uma transação.
+        async with conn.transaction():
+            async for row in conn.cursor(
+                f"""
+                SELECT
+                    d.day_index - 1 AS day_index, s.spot_index - 1 AS spot_index,
+                    f.spot_id, f.timestamp_utc, {_float_columns(_FORECAST_VALUE_COLUMNS, 'f.')}
+                FROM unnest($2::timestamptz[], $3::timestamptz[]) WITH ORDINALITY AS d(start_utc, end_utc, day_index)
+                CROSS JOIN unnest($1::int[]) WITH ORDINALITY AS s(spot_id, spot_index)
+                JOIN forecasts f ON f.spot_id = s.spot_id AND f.timestamp_utc BETWEEN d.start_utc AND d.end_utc
+                ORDER BY d.day_index, s.spot_index, f.timestamp_utc;
+                """,
+                list(spot_ids), [start for start, _ in day_ranges], [end for _, end in day_ranges],
+                prefetch=prefetch
+            ):
+                yield row
+
+async def get_forecasts_for_spots_from_db(spot_ids, start_utc, end_utc):
+    """
+    Fetches forecast data for many spots within a single UTC time range.
+    Days not in the cache are loaded in one query.
+    Returns {spot_id: {utc_date: [ForecastHour records ordered by timestamp]}}.
+    """
+    return await _get_rows_by_spot_and_day_cached(
+        forecast_cache, _fetch_forecast_rows, ForecastHour.from_record, spot_ids, start_utc, end_utc
+    )
+
+async def get_forecast_windows_from_db(windows):
+    """
+    Fetches forecast data for many (spot_id, start_utc, end_utc) windows, transferring only
+    the hours inside each window. Windows not in the cache are loaded in one query.
+    Returns a list of ForecastHour lists (ordered by timestamp) aligned with `windows`.
+    """
+    return await _get_window_rows_cached(forecast_cache, _fetch_forecast_window_rows, ForecastHour.from_record, windows)
+
+_FORECAST_COLUMNS_STATEMENT = register_statement('forecast_columns', f"""
+    SELECT
+        spot_id,
+        array_agg((extract(epoch FROM timestamp_utc) * 1000000)::int8 ORDER BY timestamp_utc) AS timestamp_utc,
+        {', '.join(f"array_agg({column}::float8 ORDER BY timestamp_utc) AS {column}" for column in _FORECAST_VALUE_COLUMNS)}
+    FROM forecasts
+    WHERE spot_id = ANY($1::int[]) AND timestamp_utc BETWEEN $2 AND $3
+    GROUP BY spot_id;
+""")
+
+async def get_forecast_columns_for_spots_from_db(spot_ids, start_utc, end_utc):
+    """
+    Fetches forecast data for many spots within a single UTC time range as columns
+    (struct of arrays), without building one dict per hour. Each column is aggregated
+    with array_agg in SQL and decoded straight into a NumPy array.
+    Returns {spot_id: {'timestamp_utc': datetime64[us] array (UTC), <column>: float64 array}}
+    with NaN for missing values, ordered by timestamp. Spots without rows are absent.
+    """
+    async with acquire_db_connection("get_forecast_columns_for_spots_from_db") as conn:
+        rows = await fetch_statement(conn, _FORECAST_COLUMNS_STATEMENT, list(spot_ids), start_utc, end_utc)
+
+    columns_by_spot = {}
+    for row in rows:
+        # None vira NaN na conversão para float64.
+        columns = {column: np.array(row[column], dtype=np.float64) for column in _FORECAST_VALUE_COLUMNS}
+        columns['timestamp_utc'] = np.array(row['timestamp_utc'], dtype=np.int64).view('datetime64[us]')
+        columns_by_spot[row['spot_id']] = columns
+    return columns_by_spot
+
+async def get_tides_forecast_for_spots_from_db(spot_ids, start_utc, end_utc):
+    """
+    Fetches tide extremes for many spots within a single UTC time range.
+    Days not in the cache are loaded in one query.
+    Returns {spot_id: {utc_date: [TideExtreme records ordered by timestamp]}}.
+    """
+    return await _get_rows_by_spot_and_day_cached(
+        tide_cache, _fetch_tide_rows, TideExtreme.from_record, spot_ids, start_utc, end_utc
+    )
+
+_LEVEL_SCORE_WINDOW_ROWS_STATEMENT = register_statement('level_score_window_rows', """
+    SELECT
+        w.window_index - 1 AS window_index,
+        l.timestamp_utc, l.suitability_score, l.wave_score, l.wind_score, l.tide_score,
+        l.water_temperature_score, l.air_temperature_score, l.current_score
+    FROM unnest($2::int[], $3::timestamptz[], $4::timestamptz[])
+        WITH ORDINALITY AS w(spot_id, start_utc, end_utc, window_index)
+    JOIN level_scores l
+        ON l.surf_level = $1 AND l.spot_id = w.spot_id AND l.timestamp_utc BETWEEN w.start_utc AND w.end_utc
+    ORDER BY w.window_index, l.timestamp_utc;
+""")
+
+def _fetch_level_score_window_rows(surf_level):
+    async def fetch_window_rows(spot_ids, starts_utc, ends_utc):
+        async with acquire_db_connection("_fetch_level_score_window_rows") as conn:
+            return await fetch_statement(
+                conn, _LEVEL_SCORE_WINDOW_ROWS_STATEMENT, surf_level, spot_ids, starts_utc, ends_utc
+            )
+    return fetch_window_rows
+
+async def get_level_score_windows_from_db(surf_level, windows):
     """
-    conn = await get_async_db_connection()
-    try:
-        rows = await conn.fetch(
-            """
-            SELECT
-                timestamp_utc, tide_type, height
-            FROM tides_forecast
-            WHERE spot_id = $1 AND timestamp_utc BETWEEN $2 AND $3
-            ORDER BY timestamp_utc;
-            """,
-            spot_id, start_utc, end_utc
-        )
-        return [dict(row) for row in rows]
-    finally:
-        await release_async_db_connection(conn)
+    Fetches the precomputed scores of `surf_level` for many (spot_id, start_utc, end_utc) windows.
+    Windows not in the cache are loaded in one query.
+    Returns a list of LevelScoreHour lists (ordered by timestamp) aligned with `windows`.
+    """
+    return await _get_window_rows_cached(
+        level_score_cache, _fetch_level_score_window_rows(surf_level), LevelScoreHour.from_record, windows,
+        key_suffix=(surf_level,)
+    )
 
 # --- Funções de Usuário ---
 
 async def create_user(name, email, password_hash, surf_level, goofy_regular_stance,
                 preferred_wave_direction, bio, profile_picture_url):
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("create_user") as conn:
         user_id = await conn.fetchval(
             """
             INSERT INTO users (name, email, password_hash, surf_level, goofy_regular_stance,
@@ -230,35 +658,28 @@ async def create_user(name, email, password_hash, surf_level, goofy_regular_stan
             preferred_wave_direction, bio, profile_picture_url
         )
         return user_id
-    finally:
-        await release_async_db_connection(conn)
 
 async def get_user_by_email(email):
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("get_user_by_email") as conn:
         row = await conn.fetchrow("SELECT * FROM users WHERE email = $1;", email)
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
+
+_USER_BY_ID_STATEMENT = register_statement(
+    'user_by_id',
+    "SELECT user_id, name, email, password_hash, surf_level, goofy_regular_stance, preferred_wave_direction, bio, profile_picture_url, registration_timestamp, last_login_timestamp FROM users WHERE user_id = $1;"
+)
 
 async def get_user_by_id(user_id):
     """
     Fetches user data by user_id.
     Returns a dictionary with keys in snake_case.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow(
-            "SELECT user_id, name, email, password_hash, surf_level, goofy_regular_stance, preferred_wave_direction, bio, profile_picture_url, registration_timestamp, last_login_timestamp FROM users WHERE user_id = $1;",
-            user_id
-        )
+    async with acquire_db_connection("get_user_by_id") as conn:
+        row = await fetchrow_statement(conn, _USER_BY_ID_STATEMENT, user_id)
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
 
 async def update_user_last_login(user_id):
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("update_user_last_login") as conn:
         await conn.execute(
             """
             UPDATE users
@@ -267,36 +688,49 @@ async def update_user_last_login(user_id):
             """,
             str(user_id)
         )
-    finally:
-        await release_async_db_connection(conn)
 
 async def update_user_profile(user_id, updates: dict):
     if not updates:
         return
-    conn = await get_async_db_connection()
-    try:
-        query_parts = []
-        values_for_query = []
-        for key, value in updates.items():
-            query_parts.append(f"{key} = ${len(values_for_query)+1}")
-            values_for_query.append(value)
-        query_sql = f"UPDATE users SET {', '.join(query_parts)} WHERE user_id = ${len(values_for_query)+1};"
-        values_for_query.append(str(user_id))
-        await conn.execute(query_sql, *values_for_query)
-    finally:
-        await release_async_db_connection(conn)
+    async with acquire_db_connection("update_user_profile") as conn:
+        try:
+            query_parts = []
+            values_for_query = []
+            for key, value in updates.items():
+                query_parts.append(f"{key} = ${len(values_for_query)+1}")
+                values_for_query.append(value)
+            query_sql = f"UPDATE users SET {', '.join(query_parts)} WHERE user_id = ${len(values_for_query)+1};"
+            values_for_query.append(str(user_id))
+            await conn.execute(query_sql, *values_for_query)
+            if 'surf_level' in updates:
+                await _notify_preferences_update(conn, user_id)
+        finally:
+            if 'surf_level' in updates:
+                invalidate_user_preferences(user_id)
+
+_USER_SURF_LEVEL_STATEMENT = register_statement('user_surf_level', "SELECT surf_level FROM users WHERE user_id = $1;")
 
 async def get_user_surf_level(user_id):
     """
     Recupera o nível de surf de um usuário pelo seu ID.
     Retorna o nível de surf como string ou None se não encontrado.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow("SELECT surf_level FROM users WHERE user_id = $1;", str(user_id))
+    async with acquire_db_connection("get_user_surf_level") as conn:
+        row = await fetchrow_statement(conn, _USER_SURF_LEVEL_STATEMENT, str(user_id))
         return row['surf_level'] if row else None
-    finally:
-        await release_async_db_connection(conn)
+
+_SPOT_PREFERENCES_STATEMENTS = {
+    # Condição is_active = TRUE apenas para user_spot_preferences
+    'user': register_statement(
+        'user_spot_preferences',
+        "SELECT * FROM user_spot_preferences WHERE user_id = $1 AND spot_id = $2 AND is_active = TRUE;"
+    ),
+    # Para model_spot_preferences, não há is_active ou ele é sempre TRUE
+    'model': register_statement(
+        'model_spot_preferences',
+        "SELECT * FROM model_spot_preferences WHERE user_id = $1 AND spot_id = $2;"
+    )
+}
 
 async def get_spot_preferences(user_id, spot_id, preference_type='model'):
     """
@@ -304,37 +738,110 @@ async def get_spot_preferences(user_id, spot_id, preference_type='model'):
     podendo ser do modelo ('model') ou manual ('user').
     Retorna um dicionário com as preferências ou None.
     """
-    if preference_type == 'model':
-        table_name = "model_spot_preferences"
-    elif preference_type == 'user':
-        table_name = "user_spot_preferences"
-    else:
+    statement = _SPOT_PREFERENCES_STATEMENTS.get(preference_type)
+    if statement is None:
         raise ValueError("preference_type deve ser 'model' ou 'user'.")
-    conn = await get_async_db_connection()
-    try:
-        # Adicionar condição is_active = TRUE apenas para user_spot_preferences
-        if preference_type == 'user':
-            row = await conn.fetchrow(f"SELECT * FROM {table_name} WHERE user_id = $1 AND spot_id = $2 AND is_active = TRUE;", str(user_id), spot_id)
-        else: # Para model_spot_preferences, não há is_active ou ele é sempre TRUE
-            row = await conn.fetchrow(f"SELECT * FROM {table_name} WHERE user_id = $1 AND spot_id = $2;", str(user_id), spot_id)
+    async with acquire_db_connection("get_spot_preferences") as conn:
+        row = await fetchrow_statement(conn, statement, str(user_id), spot_id)
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
+
+_LEVEL_SPOT_PREFERENCES_STATEMENT = register_statement(
+    'level_spot_preferences', "SELECT * FROM level_spot_preferences WHERE surf_level = $1 AND spot_id = $2;"
+)
+_LEVEL_SPOT_PREFERENCES_FOR_SPOT_STATEMENT = register_statement(
+    'level_spot_preferences_for_spot', "SELECT * FROM level_spot_preferences WHERE spot_id = $1 ORDER BY surf_level;"
+)
 
 async def get_level_spot_preferences(surf_level, spot_id):
     """
     Recupera as preferências de um spot para um nível de surf específico.
     Retorna um dicionário com as preferências ou None.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow(
-            "SELECT * FROM level_spot_preferences WHERE surf_level = $1 AND spot_id = $2;",
-            surf_level, spot_id
-        )
+    async with acquire_db_connection("get_level_spot_preferences") as conn:
+        row = await fetchrow_statement(conn, _LEVEL_SPOT_PREFERENCES_STATEMENT, surf_level, spot_id)
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
+
+async def get_level_spot_preferences_for_spot(spot_id):
+    """
+    Recupera as preferências padrão de todos os níveis de surf para um spot.
+    Retorna uma lista de SpotPreferences (vazia se não houver nenhuma).
+    """
+    async with acquire_db_connection("get_level_spot_preferences_for_spot") as conn:
+        rows = await fetch_statement(conn, _LEVEL_SPOT_PREFERENCES_FOR_SPOT_STATEMENT, spot_id)
+        return [SpotPreferences.from_mapping(dict(row)) for row in rows]
+
+# Preferências efetivas por spot, na ordem de prioridade: manuais do usuário (ativas),
+# do modelo e, por fim, as padrão do nível de surf.
+_EFFECTIVE_PREFERENCES_STATEMENT = register_statement('effective_spot_preferences', """
+    SELECT
+        s.spot_id,
+        CASE
+            WHEN u.preferences IS NOT NULL THEN 'user'
+            WHEN m.preferences IS NOT NULL THEN 'model'
+            WHEN l.preferences IS NOT NULL THEN 'level'
+        END AS preference_source,
+        COALESCE(u.preferences, m.preferences, l.preferences) AS preferences
+    FROM unnest($1::int[]) AS s(spot_id)
+    LEFT JOIN LATERAL (
+        SELECT to_jsonb(p) AS preferences FROM user_spot_preferences p
+        WHERE p.user_id = $2 AND p.spot_id = s.spot_id AND p.is_active = TRUE
+        LIMIT 1
+    ) u ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT to_jsonb(p) AS preferences FROM model_spot_preferences p
+        WHERE p.user_id = $2 AND p.spot_id = s.spot_id
+        LIMIT 1
+    ) m ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT to_jsonb(p) AS preferences FROM level_spot_preferences p
+        WHERE p.surf_level = $3 AND p.spot_id = s.spot_id
+        LIMIT 1
+    ) l ON TRUE;
+""")
+
+async def get_effective_spot_preferences(user_id, spot_ids, surf_level):
+    """
+    Resolves the preferences used for each spot in a single query: the user's active
+    manual preferences ('user'), then the model's ('model'), then the surf level
+    defaults ('level').
+    Returns {spot_id: (preference_source, SpotPreferences)}, with (None, None) when no
+    preference exists. Results are cached per user in `preference_cache`.
+    """
+    user_key = str(user_id)
+    spot_ids = list(dict.fromkeys(spot_ids))
+    resolved = {}
+    missing = []
+    for spot_id in spot_ids:
+        cached = preference_cache.get((user_key, surf_level, spot_id))
+        if cached is None:
+            missing.append(spot_id)
+        else:
+            resolved[spot_id] = cached
+
+    if missing:
+        generation = preference_cache.generation
+        async with acquire_db_connection("get_effective_spot_preferences") as conn:
+            rows = await fetch_statement(conn, _EFFECTIVE_PREFERENCES_STATEMENT, missing, user_key, surf_level)
+        for row in rows:
+            preferences = SpotPreferences.from_mapping(json.loads(row['preferences'])) if row['preferences'] is not None else None
+            resolved[row['spot_id']] = (row['preference_source'], preferences)
+            preference_cache.set((user_key, surf_level, row['spot_id']), resolved[row['spot_id']], generation=generation)
+    return resolved
+
+async def _notify_preferences_update(conn, user_id):
+    """
+    Publishes a NOTIFY on FORECAST_UPDATES_CHANNEL so every API worker evicts the
+    cached preferences of `user_id`.
+    """
+    payload = json.dumps({"table": "user_spot_preferences", "user_id": str(user_id)})
+    try:
+        await conn.execute("SELECT pg_notify($1, $2);", FORECAST_UPDATES_CHANNEL, payload)
+    except Exception as e:
+        print(f"Error notifying preferences update for {user_id}: {e}")
+
+def invalidate_user_preferences(user_id):
+    """Evicts the cached effective preferences of `user_id` in this worker."""
+    preference_cache.invalidate_spot(str(user_id))
 
 # --- Funções para user_recommendation_presets ---
 
@@ -343,8 +850,7 @@ async def create_user_recommendation_preset(user_id, preset_name, spot_ids, star
     Cria um novo preset de recomendação para um usuário.
     Agora usa 'weekdays'.
     """
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("create_user_recommendation_preset") as conn:
         if is_default:
             await conn.execute("UPDATE user_recommendation_presets SET is_default = FALSE WHERE user_id = $1 AND is_default = TRUE;", str(user_id))
         
@@ -360,44 +866,51 @@ async def create_user_recommendation_preset(user_id, preset_name, spot_ids, star
             str(user_id), preset_name, spot_ids, start_time, end_time, weekdays_value, is_default
         )
         return preset_id
-    finally:
-        await release_async_db_connection(conn)
 
 async def get_user_recommendation_presets(user_id):
     """
     Recupera todos os presets de recomendação de um usuário.
     Retorna uma lista de dicionários.
     """
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("get_user_recommendation_presets") as conn:
         rows = await conn.fetch("SELECT * FROM user_recommendation_presets WHERE user_id = $1 AND is_active = TRUE ORDER BY preset_name;", str(user_id))
         return [dict(row) for row in rows]
-    finally:
-        await release_async_db_connection(conn)
+
+_DEFAULT_USER_PRESET_STATEMENT = register_statement(
+    'default_user_preset',
+    "SELECT * FROM user_recommendation_presets WHERE user_id = $1 AND is_default = TRUE AND is_active = TRUE;"
+)
+_USER_PRESET_BY_ID_STATEMENT = register_statement(
+    'user_preset_by_id',
+    "SELECT * FROM user_recommendation_presets WHERE preset_id = $1 AND user_id = $2 AND is_active = TRUE;"
+)
 
 async def get_default_user_recommendation_preset(user_id):
     """
     Recupera o preset de recomendação padrão (is_default = TRUE) de um usuário.
     Retorna um dicionário ou None.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow("SELECT * FROM user_recommendation_presets WHERE user_id = $1 AND is_default = TRUE AND is_active = TRUE;", str(user_id))
+    async with acquire_db_connection("get_default_user_recommendation_preset") as conn:
+        row = await fetchrow_statement(conn, _DEFAULT_USER_PRESET_STATEMENT, str(user_id))
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
+
+async def get_active_default_presets():
+    """
+    Recupera os presets padrão ativos de todos os usuários, usados no pré-aquecimento do cache.
+    Retorna uma lista de dicionários.
+    """
+    async with acquire_db_connection("get_active_default_presets") as conn:
+        rows = await conn.fetch("SELECT * FROM user_recommendation_presets WHERE is_default = TRUE AND is_active = TRUE ORDER BY preset_id;")
+        return [dict(row) for row in rows]
 
 async def get_user_recommendation_preset_by_id(preset_id, user_id):
     """
     Recupera um preset de recomendação específico pelo ID e user_id.
     Retorna um dicionário ou None.
     """
-    conn = await get_async_db_connection()
-    try:
-        row = await conn.fetchrow("SELECT * FROM user_recommendation_presets WHERE preset_id = $1 AND user_id = $2 AND is_active = TRUE;", preset_id, str(user_id))
+    async with acquire_db_connection("get_user_recommendation_preset_by_id") as conn:
+        row = await fetchrow_statement(conn, _USER_PRESET_BY_ID_STATEMENT, preset_id, str(user_id))
         return dict(row) if row else None
-    finally:
-        await release_async_db_connection(conn)
 
 async def update_user_recommendation_preset(preset_id, user_id, updates: dict):
     """
@@ -406,8 +919,7 @@ async def update_user_recommendation_preset(preset_id, user_id, updates: dict):
     if not updates:
         return False
     
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("update_user_recommendation_preset") as conn:
         query_parts = []
         values_for_query = []
         
@@ -426,16 +938,13 @@ async def update_user_recommendation_preset(preset_id, user_id, updates: dict):
         result = await conn.execute(query_sql, *values_for_query)
         return result[-1] != '0'  # rowcount > 0
         
-    finally:
-        await release_async_db_connection(conn)
 
 
 async def delete_user_recommendation_preset(preset_id, user_id):
     """
     "Soft-deleta" um preset de recomendação, marcando-o como inativo.
     """
-    conn = await get_async_db_connection()
-    try:
+    async with acquire_db_connection("delete_user_recommendation_preset") as conn:
         result = await conn.execute(
             """
             UPDATE user_recommendation_presets
@@ -445,42 +954,42 @@ async def delete_user_recommendation_preset(preset_id, user_id):
             preset_id, str(user_id)
         )
         return result[-1] != '0'  # rowcount > 0
-    finally:
-        await release_async_db_connection(conn)
 
 async def set_user_spot_preferences(user_id, spot_id, preferences: dict):
     # ON CONFLICT lida com inserções e atualizações.
-    conn = await get_async_db_connection()
-    try:
-        # As chaves em 'preferences' devem corresponder aos nomes das colunas
-        columns = ", ".join(preferences.keys())
-        placeholders = ", ".join([f"${i+3}" for i in range(len(preferences))])
-        update_setters = ", ".join([f"{key} = EXCLUDED.{key}" for key in preferences.keys()])
-
-        query = f"""
-        INSERT INTO user_spot_preferences (user_id, spot_id, {columns})
-        VALUES ($1, $2, {placeholders})
-        ON CONFLICT (user_id, spot_id) DO UPDATE SET
-        {update_setters};
-        """
-        await conn.execute(query, str(user_id), spot_id, *preferences.values())
-    finally:
-        await release_async_db_connection(conn)
+    async with acquire_db_connection("set_user_spot_preferences") as conn:
+        try:
+            # As chaves em 'preferences' devem corresponder aos nomes das colunas
+            columns = ", ".join(preferences.keys())
+            placeholders = ", ".join([f"${i+3}" for i in range(len(preferences))])
+            update_setters = ", ".join([f"{key} = EXCLUDED.{key}" for key in preferences.keys()])
+
+            query = f"""
+            INSERT INTO user_spot_preferences (user_id, spot_id, {columns})
+            VALUES ($1, $2, {placeholders})
+            ON CONFLICT (user_id, spot_id) DO UPDATE SET
+            {update_setters};
+            """
+            await conn.execute(query, str(user_id), spot_id, *preferences.values())
+            await _notify_preferences_update(conn, user_id)
+        finally:
+            invalidate_user_preferences(user_id)
 
 async def toggle_spot_preference_active(user_id, spot_id, is_active: bool):
-    conn = await get_async_db_connection()
-    try:
-        # Atualiza a coluna 'is_active' na tabela user_spot_preferences
-        await conn.execute(
-            """
-            UPDATE user_spot_preferences
-            SET is_active = $1
-            WHERE user_id = $2 AND spot_id = $3;
-            """,
-            is_active, str(user_id), spot_id
-        )
-    finally:
-        await release_async_db_connection(conn)
+    async with acquire_db_connection("toggle_spot_preference_active") as conn:
+        try:
+            # Atualiza a coluna 'is_active' na tabela user_spot_preferences
+            await conn.execute(
+                """
+                UPDATE user_spot_preferences
+                SET is_active = $1
+                WHERE user_id = $2 AND spot_id = $3;
+                """,
+                is_active, str(user_id), spot_id
+            )
+            await _notify_preferences_update(conn, user_id)
+        finally:
+            invalidate_user_preferences(user_id)
 
 
 # --- Sugestão de índice para performance ---
@@ -0,0 +1,126 @@
+import dataclasses
+import datetime
+
+# Registros imutáveis (dataclass frozen + slots) produzidos pela camada de consultas.
+# Sem __dict__ por instância, cada linha ocupa bem menos memória que um dict com as mesmas
+# chaves, e os campos são lidos como atributos. Por serem imutáveis, podem ser compartilhados
+# entre requisições pelos caches sem risco de uma alterar o que a outra lê.
+# orjson e o jsonable_encoder do FastAPI serializam dataclasses diretamente.
+
+def _field_names(cls):
+    return tuple(field.name for field in dataclasses.fields(cls))
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ForecastHour:
+    """Uma hora da tabela forecasts."""
+    timestamp_utc: datetime.datetime
+    wave_height_sg: float | None = None
+    wave_direction_sg: float | None = None
+    wave_period_sg: float | None = None
+    swell_height_sg: float | None = None
+    swell_direction_sg: float | None = None
+    swell_period_sg: float | None = None
+    secondary_swell_height_sg: float | None = None
+    secondary_swell_direction_sg: float | None = None
+    secondary_swell_period_sg: float | None = None
+    wind_speed_sg: float | None = None
+    wind_direction_sg: float | None = None
+    water_temperature_sg: float | None = None
+    air_temperature_sg: float | None = None
+    current_speed_sg: float | None = None
+    current_direction_sg: float | None = None
+    sea_level_sg: float | None = None
+
+    @classmethod
+    def from_record(cls, row):
+        """Cria o registro a partir de uma linha do asyncpg (ou dict) com as colunas de FIELDS."""
+        return cls(*[row[name] for name in cls.FIELDS])
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TideExtreme:
+    """Um extremo de maré da tabela tides_forecast."""
+    timestamp_utc: datetime.datetime
+    tide_type: str
+    height: float | None = None
+
+    @classmethod
+    def from_record(cls, row):
+        return cls(*[row[name] for name in cls.FIELDS])
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LevelScoreHour:
+    """Os scores pré-calculados de uma hora da tabela level_scores."""
+    timestamp_utc: datetime.datetime
+    suitability_score: float | None = None
+    wave_score: float | None = None
+    wind_score: float | None = None
+    tide_score: float | None = None
+    water_temperature_score: float | None = None
+    air_temperature_score: float | None = None
+    current_score: float | None = None
+
+    @classmethod
+    def from_record(cls, row):
+        return cls(*[row[name] for name in cls.FIELDS])
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SpotPreferences:
+    """
+    Preferências de um spot, vindas de user_spot_preferences, model_spot_preferences ou
+    level_spot_preferences. Colunas que a tabela de origem não tem ficam None.
+    """
+    spot_id: int | None = None
+    user_id: str | None = None
+    surf_level: str | None = None
+    user_preference_id: int | None = None
+    model_preference_id: int | None = None
+    level_preference_id: int | None = None
+    is_active: bool | None = None
+    min_wave_height: float | None = None
+    max_wave_height: float | None = None
+    ideal_wave_height: float | None = None
+    min_wave_period: float | None = None
+    max_wave_period: float | None = None
+    ideal_wave_period: float | None = None
+    min_swell_height: float | None = None
+    max_swell_height: float | None = None
+    ideal_swell_height: float | None = None
+    min_swell_period: float | None = None
+    max_swell_period: float | None = None
+    ideal_swell_period: float | None = None
+    preferred_wave_direction: str | None = None
+    preferred_swell_direction: str | None = None
+    ideal_tide_type: str | None = None
+    min_sea_level: float | None = None
+    max_sea_level: float | None = None
+    ideal_sea_level: float | None = None
+    min_wind_speed: float | None = None
+    max_wind_speed: float | None = None
+    ideal_wind_speed: float | None = None
+    preferred_wind_direction: str | None = None
+    ideal_water_temperature: float | None = None
+    ideal_air_temperature: float | None = None
+    ideal_current_speed: float | None = None
+    # Lidos pelo cálculo dos scores (com valor padrão), ainda sem coluna nas tabelas.
+    ideal_wave_direction: float | None = None
+    ideal_wind_direction: float | None = None
+    ideal_tide_height: float | None = None
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Cria o registro a partir de um dict/linha; chaves desconhecidas são ignoradas."""
+        return cls(**{name: mapping[name] for name in cls.FIELDS if name in mapping})
+
+    def as_dict(self):
+        """As preferências preenchidas (sem os campos None), para as respostas da API."""
+        return {name: value for name in self.FIELDS if (value := getattr(self, name)) is not None}
+
+# Com slots=True não dá para declarar FIELDS dentro da classe como atributo comum.
+for _record_class in (ForecastHour, TideExtreme, LevelScoreHour, SpotPreferences):
+    _record_class.FIELDS = _field_names(_record_class)
@@ -1,7 +1,10 @@
 import arrow
 import os
 import json
-from src.utils.config import REQUEST_DIR, TREATED_DIR
+import datetime
+import numpy as np
+from zoneinfo import ZoneInfo
+from src.utils.config import REQUEST_DIR, TREATED_DIR, HOURS_FILTER
 from src.utils.utils import load_json_data, save_json_data
 
 
@@ -16,10 +19,98 @@ def filter_forecast_time(data):
             print(f"Erro ao filtrar horário: {entry.get('time')} | {e}")
     return filtered
 
-def merge_stormglass_data(weather_filename, sea_level_filename, output_filename):
-    weather_data = load_json_data(weather_filename, REQUEST_DIR)
-    sea_level_data = load_json_data(sea_level_filename, REQUEST_DIR)
+def _parse_utc_time(time_str):
+    try:
+        parsed = datetime.datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+    except Exception as e:
+        print(f"Erro ao converter horário: {time_str} | {e}")
+        return np.datetime64('NaT')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return np.datetime64(parsed, 's')
+
+def parse_utc_times(time_strings):
+    """
+    Converte os horários ISO 8601 da StormGlass em um array datetime64[s] (UTC), de uma vez só.
+    Horários inválidos viram NaT.
+    """
+    # Caminho rápido: a StormGlass sempre responde em UTC ('...+00:00'), então basta
+    # remover o sufixo e deixar o NumPy interpretar o array inteiro.
+    stripped = []
+    for time_str in time_strings:
+        if not isinstance(time_str, str):
+            break
+        if time_str.endswith('+00:00'):
+            stripped.append(time_str[:-6])
+        elif time_str.endswith('Z'):
+            stripped.append(time_str[:-1])
+        else:
+            break
+    else:
+        try:
+            return np.array(stripped, dtype='datetime64[s]')
+        except ValueError:
+            pass
+    return np.array([_parse_utc_time(time_str) for time_str in time_strings], dtype='datetime64[s]')
+
+def _format_utc_offset(offset_seconds):
+    sign = '-' if offset_seconds < 0 else '+'
+    hours, minutes = divmod(abs(int(offset_seconds)) // 60, 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+def localize_entries(entries, timezone, hours=None):
+    """
+    Converte o campo 'time' das entradas para o horário local do spot (ISO 8601 com offset).
+
+    Os horários são interpretados uma única vez (parse_utc_times) e o offset do fuso é
+    calculado apenas para os instantes distintos, o que já cobre o horário de verão.
+    Com `hours`, mantém só as entradas cuja hora local está na lista (ex: HOURS_FILTER).
+    Entradas com horário inválido são descartadas. Retorna uma nova lista com as
+    entradas mantidas (os dicts são alterados no lugar, como em convert_to_localtime).
+    """
+    if not entries:
+        return []
+
+    utc_times = parse_utc_times([entry.get('time') for entry in entries])
+    valid = ~np.isnat(utc_times)
+    epochs = utc_times[valid].astype(np.int64)
 
+    zone = ZoneInfo(timezone)
+    unique_epochs, inverse = np.unique(epochs, return_inverse=True)
+    unique_offsets = np.array([
+        int(datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).astimezone(zone).utcoffset().total_seconds())
+        for epoch in unique_epochs
+    ], dtype=np.int64)
+    offsets = np.zeros(len(entries), dtype=np.int64)
+    offsets[valid] = unique_offsets[inverse]
+
+    local_times = utc_times + offsets.astype('timedelta64[s]')
+    keep = valid
+    if hours is not None:
+        local_hours = (local_times.astype('datetime64[h]') - local_times.astype('datetime64[D]')).astype(np.int64)
+        keep = valid & np.isin(local_hours, hours)
+
+    kept_indices = np.flatnonzero(keep)
+    local_strings = np.datetime_as_string(local_times[kept_indices], unit='s')
+    offset_suffixes = {offset: _format_utc_offset(offset) for offset in np.unique(offsets[kept_indices]).tolist()}
+
+    localized = []
+    for index, local_str, offset in zip(kept_indices.tolist(), local_strings.tolist(), offsets[kept_indices].tolist()):
+        entry = entries[index]
+        entry['time'] = local_str + offset_suffixes[offset]
+        localized.append(entry)
+    return localized
+
+def localize_forecast_entries(entries, timezone):
+    """Horário local do spot, mantendo apenas as horas de HOURS_FILTER."""
+    return localize_entries(entries, timezone, HOURS_FILTER)
+
+def merge_stormglass_payloads(weather_data, sea_level_data):
+    """
+    Junta as respostas de /weather/point e /tide/sea-level/point (já em memória)
+    em uma lista de entradas horárias ordenadas por horário.
+    Retorna None se alguma das respostas for inválida.
+    """
     if not weather_data or 'hours' not in weather_data or not sea_level_data or 'data' not in sea_level_data:
         print("Dados inválidos para merge.")
         return None
@@ -50,6 +141,16 @@ def merge_stormglass_data(weather_filename, sea_level_filename, output_filename)
         })
 
     merged.sort(key=lambda x: x['time'])
+    return merged
+
+def merge_stormglass_data(weather_filename, sea_level_filename, output_filename):
+    """Versão baseada em arquivos de merge_stormglass_payloads (lê de REQUEST_DIR e salva em TREATED_DIR)."""
+    merged = merge_stormglass_payloads(
+        load_json_data(weather_filename, REQUEST_DIR),
+        load_json_data(sea_level_filename, REQUEST_DIR)
+    )
+    if merged is None:
+        return None
 
     try:
         save_json_data(merged, output_filename, TREATED_DIR)
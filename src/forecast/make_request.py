@@ -4,7 +4,6 @@ import requests
 import json
 import os
 import sys
-import decimal
 from src.db.connection import init_async_db_pool
 from src.db.queries import get_all_spots
 from src.utils.config import (
@@ -62,14 +61,9 @@ async def main():
     if selected_spot is None:
         sys.exit(0)
 
-    def decimal_default(obj):
-        if isinstance(obj, decimal.Decimal):
-            return float(obj)
-        raise TypeError
-
     os.makedirs(REQUEST_DIR, exist_ok=True)
     with open(os.path.join(REQUEST_DIR, 'current_spot.json'), 'w') as f:
-        json.dump(selected_spot, f, ensure_ascii=False, indent=4, default=decimal_default)
+        json.dump(selected_spot, f, ensure_ascii=False, indent=4)
 
     start = arrow.now().replace(hour=0, minute=0, second=0, microsecond=0)
     end = start.shift(days=FORECAST_DAYS).replace(hour=23, minute=59, second=59, microsecond=999999)
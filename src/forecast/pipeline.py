@@ -0,0 +1,96 @@
+import datetime
+from zoneinfo import ZoneInfo
+from src.db.queries import insert_forecast_data, insert_extreme_tides_data
+from src.recommendation.level_scores import materialize_level_scores
+from src.utils.config import REQUEST_DIR, TREATED_DIR, FORECAST_DEBUG_SNAPSHOTS
+from src.forecast.data_processing import merge_stormglass_payloads, localize_entries, localize_forecast_entries
+from src.utils.utils import save_json_data, spot_timezone
+
+# Pipeline de ingestão em memória: busca → merge → horário local → filtro → inserção
+# → scores por nível (level_scores).
+# Os dados passam de uma etapa para a outra como objetos Python; arquivos JSON só são
+# escritos quando FORECAST_DEBUG_SNAPSHOTS está ativo.
+
+def snapshot_filenames(spot_id):
+    """Nomes dos arquivos de depuração de um spot (o ID evita que spots sobrescrevam uns aos outros)."""
+    return {
+        'weather': f'weather_data_{spot_id}.json',
+        'sea_level': f'sea_level_data_{spot_id}.json',
+        'tide_extremes': f'tide_extremes_data_{spot_id}.json',
+        'forecast': f'forecast_data_{spot_id}.json',
+        'tide_extremes_filtered': f'tide_extremes_filtered_{spot_id}.json',
+    }
+
+def save_snapshot(data, filename, directory, enabled=FORECAST_DEBUG_SNAPSHOTS):
+    """Salva uma etapa do pipeline em disco, apenas se os snapshots de depuração estiverem ativos."""
+    if not enabled or data is None:
+        return
+    try:
+        save_json_data(data, filename, directory)
+    except Exception as e:
+        # Snapshot é só para depuração: uma falha aqui não deve interromper a ingestão.
+        print(f"Erro ao salvar snapshot {filename}: {e}")
+
+def prepare_forecast_entries(weather_data, sea_level_data, timezone):
+    """Mescla as respostas da StormGlass, converte para horário local e mantém só os horários de interesse."""
+    merged = merge_stormglass_payloads(weather_data, sea_level_data)
+    if not merged:
+        return None
+    return localize_forecast_entries(merged, timezone)
+
+def prepare_tide_entries(tide_raw, timezone):
+    """Extremos de maré convertidos para horário local, ou None se a resposta for inválida."""
+    if not tide_raw or 'data' not in tide_raw:
+        return None
+    return localize_entries(tide_raw['data'], timezone)
+
+async def ingest_spot_payloads(spot, responses, snapshots=FORECAST_DEBUG_SNAPSHOTS):
+    """
+    Processa e insere no banco as respostas da StormGlass de um spot.
+    `responses` é o dict retornado por StormGlassClient.fetch_spot_data.
+    Retorna True em caso de sucesso.
+    """
+    spot_id = spot['spot_id']
+    timezone = spot_timezone(spot)
+    try:
+        ZoneInfo(timezone)
+    except Exception as e:
+        print(f"Fuso horário inválido '{timezone}' para o spot {spot_id}: {e}. Abortando inserção.")
+        return False
+    filenames = snapshot_filenames(spot_id)
+    for key in ('weather', 'sea_level', 'tide_extremes'):
+        save_snapshot(responses.get(key), filenames[key], REQUEST_DIR, snapshots)
+
+    # Etapa 1 e 2: Merge, horário local e filtro
+    forecast_entries = prepare_forecast_entries(responses.get('weather'), responses.get('sea_level'), timezone)
+    if not forecast_entries:
+        print(f"Nenhum dado de previsão válido para o spot {spot_id}. Abortando inserção.")
+        return False
+    save_snapshot(forecast_entries, filenames['forecast'], TREATED_DIR, snapshots)
+
+    await insert_forecast_data(spot_id, forecast_entries)
+
+    # Etapa 3: Dados de marés extremas
+    tide_entries = prepare_tide_entries(responses.get('tide_extremes'), timezone)
+    if tide_entries is None:
+        print(f"Dados de marés extremas indisponíveis para o spot {spot_id}.")
+    else:
+        save_snapshot(tide_entries, filenames['tide_extremes_filtered'], TREATED_DIR, snapshots)
+        await insert_extreme_tides_data(spot_id, tide_entries)
+
+    # Etapa 4: Scores pré-calculados por nível de surf para os dias ingeridos
+    await refresh_level_scores(spot_id, forecast_entries)
+    return True
+
+async def refresh_level_scores(spot_id, forecast_entries):
+    """Recalcula level_scores no período das previsões ingeridas. Uma falha aqui não invalida a ingestão."""
+    timestamps = [datetime.datetime.fromisoformat(entry['time']) for entry in forecast_entries]
+    try:
+        await materialize_level_scores(spot_id, min(timestamps), max(timestamps))
+    except Exception as e:
+        print(f"Erro ao calcular os scores por nível do spot {spot_id}: {e}")
+
+async def fetch_and_ingest_spot(client, spot, start, end, snapshots=FORECAST_DEBUG_SNAPSHOTS):
+    """Busca os dados de um spot com o StormGlassClient e os insere no banco, sem passar pelo disco."""
+    responses = await client.fetch_spot_data(spot, start, end)
+    return await ingest_spot_payloads(spot, responses, snapshots)
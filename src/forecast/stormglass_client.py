@@ -0,0 +1,134 @@
+import asyncio
+import random
+import time
+import httpx
+from src.utils.config import (
+    API_KEY_STORMGLASS, WEATHER_API_URL, TIDE_SEA_LEVEL_API_URL, TIDE_EXTREMES_API_URL,
+    PARAMS_WEATHER_API, STORMGLASS_MAX_CONCURRENCY, STORMGLASS_RATE_PER_SECOND,
+    STORMGLASS_RATE_BURST, STORMGLASS_MAX_RETRIES, STORMGLASS_BACKOFF_SECONDS,
+    STORMGLASS_TIMEOUT_SECONDS
+)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Limitador de taxa: `rate_per_second` tokens são repostos por segundo, até `capacity`.
+    Cada requisição consome um token; sem tokens, `acquire` espera a reposição.
+    """
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+class StormGlassClient:
+    """
+    Cliente assíncrono da StormGlass com pool de conexões HTTP, limite de requisições
+    simultâneas, token bucket para respeitar a cota e novas tentativas com backoff
+    exponencial em respostas 429/5xx e erros de rede.
+
+    Uso:
+        async with StormGlassClient() as client:
+            data = await client.fetch_spot_data(spot, start, end)
+    """
+
+    def __init__(
+        self,
+        api_key=API_KEY_STORMGLASS,
+        max_concurrency=STORMGLASS_MAX_CONCURRENCY,
+        rate_per_second=STORMGLASS_RATE_PER_SECOND,
+        rate_burst=STORMGLASS_RATE_BURST,
+        max_retries=STORMGLASS_MAX_RETRIES,
+        backoff_seconds=STORMGLASS_BACKOFF_SECONDS,
+        timeout_seconds=STORMGLASS_TIMEOUT_SECONDS,
+        transport=None
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        # Transporte httpx alternativo (ex.: httpx.MockTransport nos testes).
+        self.transport = transport
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = TokenBucket(rate_per_second, rate_burst)
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            headers={'Authorization': self.api_key or ''},
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=self.timeout_seconds,
+            transport=self.transport
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        # Backoff exponencial com jitter para não sincronizar as novas tentativas.
+        return self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def get_json(self, api_url, params, label):
+        """
+        Faz um GET e retorna o JSON da resposta, ou None se todas as tentativas falharem.
+        """
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    await self._rate_limiter.acquire()
+                    response = await self._client.get(api_url, params=params)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = str(e) or e.__class__.__name__
+            except Exception as e:
+                print(f"Erro ao buscar dados de {label}: {e}")
+                return None
+
+            if attempt == self.max_retries:
+                print(f"Erro ao buscar dados de {label} após {attempt + 1} tentativas: {error}")
+                return None
+            delay = self._retry_delay(attempt, response)
+            print(f"Falha ao buscar dados de {label} ({error}). Nova tentativa em {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+    async def fetch_spot_data(self, spot, start, end):
+        """
+        Busca clima, nível do mar e extremos de maré de um spot em paralelo.
+        Retorna {'weather': ..., 'sea_level': ..., 'tide_extremes': ...}; cada valor é None em caso de falha.
+        """
+        location = {'lat': spot['latitude'], 'lng': spot['longitude'], 'start': int(start.timestamp()), 'end': int(end.timestamp())}
+        spot_name = spot['spot_name']
+        weather, sea_level, tide_extremes = await asyncio.gather(
+            self.get_json(WEATHER_API_URL, {**location, 'params': ','.join(PARAMS_WEATHER_API)}, f"clima ({spot_name})"),
+            self.get_json(TIDE_SEA_LEVEL_API_URL, {**location, 'params': 'seaLevel'}, f"nível do mar ({spot_name})"),
+            self.get_json(TIDE_EXTREMES_API_URL, location, f"extremos da maré ({spot_name})")
+        )
+        return {'weather': weather, 'sea_level': sea_level, 'tide_extremes': tide_extremes}
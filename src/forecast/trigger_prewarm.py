@@ -0,0 +1,14 @@
+import asyncio
+from src.db.connection import init_async_db_pool
+from src.db.queries import notify_ingestion_complete
+
+# Avisa os workers da API que uma ingestão terminou, para que pré-aqueçam os presets padrão.
+# fetch_and_insert_all.py já faz isso ao final; este script serve para ingestões feitas
+# por outros meios (ex.: save_request.py) ou para disparar o pré-aquecimento manualmente.
+
+async def main():
+    await init_async_db_pool()
+    await notify_ingestion_complete()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+import datetime
+import numpy as np
+
+from src.db.queries import (
+    get_forecast_columns_for_spots_from_db,
+    get_tides_forecast_for_spots_from_db,
+    get_level_spot_preferences_for_spot,
+    insert_level_scores
+)
+from src.recommendation.recommendation_logic import (
+    build_forecast_matrix_from_columns,
+    calculate_suitability_scores_batch,
+    DETAILED_SCORE_KEYS
+)
+from src.utils.tide_index import TideIndex
+
+# Usuários sem preferências próprias recebem as preferências padrão do seu nível
+# (level_spot_preferences), então os scores de cada (nível, spot, hora) são os mesmos para
+# todos eles. Esta etapa calcula esses scores uma vez após a ingestão e os grava em
+# level_scores, de onde /recommendations os lê.
+
+def compute_level_score_records(spot_id, forecast_columns, tides_extremes, level_preferences_list):
+    """
+    Calcula os scores de todas as horas de um spot para cada nível de surf.
+
+    A fase da maré de cada hora usa o extremo anterior e o seguinte, mesmo que sejam de
+    outro dia UTC, exatamente como em /recommendations, para que os scores gravados sejam
+    idênticos aos calculados na hora.
+
+    Args:
+        spot_id (int): ID do spot.
+        forecast_columns (dict): Previsões do spot em colunas, como em
+                                 get_forecast_columns_for_spots_from_db.
+        tides_extremes (list[TideExtreme]): Extremos de maré, incluindo o dia anterior e o
+                                            seguinte às previsões.
+        level_preferences_list (list[SpotPreferences]): Preferências de nível do spot.
+
+    Returns:
+        list[tuple]: Registros na ordem de LEVEL_SCORE_COLUMNS.
+    """
+    if not forecast_columns or not level_preferences_list:
+        return []
+    timestamps = forecast_columns['timestamp_utc'].astype('datetime64[us]')
+    if timestamps.size == 0:
+        return []
+    tide_phases = TideIndex(tides_extremes).phases_at(timestamps.astype(np.int64))
+
+    # Uma linha da matriz por nível, todas com as mesmas horas.
+    forecast_matrix = build_forecast_matrix_from_columns(
+        [forecast_columns] * len(level_preferences_list),
+        [tide_phases] * len(level_preferences_list)
+    )
+    final_scores, detailed_scores = calculate_suitability_scores_batch(forecast_matrix, level_preferences_list)
+
+    timestamps_utc = [timestamp.replace(tzinfo=datetime.timezone.utc) for timestamp in timestamps.tolist()]
+    records = []
+    for i, level_preferences in enumerate(level_preferences_list):
+        final_row = final_scores[i].tolist()
+        detailed_rows = [detailed_scores[key][i].tolist() for key in DETAILED_SCORE_KEYS]
+        for h, timestamp_utc in enumerate(timestamps_utc):
+            records.append((
+                level_preferences.surf_level,
+                spot_id,
+                timestamp_utc,
+                final_row[h],
+                *(detailed_row[h] for detailed_row in detailed_rows)
+            ))
+    return records
+
+async def materialize_level_scores(spot_id, start_utc, end_utc):
+    """
+    Recalcula e grava em level_scores os scores de todos os níveis de surf de um spot
+    para os dias UTC entre start_utc e end_utc. Retorna a quantidade de registros gravados.
+    """
+    # Dias inteiros, e um dia a mais de cada lado para os extremos de maré vizinhos.
+    first_day = start_utc.astimezone(datetime.timezone.utc).date()
+    last_day = end_utc.astimezone(datetime.timezone.utc).date()
+    day_start = datetime.datetime.combine(first_day, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
+    day_end = datetime.datetime.combine(last_day, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+
+    level_preferences_list = await get_level_spot_preferences_for_spot(spot_id)
+    if not level_preferences_list:
+        print(f"Nenhuma preferência de nível para o spot {spot_id}. Scores por nível não calculados.")
+        return 0
+
+    forecast_columns_by_spot = await get_forecast_columns_for_spots_from_db([spot_id], day_start, day_end)
+    tides_by_spot = await get_tides_forecast_for_spots_from_db(
+        [spot_id], day_start - datetime.timedelta(days=1), day_end + datetime.timedelta(days=1)
+    )
+    tides_extremes = [extreme for day in sorted(tides_by_spot[spot_id]) for extreme in tides_by_spot[spot_id][day]]
+    records = compute_level_score_records(
+        spot_id, forecast_columns_by_spot.get(spot_id), tides_extremes, level_preferences_list
+    )
+    await insert_level_scores(spot_id, records)
+    print(f"{len(records)} scores por nível calculados para o spot {spot_id}.")
+    return len(records)
@@ -0,0 +1,69 @@
+import datetime
+import numpy as np
+
+def top_n_indices(scores, n, min_score=None):
+    """
+    Retorna os índices dos `n` maiores scores, em ordem decrescente de score.
+
+    Usa np.argpartition para separar os `n` melhores em O(len(scores)) e ordena apenas
+    esses `n`, em vez de ordenar o vetor inteiro. Com `min_score`, ignora scores menores.
+    Empates mantêm a ordem original dos índices.
+    """
+    scores = np.asarray(scores, dtype=float)
+    candidates = np.flatnonzero(~np.isnan(scores))
+    if min_score is not None:
+        candidates = candidates[scores[candidates] >= min_score]
+    if n <= 0 or candidates.size == 0:
+        return np.array([], dtype=np.intp)
+
+    if candidates.size > n:
+        candidate_scores = scores[candidates]
+        partition = np.argpartition(-candidate_scores, n - 1)
+        # argpartition escolhe um empatado qualquer no corte: fica com todos os scores acima
+        # do n-ésimo e completa com os iguais a ele na ordem original dos índices.
+        cutoff = candidate_scores[partition[n - 1]]
+        above = np.flatnonzero(candidate_scores > cutoff)
+        tied = np.flatnonzero(candidate_scores == cutoff)[:n - above.size]
+        candidates = candidates[np.sort(np.concatenate([above, tied]))]
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order]
+
+def merge_consecutive_slots(slots, step=datetime.timedelta(hours=1)):
+    """
+    Junta em sessões os horários consecutivos (separados por `step`) de um mesmo spot.
+
+    Args:
+        slots (list[dict]): Horários com 'spot_id', 'timestamp_utc' (datetime) e 'suitability_score'.
+
+    Returns:
+        list[dict]: Sessões com 'spot_id', 'start_utc', 'end_utc' e 'slots' (os horários da
+                    sessão em ordem cronológica), ordenadas pelo melhor score de cada sessão.
+    """
+    sessions = []
+    by_spot = {}
+    for slot in sorted(slots, key=lambda slot: (slot['spot_id'], slot['timestamp_utc'])):
+        by_spot.setdefault(slot['spot_id'], []).append(slot)
+
+    for spot_id, spot_slots in by_spot.items():
+        current = [spot_slots[0]]
+        for slot in spot_slots[1:]:
+            if slot['timestamp_utc'] - current[-1]['timestamp_utc'] == step:
+                current.append(slot)
+            else:
+                sessions.append(current)
+                current = [slot]
+        sessions.append(current)
+
+    merged = []
+    for session_slots in sessions:
+        scores = [slot['suitability_score'] for slot in session_slots]
+        merged.append({
+            'spot_id': session_slots[0]['spot_id'],
+            'start_utc': session_slots[0]['timestamp_utc'],
+            'end_utc': session_slots[-1]['timestamp_utc'],
+            'best_score': max(scores),
+            'average_score': sum(scores) / len(scores),
+            'slots': session_slots,
+        })
+    merged.sort(key=lambda session: session['best_score'], reverse=True)
+    return merged
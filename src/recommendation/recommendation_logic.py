@@ -10,187 +10,193 @@ from src.recommendation.temperature_score import (
 from src.recommendation.wave_score import (
     calcular_score_onda
 )
-def calculate_suitability_score(forecast_entry, spot_preferences, spot_info, tide_phase, user_info):
-    """
-    Calcula um score de adequação geral para o surf com base nas previsões e preferências.
-
-    Args:
-        forecast_entry (dict): Dados de previsão para um determinado timestamp.
-        spot_preferences (dict): Preferências de surf para o spot (do usuário ou padrão).
-        spot_info (dict): Informações estáticas sobre o spot (tipo de fundo, orientação, etc.).
-        tide_phase (str): Fase da maré determinada ('enchente', 'vazante', 'pico_alta', 'pico_baixa').
-        user_info (dict): Informações do usuário (nível de surf, etc.).
 
-    Returns:
-        tuple: Um tuple contendo:
-            - float: O score de adequação geral (0 a 1).
-            - dict: Um dicionário com os scores detalhados de cada critério.
-    """
+# Define os pesos de cada fator. A soma deve ser 1.0.
+# Onda e Vento são os mais críticos para a qualidade do surf.
+SCORE_WEIGHTS = {
+    'wave': 0.50,   # 50% - O fator mais importante.
+    'wind': 0.25,   # 25% - O segundo mais importante, define a formação da onda.
+    'tide': 0.15,   # 15% - Crucial para a maioria dos picos.
+    'current': 0.05,# 5% - Pode ajudar ou atrapalhar significativamente.
+    'water_temp': 0.03, # 3% - Fator de conforto.
+    'air_temp': 0.02,   # 2% - Fator de conforto.
+}
+
+# Colunas da previsão usadas no cálculo dos scores.
+FORECAST_SCORE_FIELDS = (
+    'wave_height_sg', 'wave_direction_sg', 'wave_period_sg',
+    'secondary_swell_height_sg', 'secondary_swell_direction_sg', 'secondary_swell_period_sg',
+    'wind_speed_sg', 'wind_direction_sg', 'sea_level_sg',
+    'water_temperature_sg', 'air_temperature_sg', 'current_speed_sg',
+)
 
-    detailed_scores = {}
+DETAILED_SCORE_KEYS = (
+    'wave_score', 'wind_score', 'tide_score',
+    'water_temperature_score', 'air_temperature_score', 'current_score',
+)
 
+def build_forecast_matrix(forecast_rows, tide_phase_rows):
     """
-    -----------------------------------------------------------------------------------------------
-    ------------------------------------------Scores Onda------------------------------------------
-    -----------------------------------------------------------------------------------------------
-    """
-    # Parâmetros da Previsão
-    previsao_tamanho = float(forecast_entry.get('wave_height_sg')) if forecast_entry.get('wave_height_sg') is not None else None
-    previsao_direcao = float(forecast_entry.get('wave_direction_sg')) if forecast_entry.get('wave_direction_sg') is not None else None
-    previsao_periodo = float(forecast_entry.get('wave_period_sg')) if forecast_entry.get('wave_period_sg') is not None else None
-    
-    previsao_sec_tamanho = float(forecast_entry.get('secondary_swell_height_sg', 0.0))
-    previsao_sec_direcao = float(forecast_entry.get('secondary_swell_direction_sg', 0.0))
-    previsao_sec_periodo = float(forecast_entry.get('secondary_swell_period_sg', 0.0))
-
-    tamanho_minimo = float(spot_preferences.get('min_wave_height', 0.5))
-    tamanho_ideal = float(spot_preferences.get('ideal_wave_height', 1.5))
-    tamanho_maximo = float(spot_preferences.get('max_wave_height', 2.5))
-    direcao_ideal = float(spot_preferences.get('ideal_wave_direction', 180.0))
-    periodo_ideal = float(spot_preferences.get('ideal_wave_period', 10.0))
-
-    score_onda = 0 # Score padrão caso os dados essenciais não existam
-
-    if all(v is not None for v in [previsao_tamanho, previsao_direcao, previsao_periodo]):
-        score_onda_result = calcular_score_onda(
-            previsao_tamanho, previsao_direcao, previsao_periodo,
-            tamanho_minimo, tamanho_ideal, tamanho_maximo,
-            direcao_ideal, periodo_ideal,
-            previsao_sec_tamanho, previsao_sec_direcao, previsao_sec_periodo
-        )
-        score_onda = float(score_onda_result.item()) if isinstance(score_onda_result, np.ndarray) else float(score_onda_result)
-    
-    detailed_scores['wave_score'] = score_onda
-    
+    Monta a matriz (linhas × horas) de previsões usada pelo cálculo em lote.
 
-    """
-    -----------------------------------------------------------------------------------------------
-    ------------------------------------------Score Vento------------------------------------------
-    -----------------------------------------------------------------------------------------------
-    """
+    Cada linha corresponde a um spot (ou a um spot-dia) e pode ter um número diferente
+    de horas; as linhas mais curtas são completadas com NaN e marcadas como inválidas.
 
-    wind_speed = float(forecast_entry.get('wind_speed_sg')) if forecast_entry.get('wind_speed_sg') is not None else None
-    wind_dir = float(forecast_entry.get('wind_direction_sg')) if forecast_entry.get('wind_direction_sg') is not None else None
-    preferred_wind_dir = float(spot_preferences.get('ideal_wind_direction', 0.0))
-    ideal_wind_speed = float(spot_preferences.get('ideal_wind_speed', 5.0))
-    max_wind_speed = float(spot_preferences.get('max_wind_speed', 20.0))
-
-    score_vento = 0.0
-
-    if all(v is not None for v in [wind_speed, wind_dir, preferred_wind_dir, ideal_wind_speed, max_wind_speed]):
-        score_vento_result = calcular_score_vento(
-            wind_speed,
-            wind_dir,
-            preferred_wind_dir,
-            ideal_wind_speed,
-            max_wind_speed
-        )
-        score_vento = float(score_vento_result.item()) if isinstance(score_vento_result, np.ndarray) else float(score_vento_result)
-    detailed_scores['wind_score'] = score_vento
+    Args:
+        forecast_rows (list[list[ForecastHour]]): Para cada linha, a lista de previsões horárias.
+        tide_phase_rows (list[list[str]]): Para cada linha, a fase da maré de cada hora.
 
+    Returns:
+        dict: Um array float (linhas × horas) por coluna de FORECAST_SCORE_FIELDS,
+              'tide_phase' (array de objetos) e 'valid' (máscara booleana das horas existentes).
     """
-    -----------------------------------------------------------------------------------------------
-    ------------------------------------------Score Maré------------------------------------------
-    -----------------------------------------------------------------------------------------------
+    n_linhas = len(forecast_rows)
+    n_horas = max((len(linha) for linha in forecast_rows), default=0)
+
+    matrix = {}
+    for campo in FORECAST_SCORE_FIELDS:
+        # None vira NaN na conversão para float.
+        matrix[campo] = np.array(
+            [[getattr(entry, campo) for entry in linha] + [None] * (n_horas - len(linha)) for linha in forecast_rows],
+            dtype=float
+        ).reshape(n_linhas, n_horas)
+
+    tide_phase = np.full((n_linhas, n_horas), None, dtype=object)
+    valid = np.zeros((n_linhas, n_horas), dtype=bool)
+    for i, (linha, fases) in enumerate(zip(forecast_rows, tide_phase_rows)):
+        tide_phase[i, :len(fases)] = fases
+        valid[i, :len(linha)] = True
+    matrix['tide_phase'] = tide_phase
+    matrix['valid'] = valid
+    return matrix
+
+def build_forecast_matrix_from_columns(column_rows, tide_phase_rows):
     """
-    previsao_mare = forecast_entry.get('sea_level_sg') # Altura da maré
-    mare_ideal = float(spot_preferences.get('ideal_tide_height', 0.0)) # Converter para float
-    mare_tipo_ideal = spot_preferences.get('ideal_tide_type') # 'qualquer', 'enchente', 'vazante', etc.
-
-    score_mare = 0.0
-
-    if all(v is not None for v in [previsao_mare, mare_ideal, tide_phase, mare_tipo_ideal]):
-        score_mare_result = calcular_score_mare(
-            previsao_mare,
-            mare_ideal,
-            tide_phase, # A fase da maré atual para comparação
-            mare_tipo_ideal
-        )
-        score_mare = float(score_mare_result.item()) if isinstance(score_mare_result, np.ndarray) else float(score_mare_result)
-    detailed_scores['tide_score'] = score_mare
+    Igual a build_forecast_matrix, mas recebe cada linha já em colunas (um array float por
+    campo, como em get_forecast_columns_for_spots_from_db), sem dicts por hora.
 
+    Args:
+        column_rows (list[dict]): Para cada linha, {campo: array float das horas}.
+        tide_phase_rows (list): Para cada linha, a fase da maré de cada hora.
     """
-    -----------------------------------------------------------------------------------------------
-    ---------------------------------------Scores Temperatura---------------------------------------
-    -----------------------------------------------------------------------------------------------
+    n_linhas = len(column_rows)
+    tamanhos = [len(colunas[FORECAST_SCORE_FIELDS[0]]) for colunas in column_rows]
+    n_horas = max(tamanhos, default=0)
+
+    matrix = {campo: np.full((n_linhas, n_horas), np.nan) for campo in FORECAST_SCORE_FIELDS}
+    tide_phase = np.full((n_linhas, n_horas), None, dtype=object)
+    valid = np.zeros((n_linhas, n_horas), dtype=bool)
+    for i, (colunas, fases, tamanho) in enumerate(zip(column_rows, tide_phase_rows, tamanhos)):
+        for campo in FORECAST_SCORE_FIELDS:
+            matrix[campo][i, :tamanho] = colunas[campo]
+        tide_phase[i, :tamanho] = fases
+        valid[i, :tamanho] = True
+    matrix['tide_phase'] = tide_phase
+    matrix['valid'] = valid
+    return matrix
+
+def _preferencia(spot_preferences, chave, padrao):
+    valor = getattr(spot_preferences, chave)
+    return float(valor) if valor is not None else float(padrao)
+
+def calculate_suitability_scores_batch(forecast_matrix, spot_preferences_list):
     """
-    #------------------------------------SCORE TEMPERATURA ÁGUA------------------------------------
-    water_temp = forecast_entry.get('water_temperature_sg')
-    ideal_water_temp = float(spot_preferences.get('ideal_water_temperature', 22.0)) # Converter para float
-
-    score_temperatura_agua = 0.0
-    
-    if water_temp is not None and ideal_water_temp is not None:
-        score_temperatura_agua_result = calcular_score_temperatura_agua(
-            water_temp,
-            ideal_water_temp
-        )
-        score_temperatura_agua = float(score_temperatura_agua_result.item()) if isinstance(score_temperatura_agua_result, np.ndarray) else float(score_temperatura_agua_result)
-    detailed_scores['water_temperature_score'] = score_temperatura_agua
+    Calcula os scores de adequação para uma matriz inteira de previsões (linhas × horas).
 
-    #------------------------------------SCORE TEMPERATURA AR------------------------------------
-    air_temp = forecast_entry.get('air_temperature_sg')
-    ideal_air_temp = float(spot_preferences.get('ideal_air_temperature', 25.0)) # Converter para float
+    Cada critério é calculado uma única vez por linha sobre o vetor de horas. Valores
+    ausentes (NaN) recebem score 0 no critério correspondente, e preferências ausentes
+    (None em SpotPreferences) usam os valores padrão de cada critério.
 
-    score_temperatura_ar = 0.0
-
-    if air_temp is not None and ideal_air_temp is not None:
-        score_temperatura_ar_result = calcular_score_temperatura_ar(
-            air_temp,
-            ideal_air_temp
-        )
-        score_temperatura_ar = float(score_temperatura_ar_result.item()) if isinstance(score_temperatura_ar_result, np.ndarray) else float(score_temperatura_ar_result)
-    detailed_scores['air_temperature_score'] = score_temperatura_ar
+    Args:
+        forecast_matrix (dict): Matriz montada por `build_forecast_matrix`.
+        spot_preferences_list (list[SpotPreferences]): Preferências usadas para cada linha da matriz.
 
+    Returns:
+        tuple: Um tuple contendo:
+            - np.ndarray: Scores de adequação finais (linhas × horas), 0 nas posições inválidas.
+            - dict: Um array (linhas × horas) por critério, com as chaves de DETAILED_SCORE_KEYS.
     """
-    -----------------------------------------------------------------------------------------------
-    -----------------------------------------Scores Corrente-----------------------------------------
-    -----------------------------------------------------------------------------------------------
-    """
-    current_speed = forecast_entry.get('current_speed_sg')
-    # O spot_preferences pode ter 'ideal_current_speed', mas um default de 0.0 é razoável
-    ideal_current_speed = float(spot_preferences.get('ideal_current_speed', 0.0))
+    valid = forecast_matrix['valid']
+    detailed_scores = {chave: np.zeros(valid.shape) for chave in DETAILED_SCORE_KEYS}
 
-    score_corrente = 0.0
+    for i, spot_preferences in enumerate(spot_preferences_list):
+        linha = {campo: forecast_matrix[campo][i] for campo in FORECAST_SCORE_FIELDS}
+        linha_valida = valid[i]
 
-    if current_speed is not None and ideal_current_speed is not None:
-        score_corrente_result = calcular_score_corrente(
-            current_speed,
-            ideal_current_speed
+        # ------------------------------------Score Onda------------------------------------
+        mask = linha_valida & ~(
+            np.isnan(linha['wave_height_sg']) | np.isnan(linha['wave_direction_sg']) | np.isnan(linha['wave_period_sg'])
         )
-        score_corrente = float(score_corrente_result.item()) if isinstance(score_corrente_result, np.ndarray) else float(score_corrente_result)
-    detailed_scores['current_score'] = score_corrente
-
-
-    """
-    -----------------------------------------------------------------------------------------------
-    ---------------------------------------Cálculo Final-------------------------------------------
-    -----------------------------------------------------------------------------------------------
-    """
-    # Define os pesos de cada fator. A soma deve ser 1.0.
-    # Onda e Vento são os mais críticos para a qualidade do surf.
-    weights = {
-        'wave': 0.50,   # 50% - O fator mais importante.
-        'wind': 0.25,   # 25% - O segundo mais importante, define a formação da onda.
-        'tide': 0.15,   # 15% - Crucial para a maioria dos picos.
-        'current': 0.05,# 5% - Pode ajudar ou atrapalhar significativamente.
-        'water_temp': 0.03, # 3% - Fator de conforto.
-        'air_temp': 0.02,   # 2% - Fator de conforto.
-    }
-    
-    # Como todos os scores estão na mesma escala (-100 a 100), podemos fazer a média ponderada.
-    # Lembre-se que chegamos aqui apenas se score_onda >= 0.
-    final_suitability_score = (
-        score_onda * weights['wave'] +
-        score_vento * weights['wind'] +
-        score_mare * weights['tide'] +
-        score_corrente * weights['current'] +
-        score_temperatura_agua * weights['water_temp'] +
-        score_temperatura_ar * weights['air_temp']
+        if np.any(mask):
+            detailed_scores['wave_score'][i, mask] = calcular_score_onda(
+                linha['wave_height_sg'][mask], linha['wave_direction_sg'][mask], linha['wave_period_sg'][mask],
+                _preferencia(spot_preferences, 'min_wave_height', 0.5),
+                _preferencia(spot_preferences, 'ideal_wave_height', 1.5),
+                _preferencia(spot_preferences, 'max_wave_height', 2.5),
+                _preferencia(spot_preferences, 'ideal_wave_direction', 180.0),
+                _preferencia(spot_preferences, 'ideal_wave_period', 10.0),
+                np.nan_to_num(linha['secondary_swell_height_sg'][mask]),
+                np.nan_to_num(linha['secondary_swell_direction_sg'][mask]),
+                np.nan_to_num(linha['secondary_swell_period_sg'][mask])
+            )
+
+        # ------------------------------------Score Vento------------------------------------
+        mask = linha_valida & ~(np.isnan(linha['wind_speed_sg']) | np.isnan(linha['wind_direction_sg']))
+        if np.any(mask):
+            detailed_scores['wind_score'][i, mask] = calcular_score_vento(
+                linha['wind_speed_sg'][mask],
+                linha['wind_direction_sg'][mask],
+                _preferencia(spot_preferences, 'ideal_wind_direction', 0.0),
+                _preferencia(spot_preferences, 'ideal_wind_speed', 5.0),
+                _preferencia(spot_preferences, 'max_wind_speed', 20.0)
+            )
+
+        # ------------------------------------Score Maré------------------------------------
+        mare_tipo_ideal = spot_preferences.ideal_tide_type
+        fases = forecast_matrix['tide_phase'][i]
+        mask = linha_valida & ~np.isnan(linha['sea_level_sg']) & np.not_equal(fases, None)
+        if mare_tipo_ideal is not None and np.any(mask):
+            detailed_scores['tide_score'][i, mask] = calcular_score_mare(
+                linha['sea_level_sg'][mask],
+                _preferencia(spot_preferences, 'ideal_tide_height', 0.0),
+                fases[mask],
+                mare_tipo_ideal
+            )
+
+        # ---------------------------------Scores Temperatura---------------------------------
+        mask = linha_valida & ~np.isnan(linha['water_temperature_sg'])
+        if np.any(mask):
+            detailed_scores['water_temperature_score'][i, mask] = calcular_score_temperatura_agua(
+                linha['water_temperature_sg'][mask],
+                _preferencia(spot_preferences, 'ideal_water_temperature', 22.0)
+            )
+
+        mask = linha_valida & ~np.isnan(linha['air_temperature_sg'])
+        if np.any(mask):
+            detailed_scores['air_temperature_score'][i, mask] = calcular_score_temperatura_ar(
+                linha['air_temperature_sg'][mask],
+                _preferencia(spot_preferences, 'ideal_air_temperature', 25.0)
+            )
+
+        # ----------------------------------Score Corrente----------------------------------
+        mask = linha_valida & ~np.isnan(linha['current_speed_sg'])
+        if np.any(mask):
+            detailed_scores['current_score'][i, mask] = calcular_score_corrente(
+                linha['current_speed_sg'][mask],
+                _preferencia(spot_preferences, 'ideal_current_speed', 0.0)
+            )
+
+    # ----------------------------------Cálculo Final----------------------------------
+    weights = SCORE_WEIGHTS
+    final_suitability_scores = (
+        detailed_scores['wave_score'] * weights['wave'] +
+        detailed_scores['wind_score'] * weights['wind'] +
+        detailed_scores['tide_score'] * weights['tide'] +
+        detailed_scores['current_score'] * weights['current'] +
+        detailed_scores['water_temperature_score'] * weights['water_temp'] +
+        detailed_scores['air_temperature_score'] * weights['air_temp']
     )
-    
-    # Arredonda o score final para manter a consistência.
-    final_suitability_score = np.clip(final_suitability_score, 0, 100)  # Garante que o score esteja no intervalo esperado
-    final_suitability_score = round(final_suitability_score, 2)
+    final_suitability_scores = np.round(np.clip(final_suitability_scores, 0, 100), 2)
+    final_suitability_scores[~valid] = 0.0
 
-    return float(final_suitability_score), detailed_scores
+    return final_suitability_scores, detailed_scores
@@ -127,28 +127,34 @@ def calcular_impacto_swell_secundario(
     -1: Impacto extremamente negativo (ex: cross swell forte).
      0: Impacto neutro ou insignificante.
     +1: Impacto positivo (ex: swell de enchimento que ajuda a formar picos).
+
+    Aceita escalares ou arrays; cada condição é avaliada elemento a elemento.
     """
+    previsao_swell_secundario_tamanho = np.asarray(previsao_swell_secundario_tamanho, dtype=float)
+    previsao_swell_secundario_periodo = np.asarray(previsao_swell_secundario_periodo, dtype=float)
+    previsao_swell_secundario_direcao = np.asarray(previsao_swell_secundario_direcao, dtype=float)
+    previsao_onda_tamanho = np.asarray(previsao_onda_tamanho, dtype=float)
+    previsao_onda_periodo = np.asarray(previsao_onda_periodo, dtype=float)
+    previsao_onda_direcao = np.asarray(previsao_onda_direcao, dtype=float)
+
     # --- 1. Score da Direção (o mais importante) ---
     # Usamos o cosseno da diferença de ângulo.
     # Se a diferença é 0°, cos(0) = 1 (alinhamento perfeito, positivo).
     # Se a diferença é 90° (cross swell), cos(90) = 0 (neutro, mas vamos penalizar).
     # Se a diferença é 180°, cos(180) = -1 (swell oposto, muito negativo).
     diferenca_direcao = np.abs(previsao_swell_secundario_direcao - previsao_onda_direcao)
-    diferenca_direcao = min(diferenca_direcao, 360 - diferenca_direcao)
+    diferenca_direcao = np.minimum(diferenca_direcao, 360 - diferenca_direcao)
     
     # Mapeamos a diferença para uma escala de -1 a 1. Acima de 90° a penalidade é máxima.
-    if diferenca_direcao > 90:
-        score_direcao = -1.0
-    else:
-        # Cosseno cria uma curva suave de penalidade.
-        score_direcao = np.cos(np.deg2rad(diferenca_direcao))
+    # Abaixo disso, o cosseno cria uma curva suave de penalidade.
+    score_direcao = np.where(diferenca_direcao > 90, -1.0, np.cos(np.deg2rad(diferenca_direcao)))
+
+    # Sem swell principal (tamanho ou período zero), o secundário não tem impacto.
+    # As divisões abaixo são feitas com denominador 1 nessas posições e o resultado é descartado no final.
+    sem_swell_principal = (previsao_onda_tamanho == 0) | (previsao_onda_periodo == 0)
 
     # --- 2. Score do Tamanho (relação entre os swells) ---
-    # Evita divisão por zero se o swell principal for flat.
-    if previsao_onda_tamanho == 0:
-        return 0 # Sem swell principal, o secundário não tem impacto.
-        
-    ratio_tamanho = previsao_swell_secundario_tamanho / previsao_onda_tamanho
+    ratio_tamanho = previsao_swell_secundario_tamanho / np.where(previsao_onda_tamanho == 0, 1.0, previsao_onda_tamanho)
     
     # Um swell secundário ideal tem cerca de 30-60% do tamanho do principal.
     # Se for muito grande (>120%), começa a atrapalhar. Se for muito pequeno (<10%), é irrelevante.
@@ -156,15 +162,10 @@ def calcular_impacto_swell_secundario(
     score_tamanho = np.exp(-((ratio_tamanho - 0.45)**2) / (0.5**2))
     
     # Penaliza se o swell secundário for muito maior que o principal
-    if ratio_tamanho > 1.2:
-      score_tamanho *= -1 * (ratio_tamanho - 1.2)
-
+    score_tamanho = np.where(ratio_tamanho > 1.2, score_tamanho * -1 * (ratio_tamanho - 1.2), score_tamanho)
 
     # --- 3. Score do Período (similaridade) ---
-    if previsao_onda_periodo == 0:
-        return 0
-
-    ratio_periodo = previsao_swell_secundario_periodo / previsao_onda_periodo
+    ratio_periodo = previsao_swell_secundario_periodo / np.where(previsao_onda_periodo == 0, 1.0, previsao_onda_periodo)
     # Períodos próximos são melhores. Usamos uma curva gaussiana centrada em 1.0 (períodos iguais).
     score_periodo = np.exp(-((ratio_periodo - 1.0)**2) / (0.8**2))
 
@@ -181,7 +182,7 @@ def calcular_impacto_swell_secundario(
                     (score_periodo * peso_periodo)
 
     # Garante que o resultado final esteja estritamente entre -1 e 1.
-    return np.clip(impacto_final, -1.0, 1.0)
+    return np.where(sem_swell_principal, 0.0, np.clip(impacto_final, -1.0, 1.0))
 
 def calcular_score_onda(
     # Parâmetros da Previsão Principal
@@ -205,25 +206,26 @@ def calcular_score_onda(
     Calcula o score final e consolidado da condição do mar para o surf.
 
     A lógica é:
-    1. Calcula o score do tamanho da onda. Se for negativo, a condição é ruim e retornamos o score de tamanho.
-    2. Se o tamanho for bom, calcula os scores de direção e período.
+    1. Calcula o score do tamanho da onda.
+    2. Calcula os scores de direção e período.
     3. Combina os três scores em um "score base" através de uma média ponderada.
     4. Calcula o impacto do swell secundário.
     5. Aplica o impacto como bônus (até +10%) ou penalidade (até -20%) sobre o score base.
+    6. Onde o score de tamanho for negativo, a condição é ruim e o resultado é o próprio score de tamanho.
+
+    Aceita escalares ou arrays (de mesmo formato) nos parâmetros da previsão.
     """
     
     # Etapa 1: Calcular o score do tamanho da onda
     score_tamanho = calcular_score_tamanho_onda(previsao_tamanho, tamanho_minimo, tamanho_ideal, tamanho_maximo)
 
-    # Etapa 2: Regra de ouro - se o tamanho não é surfável, nada mais importa.
-    if score_tamanho < 0:
-        return score_tamanho
-
-    # Etapa 3: Se o tamanho é surfável, calcular os outros scores.
+    # Etapa 2: Calcular os scores de direção e período.
+    # Calculamos para todos os elementos e aplicamos a "regra de ouro" no final,
+    # para que a função funcione tanto com escalares quanto com arrays.
     score_direcao = calcular_score_direcao_onda(previsao_direcao, direcao_ideal)
     score_periodo = calcular_score_periodo_onda(previsao_periodo, periodo_ideal)
     
-    # Etapa 4: Calcular o "Score Base" com média ponderada (todos os scores estão em escala de 0-100 agora)
+    # Etapa 3: Calcular o "Score Base" com média ponderada (todos os scores estão em escala de 0-100 agora)
     # O tamanho continua sendo o mais importante, seguido pelo período.
     peso_tamanho = 0.50
     peso_periodo = 0.30
@@ -233,23 +235,26 @@ def calcular_score_onda(
                  (score_periodo * peso_periodo) + \
                  (score_direcao * peso_direcao)
 
-    # Etapa 5: Calcular e aplicar o impacto do swell secundário, se houver.
-    score_final = score_base
-    if previsao_sec_tamanho > 0 and previsao_sec_periodo > 0:
-        impacto_secundario = calcular_impacto_swell_secundario(
+    # Etapa 4: Calcular e aplicar o impacto do swell secundário, se houver.
+    previsao_sec_tamanho = np.asarray(previsao_sec_tamanho, dtype=float)
+    previsao_sec_periodo = np.asarray(previsao_sec_periodo, dtype=float)
+    mask_secundario = (previsao_sec_tamanho > 0) & (previsao_sec_periodo > 0)
+
+    impacto_secundario = np.where(
+        mask_secundario,
+        calcular_impacto_swell_secundario(
             previsao_sec_tamanho, previsao_sec_periodo, previsao_sec_direcao,
             previsao_tamanho, previsao_periodo, previsao_direcao
-        )
-        
-        modificador = 0.0
-        if impacto_secundario > 0:
-            # Bônus máximo de 10%
-            modificador = impacto_secundario * 0.10 
-        else: # impacto_secundario <= 0
-            # Penalidade máxima de 20%
-            modificador = impacto_secundario * 0.20
-
-        score_final = score_base * (1 + modificador)
+        ),
+        0.0
+    )
+
+    # Bônus máximo de 10% para impacto positivo, penalidade máxima de 20% para impacto negativo.
+    modificador = np.where(impacto_secundario > 0, impacto_secundario * 0.10, impacto_secundario * 0.20)
+    score_final = score_base * (1 + modificador)
+
+    # Etapa 5: Regra de ouro - se o tamanho não é surfável, nada mais importa.
+    score_final = np.where(score_tamanho < 0, score_tamanho, score_final)
         
     # Etapa 6: Garantir que o score final não ultrapasse 100 e arredondar.
-    return np.round(np.clip(score_final, -100, 100), 2)
\ No newline at end of file
+    return np.round(np.clip(score_final, -100, 100), 2)
@@ -11,6 +11,51 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
+# Pool de conexões assíncronas
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+# Conexões ociosas por mais que isso são fechadas (0 = nunca).
+DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME = float(os.getenv("DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME", 300))
+# Espera máxima por uma conexão livre; acima disso a requisição falha em vez de enfileirar sem fim.
+DB_POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT_SECONDS", 10))
+# Esperas acima disso são registradas no log, com as conexões em uso no momento.
+DB_POOL_SLOW_ACQUIRE_SECONDS = float(os.getenv("DB_POOL_SLOW_ACQUIRE_SECONDS", 1))
+# Timeout padrão de cada comando (0 = sem timeout).
+DB_COMMAND_TIMEOUT_SECONDS = float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", 30)) or None
+# Cache de prepared statements por conexão. Use 0 atrás do PgBouncer / pooler do Supabase
+# em modo transaction, que não mantém prepared statements entre transações.
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+# Prepara as consultas frequentes de queries.py em cada conexão do pool (src/db/connection.py).
+# Desligado por padrão: o pooler do Supabase (PgBouncer em modo transaction) não suporta
+# prepared statements nomeados. Ligue só com uma conexão direta ao Postgres.
+DB_PREPARED_STATEMENTS_ENABLED = os.getenv("DB_PREPARED_STATEMENTS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Cache em memória de previsões e marés, por (spot, dia UTC).
+# As previsões só mudam quando a ingestão roda, então o TTL pode ser longo.
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", 2000))
+FORECAST_CACHE_TTL_SECONDS = int(os.getenv("FORECAST_CACHE_TTL_SECONDS", 3600))
+
+# Cache em memória das preferências efetivas de cada usuário por spot.
+# Alterações feitas pela API invalidam o cache; o TTL cobre alterações feitas direto no banco.
+PREFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("PREFERENCE_CACHE_MAX_ENTRIES", 5000))
+PREFERENCE_CACHE_TTL_SECONDS = int(os.getenv("PREFERENCE_CACHE_TTL_SECONDS", 600))
+
+# Cache em memória do resultado de /presets/{id}/run, por preset e versão dos dados.
+# Uma nova ingestão e a virada do dia já invalidam as entradas (data_version() e a data local
+# dos spots), então o TTL cobre o intervalo entre ingestões (diárias), com folga: um resultado
+# pré-aquecido vale até a próxima ingestão. O pré-aquecimento não passa de PRESET_CACHE_MAX_ENTRIES presets.
+PRESET_CACHE_MAX_ENTRIES = int(os.getenv("PRESET_CACHE_MAX_ENTRIES", 5000))
+PRESET_CACHE_TTL_SECONDS = int(os.getenv("PRESET_CACHE_TTL_SECONDS", 26 * 3600))
+
+# Pré-aquecimento dos presets padrão em cada worker da API, na inicialização e após cada
+# ingestão completa. A concorrência fica abaixo do pool para não disputar conexões com as requisições.
+PRESET_PREWARM_ENABLED = os.getenv("PRESET_PREWARM_ENABLED", "true").lower() in ("1", "true", "yes")
+PRESET_PREWARM_CONCURRENCY = int(os.getenv("PRESET_PREWARM_CONCURRENCY", max(1, DB_POOL_MAX_SIZE // 2)))
+
+# Canal do Postgres (LISTEN/NOTIFY) usado pela ingestão para avisar os workers da API
+# que as previsões de um spot mudaram.
+FORECAST_UPDATES_CHANNEL = os.getenv("FORECAST_UPDATES_CHANNEL", "forecast_updates")
+
 # Chaves de API
 API_KEY_STORMGLASS = os.getenv('API_KEY_2')
 
@@ -20,11 +65,26 @@ REQUEST_DIR = os.path.join(OUTPUT_DIR, 'requests') # Diretório para requisiçõ
 TREATED_DIR = os.path.join(OUTPUT_DIR, 'treated') # Diretório para dados tratados
 FORECAST_DAYS = 5 # Quantidade de dias de previsão
 HOURS_FILTER = list(range(5, 18)) # 5 AM to 5 PM (local time)
+DEFAULT_SPOT_TIMEZONE = 'America/Sao_Paulo' # Usado quando o spot não tem spots.timezone
+
+# Com FORECAST_DEBUG_SNAPSHOTS=true, a ingestão também salva em REQUEST_DIR/TREATED_DIR
+# as respostas da StormGlass e os dados tratados de cada spot, para depuração.
+FORECAST_DEBUG_SNAPSHOTS = os.getenv("FORECAST_DEBUG_SNAPSHOTS", "false").lower() in ("1", "true", "yes")
 
 # StormGlass.io API endpoint URLs
-WEATHER_API_URL = "https://api.stormglass.io/v2/weather/point"
-TIDE_SEA_LEVEL_API_URL = "https://api.stormglass.io/v2/tide/sea-level/point"
-TIDE_EXTREMES_API_URL = "https://api.stormglass.io/v2/tide/extremes/point"
+# STORMGLASS_API_BASE_URL pode apontar para um servidor local (stub) em testes.
+STORMGLASS_API_BASE_URL = os.getenv("STORMGLASS_API_BASE_URL", "https://api.stormglass.io/v2").rstrip('/')
+WEATHER_API_URL = f"{STORMGLASS_API_BASE_URL}/weather/point"
+TIDE_SEA_LEVEL_API_URL = f"{STORMGLASS_API_BASE_URL}/tide/sea-level/point"
+TIDE_EXTREMES_API_URL = f"{STORMGLASS_API_BASE_URL}/tide/extremes/point"
+
+# Limites do cliente assíncrono da StormGlass (ingestão de todos os spots)
+STORMGLASS_MAX_CONCURRENCY = int(os.getenv("STORMGLASS_MAX_CONCURRENCY", 5)) # Requisições simultâneas
+STORMGLASS_RATE_PER_SECOND = float(os.getenv("STORMGLASS_RATE_PER_SECOND", 2)) # Reposição do token bucket
+STORMGLASS_RATE_BURST = int(os.getenv("STORMGLASS_RATE_BURST", 5)) # Capacidade do token bucket
+STORMGLASS_MAX_RETRIES = int(os.getenv("STORMGLASS_MAX_RETRIES", 4)) # Novas tentativas em 429/5xx
+STORMGLASS_BACKOFF_SECONDS = float(os.getenv("STORMGLASS_BACKOFF_SECONDS", 1.0)) # Espera inicial do backoff exponencial
+STORMGLASS_TIMEOUT_SECONDS = float(os.getenv("STORMGLASS_TIMEOUT_SECONDS", 30.0))
 
 # Parâmetros para /weather/point endpoint
 PARAMS_WEATHER_API = [
@@ -0,0 +1,81 @@
+import datetime
+import numpy as np
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+def _to_epoch_us(timestamp):
+    """Converte um datetime em microssegundos desde a época (datetimes sem fuso são tratados como UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+class TideIndex:
+    """
+    Índice dos extremos de maré (TideExtreme) de um spot, para calcular a fase da maré de
+    muitos horários de uma vez.
+
+    Os extremos são ordenados uma única vez e guardados em um array NumPy; a fase de um
+    vetor de horários é obtida com np.searchsorted, em O((H + T) log T) no total em vez de
+    ordenar e percorrer os extremos a cada hora.
+
+    Os rótulos são os mesmos de determine_tide_phase: o tipo do extremo ('high'/'low') no
+    horário exato de um extremo, 'rising'/'falling' entre dois extremos,
+    'before_<tipo>'/'after_<tipo>' antes do primeiro/depois do último e 'unknown' quando
+    não há extremos ou a sequência não é baixa→alta/alta→baixa.
+    """
+
+    def __init__(self, tides_extremes):
+        # Ordenação estável, como o sorted() de determine_tide_phase.
+        sorted_extremes = sorted(tides_extremes or [], key=lambda extreme: extreme.timestamp_utc)
+        self.size = len(sorted_extremes)
+        self.times = np.array([_to_epoch_us(extreme.timestamp_utc) for extreme in sorted_extremes], dtype=np.int64)
+        tide_types = [extreme.tide_type for extreme in sorted_extremes]
+        self._at_labels = np.array(tide_types, dtype=object)
+        self._after_labels = np.array([f"after_{tide_type}" for tide_type in tide_types], dtype=object)
+        self._before_labels = np.array([f"before_{tide_type}" for tide_type in tide_types], dtype=object)
+        # Rótulo de cada intervalo entre o extremo i e o i + 1.
+        between = []
+        for previous_type, next_type in zip(tide_types, tide_types[1:]):
+            if previous_type == 'low' and next_type == 'high':
+                between.append('rising')
+            elif previous_type == 'high' and next_type == 'low':
+                between.append('falling')
+            else:
+                between.append('unknown')
+        self._between_labels = np.array(between, dtype=object)
+
+    def phases(self, timestamps):
+        """
+        Retorna um array (dtype object) com a fase da maré de cada horário de `timestamps`
+        (datetimes, com ou sem fuso; sem fuso são tratados como UTC).
+        """
+        return self.phases_at(np.array([_to_epoch_us(timestamp) for timestamp in timestamps], dtype=np.int64))
+
+    def phases_at(self, targets):
+        """Como `phases`, mas recebe os horários já convertidos em microssegundos desde a época (int64)."""
+        targets = np.asarray(targets, dtype=np.int64)
+        result = np.full(targets.shape, 'unknown', dtype=object)
+        if self.size == 0 or targets.size == 0:
+            return result
+
+        # Quantidade de extremos com horário <= alvo: o anterior é idx - 1 e o próximo é idx.
+        idx = np.searchsorted(self.times, targets, side='right')
+        has_previous = idx > 0
+        has_next = idx < self.size
+        previous_idx = np.where(has_previous, idx - 1, 0)
+
+        at_extreme = has_previous & (self.times[previous_idx] == targets)
+        only_previous = has_previous & ~has_next & ~at_extreme
+        only_next = ~has_previous
+        between = has_previous & has_next & ~at_extreme
+
+        result[at_extreme] = self._at_labels[previous_idx[at_extreme]]
+        result[only_previous] = self._after_labels[previous_idx[only_previous]]
+        result[only_next] = self._before_labels[0]
+        result[between] = self._between_labels[previous_idx[between]]
+        return result
+
+    def phase(self, timestamp):
+        """Fase da maré de um único horário."""
+        return self.phases([timestamp])[0]
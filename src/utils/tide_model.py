@@ -0,0 +1,102 @@
+import datetime
+import numpy as np
+
+from src.db.cache import tide_cache, tide_model_cache
+from src.utils.tide_index import TideIndex, _to_epoch_us
+
+# Modelo contínuo da maré a partir dos extremos de tides_forecast.
+# Entre uma baixa e uma alta consecutivas a altura segue meio período de cosseno
+# (a forma suave que a regra dos doze avos aproxima):
+#
+#     h(t) = h0 + (h1 - h0) * (1 - cos(pi * (t - t0) / (t1 - t0))) / 2
+#
+# Assim altura e fase podem ser avaliadas em qualquer horário (ex.: grade de 15 minutos)
+# sem nenhuma chamada extra à StormGlass, que só fornece sea_level_sg de hora em hora.
+
+class TideModel:
+    """
+    Curva de maré interpolada entre extremos consecutivos, avaliada de forma vetorizada.
+
+    As fases seguem os mesmos rótulos do TideIndex. A altura é NaN fora do intervalo coberto
+    pelos extremos e entre dois extremos do mesmo tipo (sequência inválida).
+    """
+
+    def __init__(self, tides_extremes):
+        sorted_extremes = sorted(tides_extremes or [], key=lambda extreme: extreme.timestamp_utc)
+        self.index = TideIndex(sorted_extremes)
+        self.times = self.index.times
+        self.heights = np.array(
+            [extreme.height if extreme.height is not None else np.nan for extreme in sorted_extremes],
+            dtype=float
+        )
+        tide_types = [extreme.tide_type for extreme in sorted_extremes]
+        # Só os pares baixa→alta e alta→baixa são interpolados.
+        self._valid_intervals = np.array(
+            [{previous_type, next_type} == {'low', 'high'} for previous_type, next_type in zip(tide_types, tide_types[1:])],
+            dtype=bool
+        )
+
+    def heights_at(self, targets):
+        """Altura da maré em cada horário de `targets` (microssegundos desde a época, int64)."""
+        targets = np.asarray(targets, dtype=np.int64)
+        result = np.full(targets.shape, np.nan)
+        if self.index.size == 0 or targets.size == 0:
+            return result
+
+        idx = np.searchsorted(self.times, targets, side='right')
+        previous_idx = np.clip(idx - 1, 0, self.index.size - 1)
+        at_extreme = (idx > 0) & (self.times[previous_idx] == targets)
+        result[at_extreme] = self.heights[previous_idx[at_extreme]]
+
+        between = (idx > 0) & (idx < self.index.size) & ~at_extreme
+        between[between] = self._valid_intervals[previous_idx[between]]
+        i = previous_idx[between]
+        t0, t1 = self.times[i], self.times[i + 1]
+        h0, h1 = self.heights[i], self.heights[i + 1]
+        fraction = (targets[between] - t0) / (t1 - t0)
+        result[between] = h0 + (h1 - h0) * (1 - np.cos(np.pi * fraction)) / 2
+        return result
+
+    def evaluate(self, timestamps):
+        """
+        Altura e fase da maré em cada horário de `timestamps` (datetimes; sem fuso são tratados como UTC).
+
+        Returns:
+            tuple: (array float de alturas, array dtype object de fases).
+        """
+        targets = np.array([_to_epoch_us(timestamp) for timestamp in timestamps], dtype=np.int64)
+        return self.heights_at(targets), self.index.phases_at(targets)
+
+def time_grid(start_utc, end_utc, step=datetime.timedelta(minutes=15)):
+    """Horários de start_utc até end_utc (inclusive) a cada `step`."""
+    timestamps = []
+    current = start_utc
+    while current <= end_utc:
+        timestamps.append(current)
+        current += step
+    return timestamps
+
+def get_tide_model(spot_id, day, tides_by_day, generation):
+    """
+    TideModel de um spot-dia, com cache por (spot_id, dia UTC).
+
+    Usa também os extremos do dia anterior e do seguinte, quando presentes em `tides_by_day`
+    ({dia UTC: [extremos]}, como em get_tides_forecast_for_spots_from_db), para que as horas
+    antes do primeiro e depois do último extremo do dia também tenham altura.
+
+    `generation` é tide_cache.generation lido antes de buscar `tides_by_day`. Uma entrada só
+    vale enquanto tide_cache não for invalidado, e um modelo montado com extremos que foram
+    invalidados durante a busca não é guardado.
+    """
+    cached = tide_model_cache.get((spot_id, day))
+    if cached is not None and cached[0] == tide_cache.generation:
+        return cached[1]
+    tides_extremes = [
+        extreme
+        for neighbor_day in (day - datetime.timedelta(days=1), day, day + datetime.timedelta(days=1))
+        for extreme in tides_by_day.get(neighbor_day, [])
+    ]
+    model = TideModel(tides_extremes)
+    if generation == tide_cache.generation:
+        tide_model_cache.set((spot_id, day), (generation, model))
+    return model
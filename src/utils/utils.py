@@ -1,8 +1,11 @@
 import arrow
+import asyncio
 import os
 import json
 import datetime
-import decimal
+from zoneinfo import ZoneInfo
+from src.utils.config import DEFAULT_SPOT_TIMEZONE
+from src.utils.tide_index import TideIndex
 
 def load_json_data(filename, directory):
     """
@@ -33,6 +36,19 @@ def save_json_data(data, filename, directory):
         print(f"Erro ao salvar JSON em {path}: {e}")
         raise e
 
+async def gather_with_concurrency(limit, *coroutines):
+    """
+    Executa as corrotinas concorrentemente, com no máximo `limit` ao mesmo tempo.
+    Os resultados são retornados na mesma ordem das corrotinas recebidas.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run_with_semaphore(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run_with_semaphore(coroutine) for coroutine in coroutines))
+
 def convert_to_localtime(data, timezone='America/Sao_Paulo'):
     for entry in data:
         try:
@@ -54,6 +70,42 @@ def convert_to_localtime_string(timestamp_str, timezone='America/Sao_Paulo'):
         print(f"Erro ao converter string de horário '{timestamp_str}' para horário local: {e}")
         return ""
 
+def spot_timezone(spot):
+    """Fuso IANA do spot (spots.timezone), com DEFAULT_SPOT_TIMEZONE quando não informado."""
+    return spot.get('timezone') or DEFAULT_SPOT_TIMEZONE
+
+def preset_weekday(date):
+    """Dia da semana de `date` no formato dos presets: 0 = Domingo ... 6 = Sábado."""
+    # date.weekday() usa 0 = Segunda.
+    return (date.weekday() + 1) % 7
+
+def spot_local_window(spot, day_offset, start_time, end_time, now_utc=None):
+    """
+    Converte uma janela HH:MM no horário local do spot em um intervalo UTC.
+
+    O dia é o "hoje" do fuso do spot mais `day_offset` dias.
+
+    Args:
+        spot (dict): Spot com 'timezone'.
+        day_offset (int): Dias a partir de hoje (no fuso do spot).
+        start_time, end_time (datetime.time): Início e fim da janela no horário local
+                                              (o fim inclui o minuto inteiro).
+        now_utc (datetime.datetime, optional): Instante de referência; padrão é agora.
+
+    Returns:
+        tuple: (data local, início UTC, fim UTC). Lança ZoneInfoNotFoundError se o fuso for inválido.
+    """
+    zone = ZoneInfo(spot_timezone(spot))
+    now_utc = now_utc or datetime.datetime.now(datetime.timezone.utc)
+    local_date = now_utc.astimezone(zone).date() + datetime.timedelta(days=day_offset)
+    start_local = datetime.datetime.combine(local_date, start_time, tzinfo=zone)
+    end_local = datetime.datetime.combine(local_date, end_time.replace(second=59, microsecond=999999), tzinfo=zone)
+    return (
+        local_date,
+        start_local.astimezone(datetime.timezone.utc),
+        end_local.astimezone(datetime.timezone.utc)
+    )
+
 def load_config(file_path='config.json'):
     """Carrega as configurações de um arquivo JSON."""
     try:
@@ -81,14 +133,9 @@ def save_config(config_data, file_path='config.json'):
 def get_cardinal_direction(degrees):
     """
     Converts degrees (0-360) to a cardinal or intercardinal direction.
-    Handles decimal.Decimal input by converting to float.
     """
     if degrees is None:
         return "N/A"
-    
-    # Adicionar esta linha para garantir que 'degrees' seja um float
-    if isinstance(degrees, decimal.Decimal):
-        degrees = float(degrees)
 
     directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
                   "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
@@ -117,60 +164,12 @@ def determine_tide_phase(current_timestamp, tides_extremes):
     Args:
         current_timestamp (datetime.datetime): The specific timestamp (UTC) for which
                                                 to determine the tide phase.
-        tides_extremes (list): A list of dictionaries, each representing a tide extreme event,
-                                with 'timestamp_utc', 'tide_type' ('low' or 'high'), and 'height'.
+        tides_extremes (list[TideExtreme]): Tide extreme events, with timestamp_utc,
+                                            tide_type ('low' or 'high') and height.
 
     Returns:
         str: The determined tide phase ('low', 'high', 'rising', 'falling'),
              or 'unknown' if not enough data.
     """
-    if not tides_extremes:
-        return 'unknown'
-
-    # Ensure current_timestamp is timezone-aware UTC
-    if current_timestamp.tzinfo is None:
-        current_timestamp = current_timestamp.replace(tzinfo=datetime.timezone.utc)
-    else:
-        current_timestamp = current_timestamp.astimezone(datetime.timezone.utc)
-
-    # Sort tide extremes by timestamp
-    sorted_extremes = sorted(tides_extremes, key=lambda x: x['timestamp_utc'])
-
-    previous_extreme = None
-    next_extreme = None
-
-    # Find the closest previous and next extreme tide events
-    for i, extreme in enumerate(sorted_extremes):
-        extreme_time = extreme['timestamp_utc']
-        if extreme_time <= current_timestamp:
-            previous_extreme = extreme
-        elif extreme_time > current_timestamp:
-            next_extreme = extreme
-            break # Found the first extreme after current_timestamp
-
-    if previous_extreme is None and next_extreme is None:
-        return 'unknown' # No extremes found
-
-    if previous_extreme and current_timestamp == previous_extreme['timestamp_utc']:
-        return previous_extreme['tide_type'] # Exactly at an extreme
-
-    if next_extreme and current_timestamp == next_extreme['timestamp_utc']:
-        return next_extreme['tide_type'] # Exactly at an extreme
-
-    if previous_extreme and not next_extreme:
-        # We are past the last known extreme for the day/range provided
-        # Could extrapolate, but safer to return a known state or 'unknown'
-        return f"after_{previous_extreme['tide_type']}" # Or just 'unknown'
-
-    if not previous_extreme and next_extreme:
-        # We are before the first known extreme for the day/range provided
-        return f"before_{next_extreme['tide_type']}" # Or just 'unknown'
-
-    # Determine rising or falling
-    if previous_extreme and next_extreme:
-        if previous_extreme['tide_type'] == 'low' and next_extreme['tide_type'] == 'high':
-            return 'rising'
-        elif previous_extreme['tide_type'] == 'high' and next_extreme['tide_type'] == 'low':
-            return 'falling'
-    
-    return 'unknown'
\ No newline at end of file
+    # Mesma lógica do TideIndex, que calcula a fase de vários horários de uma vez.
+    return TideIndex(tides_extremes).phase(current_timestamp)
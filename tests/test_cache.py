@@ -0,0 +1,122 @@
+import datetime
+
+import pytest
+
+from src.db import cache as cache_module
+from src.db.cache import TTLCache, data_version, forecast_cache, level_score_cache, preference_cache, tide_cache
+
+DIA = datetime.date(2026, 10, 17)
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+    def avancar(self, segundos):
+        self.agora += segundos
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(cache_module.time, 'monotonic', relogio.monotonic)
+    return relogio
+
+def test_get_sem_a_chave_retorna_o_padrao(relogio):
+    cache = TTLCache(10, 60)
+    assert cache.get((1, DIA)) is None
+    assert cache.get((1, DIA), 'padrão') == 'padrão'
+
+def test_expira_depois_do_ttl(relogio):
+    cache = TTLCache(10, 60)
+    cache.set((1, DIA), 'valor')
+    relogio.avancar(60)
+    assert cache.get((1, DIA)) == 'valor'
+    relogio.avancar(0.001)
+    assert cache.get((1, DIA), 'expirado') == 'expirado'
+    # A entrada expirada é removida na leitura.
+    assert len(cache) == 0
+
+def test_set_renova_o_ttl(relogio):
+    cache = TTLCache(10, 60)
+    cache.set((1, DIA), 'antigo')
+    relogio.avancar(50)
+    cache.set((1, DIA), 'novo')
+    relogio.avancar(50)
+    assert cache.get((1, DIA)) == 'novo'
+
+def test_valores_falsos_ficam_em_cache(relogio):
+    cache = TTLCache(10, 60)
+    cache.set((1, DIA), [])
+    assert cache.get((1, DIA), 'padrão') == []
+
+def test_remove_a_entrada_menos_usada(relogio):
+    cache = TTLCache(3, 60)
+    for spot_id in (1, 2, 3):
+        cache.set((spot_id, DIA), spot_id)
+    # Ler o spot 1 o torna o mais recente: o 2 é o próximo a sair.
+    assert cache.get((1, DIA)) == 1
+    cache.set((4, DIA), 4)
+    assert len(cache) == 3
+    assert cache.get((2, DIA)) is None
+    assert [cache.get((spot_id, DIA)) for spot_id in (1, 3, 4)] == [1, 3, 4]
+
+def test_sobrescrever_nao_remove_outras_entradas(relogio):
+    cache = TTLCache(2, 60)
+    cache.set((1, DIA), 'a')
+    cache.set((2, DIA), 'b')
+    cache.set((1, DIA), 'c')
+    assert len(cache) == 2
+    # (1, DIA) passou a ser o mais recente.
+    cache.set((3, DIA), 'd')
+    assert cache.get((2, DIA)) is None and cache.get((1, DIA)) == 'c'
+
+def test_set_com_geracao_antiga_e_descartado(relogio):
+    cache = TTLCache(10, 60)
+    geracao = cache.generation
+    cache.invalidate_spot(1)
+    cache.set((1, DIA), 'antigo', generation=geracao)
+    assert cache.get((1, DIA)) is None
+    cache.set((1, DIA), 'atual', generation=cache.generation)
+    assert cache.get((1, DIA)) == 'atual'
+    # Sem geração, o valor é sempre guardado.
+    cache.clear()
+    cache.set((1, DIA), 'sem geração')
+    assert cache.get((1, DIA)) == 'sem geração'
+
+def test_cada_invalidacao_incrementa_a_geracao(relogio):
+    cache = TTLCache(10, 60)
+    cache.invalidate_spot(1)
+    cache.invalidate_days(1, DIA, DIA)
+    cache.clear()
+    assert cache.generation == 3
+
+def test_invalidate_spot(relogio):
+    cache = TTLCache(10, 60)
+    cache.set((1, DIA), 'a')
+    cache.set((1, DIA, '06:00', '09:00'), 'b')
+    cache.set((2, DIA), 'c')
+    cache.invalidate_spot(1)
+    assert len(cache) == 1 and cache.get((2, DIA)) == 'c'
+    # Spot sem entradas: nada é removido, mas a geração muda.
+    geracao = cache.generation
+    cache.invalidate_spot(9)
+    assert len(cache) == 1 and cache.generation == geracao + 1
+
+def test_invalidate_days(relogio):
+    cache = TTLCache(10, 60)
+    dias = [DIA + datetime.timedelta(days=offset) for offset in range(4)]
+    for dia in dias:
+        cache.set((1, dia), dia)
+        cache.set((2, dia), dia)
+    cache.invalidate_days(1, dias[1], dias[2])
+    assert [cache.get((1, dia)) for dia in dias] == [dias[0], None, None, dias[3]]
+    assert all(cache.get((2, dia)) == dia for dia in dias)
+
+def test_data_version_muda_com_as_invalidacoes():
+    versao = data_version()
+    for cache in (forecast_cache, tide_cache, level_score_cache, preference_cache):
+        cache.invalidate_spot(-1)
+        assert data_version() != versao
+        versao = data_version()
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from src.db import connection
+from src.db.connection import ACQUIRE_WAIT_BUCKETS, acquire_db_connection, get_pool_metrics, pool_metrics
+
+class PoolFalso:
+    """Pool asyncpg mínimo: `tamanho` conexões, acquire com timeout e release."""
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.livres = asyncio.Queue()
+        for i in range(tamanho):
+            self.livres.put_nowait(f"conexão {i}")
+
+    async def acquire(self, timeout=None):
+        return await asyncio.wait_for(self.livres.get(), timeout)
+
+    async def release(self, conn):
+        self.livres.put_nowait(conn)
+
+    def get_size(self):
+        return self.tamanho
+
+    def get_idle_size(self):
+        return self.livres.qsize()
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return self.tamanho
+
+@pytest.fixture(autouse=True)
+def metricas_zeradas():
+    pool_metrics.reset()
+    yield
+    pool_metrics.reset()
+
+@pytest.fixture
+def usar_pool(monkeypatch):
+    def usar(tamanho, timeout=1.0):
+        pool = PoolFalso(tamanho)
+        monkeypatch.setattr(connection, '_async_pool', pool)
+        monkeypatch.setattr(connection, 'DB_POOL_ACQUIRE_TIMEOUT_SECONDS', timeout)
+        return pool
+    return usar
+
+def test_sem_pool_inicializado(monkeypatch):
+    monkeypatch.setattr(connection, '_async_pool', None)
+
+    async def usar():
+        async with acquire_db_connection("consulta"):
+            pass
+
+    with pytest.raises(Exception, match="not initialized"):
+        asyncio.run(usar())
+    assert get_pool_metrics()["pool"] is None
+
+def test_metricas_de_consultas_concorrentes(usar_pool):
+    usar_pool(2)
+
+    async def consulta(nome):
+        async with acquire_db_connection(nome):
+            await asyncio.sleep(0.01)
+
+    async def principal():
+        await asyncio.gather(*(consulta("get_spots") for _ in range(5)), consulta("get_tides"))
+
+    asyncio.run(principal())
+    metricas = get_pool_metrics()
+    assert metricas["acquire"]["count"] == 6
+    assert sum(metricas["acquire"]["wait_seconds_buckets"].values()) == 6
+    assert list(metricas["acquire"]["wait_seconds_buckets"]) == [str(limite) for limite in ACQUIRE_WAIT_BUCKETS] + ['+Inf']
+    # Só duas conexões: as demais ficam esperando.
+    assert metricas["in_use_peak"] == 2
+    assert metricas["waiting_peak"] >= 4
+    assert metricas["in_use"] == 0 and metricas["waiting"] == 0
+    assert metricas["queries"]["get_spots"]["count"] == 5
+    assert metricas["queries"]["get_tides"]["count"] == 1
+    assert metricas["queries"]["get_spots"]["avg_ms"] >= 10
+    assert metricas["pool"] == {"size": 2, "idle": 2, "min_size": 1, "max_size": 2}
+
+def test_erro_no_bloco_e_contado_e_a_conexao_volta_ao_pool(usar_pool):
+    pool = usar_pool(1)
+
+    async def falhar():
+        async with acquire_db_connection("insert"):
+            raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        asyncio.run(falhar())
+    assert pool_metrics.queries["insert"][:2] == [1, 1]
+    assert pool.get_idle_size() == 1 and pool_metrics.in_use == 0
+
+def test_timeout_ao_obter_conexao(usar_pool):
+    usar_pool(1, timeout=0.01)
+
+    async def principal():
+        async def segurar():
+            async with acquire_db_connection("lenta"):
+                await asyncio.sleep(0.1)
+
+        tarefa = asyncio.create_task(segurar())
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            async with acquire_db_connection("esperando"):
+                pass
+        await tarefa
+
+    asyncio.run(principal())
+    assert pool_metrics.acquire_timeouts == 1
+    assert pool_metrics.waiting == 0
+    # A consulta que não obteve conexão não entra nas métricas de consulta.
+    assert "esperando" not in pool_metrics.queries
+
+def test_faixas_do_histograma():
+    for espera in (0.0005, 0.001, 0.002, 0.7, 10):
+        pool_metrics.record_acquire(espera)
+    faixas = pool_metrics.snapshot()["acquire"]["wait_seconds_buckets"]
+    assert faixas["0.001"] == 2 and faixas["0.01"] == 1 and faixas["1"] == 1 and faixas["+Inf"] == 1
+    assert pool_metrics.snapshot()["acquire"]["wait_max_ms"] == pytest.approx(10000)
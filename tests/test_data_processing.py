@@ -0,0 +1,88 @@
+import datetime
+
+import arrow
+import numpy as np
+import pytest
+
+from src.forecast.data_processing import filter_forecast_time, localize_entries, localize_forecast_entries, parse_utc_times
+from src.utils.config import HOURS_FILTER
+
+# Paridade de localize_entries com o caminho anterior da ingestão, convert_to_localtime
+# (copiado abaixo como referência) seguido de filter_forecast_time.
+
+def _convert_to_localtime(data, timezone='America/Sao_Paulo'):
+    for entry in data:
+        try:
+            local_time = arrow.get(entry['time']).to(timezone)
+            entry['time'] = local_time.isoformat()
+        except Exception as e:
+            print(f"Erro ao converter horário: {entry.get('time')} | {e}")
+    return data
+
+def _entradas(inicio, horas, formato='+00:00'):
+    inicio = datetime.datetime.fromisoformat(inicio)
+    entradas = []
+    for i in range(horas):
+        horario = (inicio + datetime.timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%S')
+        entradas.append({'time': horario + formato, 'waveHeight_sg': float(i)})
+    return entradas
+
+# (fuso, primeiro horário UTC): dois dias em volta de uma mudança de horário ou com offset quebrado.
+CASOS = [
+    ('America/Sao_Paulo', '2018-11-03T00:00:00'),  # início do horário de verão (-03 → -02)
+    ('America/Sao_Paulo', '2019-02-16T00:00:00'),  # fim do horário de verão (-02 → -03)
+    ('America/Sao_Paulo', '2026-10-17T00:00:00'),  # sem horário de verão
+    ('Europe/Lisbon', '2024-03-30T12:00:00'),      # WET → WEST
+    ('Europe/Lisbon', '2024-10-26T12:00:00'),      # WEST → WET
+    ('America/St_Johns', '2024-11-02T12:00:00'),   # -02:30 → -03:30
+    ('Asia/Kolkata', '2026-10-17T00:00:00'),       # +05:30
+    ('Asia/Kathmandu', '2026-10-17T00:00:00'),     # +05:45
+    ('Australia/Lord_Howe', '2024-04-06T00:00:00'),  # +11 → +10:30 (mudança de meia hora)
+    ('Pacific/Chatham', '2024-04-06T00:00:00'),    # +13:45 → +12:45
+    ('UTC', '2026-10-17T00:00:00'),
+]
+
+@pytest.mark.parametrize("fuso, inicio", CASOS)
+def test_localize_entries_igual_a_convert_to_localtime(fuso, inicio):
+    esperado = _convert_to_localtime(_entradas(inicio, 48), fuso)
+    assert localize_entries(_entradas(inicio, 48), fuso) == esperado
+
+@pytest.mark.parametrize("fuso, inicio", CASOS)
+def test_filtro_de_horas_igual_ao_caminho_anterior(fuso, inicio):
+    esperado = filter_forecast_time(_convert_to_localtime(_entradas(inicio, 48), fuso))
+    obtido = localize_forecast_entries(_entradas(inicio, 48), fuso)
+    assert obtido == esperado
+    assert {arrow.get(entrada['time']).hour for entrada in obtido} <= set(HOURS_FILTER)
+
+def test_horarios_com_z_e_com_outro_offset():
+    # 'Z' ainda usa o caminho rápido; um offset diferente de UTC cai no caminho lento.
+    for formato in ('Z', '+01:00', '-03:30'):
+        esperado = _convert_to_localtime(_entradas('2019-02-16T00:00:00', 30, formato), 'America/Sao_Paulo')
+        assert localize_entries(_entradas('2019-02-16T00:00:00', 30, formato), 'America/Sao_Paulo') == esperado
+
+def test_horarios_repetidos_e_fora_de_ordem():
+    entradas = _entradas('2024-10-26T22:00:00', 6)
+    entradas = entradas[::-1] + entradas[:2]
+    copia = [dict(entrada) for entrada in entradas]
+    assert localize_entries(entradas, 'Europe/Lisbon') == _convert_to_localtime(copia, 'Europe/Lisbon')
+
+def test_horario_invalido_e_descartado():
+    entradas = _entradas('2026-10-17T10:00:00', 3)
+    entradas[1]['time'] = 'não é horário'
+    localizadas = localize_entries(entradas, 'America/Sao_Paulo')
+    assert [entrada['waveHeight_sg'] for entrada in localizadas] == [0.0, 2.0]
+    assert [entrada['time'] for entrada in localizadas] == ['2026-10-17T07:00:00-03:00', '2026-10-17T09:00:00-03:00']
+
+def test_lista_vazia():
+    assert localize_entries([], 'America/Sao_Paulo') == []
+
+def test_parse_utc_times():
+    horarios = ['2026-10-17T10:00:00+00:00', '2026-10-17T11:00:00Z']
+    esperado = np.array(['2026-10-17T10:00:00', '2026-10-17T11:00:00'], dtype='datetime64[s]')
+    assert np.array_equal(parse_utc_times(horarios), esperado)
+
+    # Caminho lento: offsets convertidos para UTC e horários inválidos como NaT.
+    obtido = parse_utc_times(['2026-10-17T07:00:00-03:00', None, 'inválido', '2026-10-17T16:15:00+05:45'])
+    assert obtido[0] == np.datetime64('2026-10-17T10:00:00')
+    assert np.isnat(obtido[1]) and np.isnat(obtido[2])
+    assert obtido[3] == np.datetime64('2026-10-17T10:30:00')
@@ -0,0 +1,69 @@
+import asyncio
+import contextlib
+import datetime
+import re
+
+import pytest
+
+from src.db import connection, queries
+
+# Colunas NUMERIC das tabelas lidas pelas recomendações: sem o cast para float8 no SELECT,
+# o asyncpg as devolveria como decimal.Decimal.
+COLUNAS_NUMERIC = {
+    'forecasts': queries._FORECAST_VALUE_COLUMNS,
+    'tides_forecast': ('height',),
+    'spots': ('latitude', 'longitude'),
+}
+
+def _colunas_sem_cast(sql):
+    tabelas = [tabela for tabela in COLUNAS_NUMERIC if re.search(rf"\b(FROM|JOIN)\s+{tabela}\b", sql)]
+    sem_cast = []
+    for tabela in tabelas:
+        for coluna in COLUNAS_NUMERIC[tabela]:
+            # Toda leitura da coluna tem o cast; o nome também aparece como alias ("AS coluna").
+            for ocorrencia in re.finditer(rf"(?<!AS )\b(?:\w+\.)?{coluna}\b", sql):
+                if not sql.startswith('::float8', ocorrencia.end()):
+                    sem_cast.append(coluna)
+    return tabelas, sem_cast
+
+LEITURAS = [
+    nome for nome, sql in connection._registered_statements.items() if _colunas_sem_cast(sql)[0]
+]
+
+def test_ha_leituras_registradas_das_tabelas_numericas():
+    assert {'all_spots', 'spot_by_id', 'spots_by_ids', 'forecast_rows', 'forecast_window_rows', 'tide_rows', 'forecast_columns'} <= set(LEITURAS)
+
+@pytest.mark.parametrize("nome", LEITURAS)
+def test_leituras_registradas_fazem_cast_para_float8(nome):
+    _, sem_cast = _colunas_sem_cast(connection._registered_statements[nome])
+    assert sem_cast == []
+
+def test_cursor_de_previsoes_faz_cast_para_float8(monkeypatch):
+    consultas = []
+
+    class ConexaoFalsa:
+        @contextlib.asynccontextmanager
+        async def transaction(self):
+            yield
+
+        async def cursor(self, sql, *args, prefetch=None):
+            consultas.append(sql)
+            yield {'spot_id': 1}
+
+    @contextlib.asynccontextmanager
+    async def acquire_db_connection(query_name):
+        yield ConexaoFalsa()
+
+    monkeypatch.setattr(queries, 'acquire_db_connection', acquire_db_connection)
+    inicio = datetime.datetime(2026, 10, 17, tzinfo=datetime.timezone.utc)
+
+    async def ler():
+        return [linha async for linha in queries.stream_forecast_rows_for_days([1], [(inicio, inicio)])]
+
+    assert asyncio.run(ler()) == [{'spot_id': 1}]
+    tabelas, sem_cast = _colunas_sem_cast(consultas[0])
+    assert tabelas == ['forecasts'] and sem_cast == []
+
+def test_verificacao_encontra_coluna_sem_cast():
+    assert _colunas_sem_cast("SELECT spot_id, height FROM tides_forecast;") == (['tides_forecast'], ['height'])
+    assert _colunas_sem_cast("SELECT f.wave_height_sg FROM forecasts f;")[1] == ['wave_height_sg']
@@ -0,0 +1,107 @@
+import asyncio
+import contextlib
+import datetime
+
+import numpy as np
+
+from src.db import queries
+from src.db.records import ForecastHour, SpotPreferences, TideExtreme
+from src.recommendation.level_scores import compute_level_score_records
+from src.recommendation.recommendation_logic import (
+    DETAILED_SCORE_KEYS,
+    FORECAST_SCORE_FIELDS,
+    build_forecast_matrix,
+    build_forecast_matrix_from_columns,
+    calculate_suitability_scores_batch,
+)
+from src.utils.utils import determine_tide_phase
+
+UTC = datetime.timezone.utc
+INICIO = datetime.datetime(2026, 10, 17, 5, tzinfo=UTC)
+
+def _horas(n, semente):
+    rng = np.random.default_rng(semente)
+    horas = []
+    for i in range(n):
+        valores = {campo: float(rng.uniform(0, 30)) for campo in ForecastHour.FIELDS[1:]}
+        # Alguns valores ausentes.
+        for campo in rng.choice(ForecastHour.FIELDS[1:], size=3, replace=False):
+            valores[campo] = None
+        horas.append(ForecastHour(timestamp_utc=INICIO + datetime.timedelta(hours=i), **valores))
+    return horas
+
+def _colunas(horas):
+    return {campo: np.array([getattr(hora, campo) for hora in horas], dtype=np.float64) for campo in FORECAST_SCORE_FIELDS}
+
+def test_matriz_de_colunas_igual_a_matriz_de_registros():
+    linhas = [_horas(13, 1), _horas(7, 2), _horas(0, 3), _horas(13, 4)]
+    fases = [['rising'] * len(linha) for linha in linhas]
+    esperado = build_forecast_matrix(linhas, fases)
+    obtido = build_forecast_matrix_from_columns([_colunas(linha) for linha in linhas], fases)
+
+    assert set(obtido) == set(esperado)
+    for campo in FORECAST_SCORE_FIELDS:
+        np.testing.assert_array_equal(obtido[campo], esperado[campo])
+    np.testing.assert_array_equal(obtido['valid'], esperado['valid'])
+    assert obtido['tide_phase'].tolist() == esperado['tide_phase'].tolist()
+
+def test_matriz_sem_linhas():
+    obtido = build_forecast_matrix_from_columns([], [])
+    assert obtido['valid'].shape == (0, 0)
+
+def test_colunas_lidas_do_banco(monkeypatch):
+    horas = _horas(3, 5)
+    linha = {
+        'spot_id': 1,
+        'timestamp_utc': [int(hora.timestamp_utc.timestamp()) * 1_000_000 for hora in horas],
+        **{coluna: [getattr(hora, coluna) for hora in horas] for coluna in queries._FORECAST_VALUE_COLUMNS},
+    }
+    consultas = []
+
+    @contextlib.asynccontextmanager
+    async def acquire_db_connection(query_name):
+        yield None
+
+    async def fetch_statement(conn, name, *args):
+        consultas.append((name, args))
+        return [linha]
+
+    monkeypatch.setattr(queries, 'acquire_db_connection', acquire_db_connection)
+    monkeypatch.setattr(queries, 'fetch_statement', fetch_statement)
+    fim = INICIO + datetime.timedelta(hours=2)
+    colunas = asyncio.run(queries.get_forecast_columns_for_spots_from_db((1, 2), INICIO, fim))
+
+    assert consultas == [(queries._FORECAST_COLUMNS_STATEMENT, ([1, 2], INICIO, fim))]
+    # Spots sem linhas ficam de fora.
+    assert list(colunas) == [1]
+    assert colunas[1]['timestamp_utc'].dtype == np.dtype('datetime64[us]')
+    assert colunas[1]['timestamp_utc'].tolist() == [hora.timestamp_utc.replace(tzinfo=None) for hora in horas]
+    for coluna in queries._FORECAST_VALUE_COLUMNS:
+        assert colunas[1][coluna].dtype == np.float64
+        np.testing.assert_array_equal(colunas[1][coluna], np.array([getattr(hora, coluna) for hora in horas], dtype=float))
+
+def test_scores_por_nivel_iguais_ao_caminho_por_registros():
+    horas = _horas(30, 6)
+    colunas = _colunas(horas)
+    colunas['timestamp_utc'] = np.array([hora.timestamp_utc.replace(tzinfo=None) for hora in horas], dtype='datetime64[us]')
+    extremos = [
+        TideExtreme(INICIO - datetime.timedelta(hours=3), 'high', 1.3),
+        TideExtreme(INICIO + datetime.timedelta(hours=4), 'low', 0.2),
+        TideExtreme(INICIO + datetime.timedelta(hours=10, minutes=20), 'high', 1.4),
+        TideExtreme(INICIO + datetime.timedelta(hours=16, minutes=40), 'low', 0.3),
+    ]
+    niveis = [
+        SpotPreferences(surf_level='iniciante', min_wave_height=0.3, ideal_wave_height=0.8, max_wave_height=1.2, ideal_tide_type='rising'),
+        SpotPreferences(surf_level='avancado', min_wave_height=1.0, ideal_wave_height=2.0, max_wave_height=3.5),
+    ]
+
+    registros = compute_level_score_records(7, colunas, extremos, niveis)
+
+    # Referência: uma fase por hora com determine_tide_phase e a matriz montada dos registros.
+    fases = [determine_tide_phase(hora.timestamp_utc, extremos) for hora in horas]
+    finais, detalhados = calculate_suitability_scores_batch(build_forecast_matrix([horas] * 2, [fases] * 2), niveis)
+    esperado = [
+        (nivel.surf_level, 7, hora.timestamp_utc, finais[i, h], *(detalhados[chave][i, h] for chave in DETAILED_SCORE_KEYS))
+        for i, nivel in enumerate(niveis) for h, hora in enumerate(horas)
+    ]
+    assert registros == esperado
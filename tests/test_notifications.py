@@ -0,0 +1,59 @@
+import datetime
+import json
+
+import pytest
+
+from src.db import notifications
+from src.db.cache import (
+    forecast_cache, tide_cache, preference_cache, level_score_cache, tide_model_cache, preset_result_cache
+)
+
+CACHES = (forecast_cache, tide_cache, preference_cache, level_score_cache, tide_model_cache, preset_result_cache)
+DIA = datetime.date(2026, 10, 17)
+
+@pytest.fixture(autouse=True)
+def caches_preenchidos():
+    for cache in CACHES:
+        cache.clear()
+        cache.set((1, DIA), 'dia 1')
+        cache.set((1, DIA + datetime.timedelta(days=1)), 'dia 2')
+    yield
+    for cache in CACHES:
+        cache.clear()
+
+def _notificar(payload):
+    notifications._handle_forecast_update(None, 0, 'forecast_updates', payload)
+
+def test_atualizacao_remove_so_os_dias_da_tabela():
+    _notificar(json.dumps({
+        'table': 'tides_forecast', 'spot_id': 1,
+        'start_utc': '2026-10-17T03:00:00+00:00', 'end_utc': '2026-10-17T21:00:00+00:00'
+    }))
+    assert tide_cache.get((1, DIA)) is None
+    assert tide_cache.get((1, DIA + datetime.timedelta(days=1))) == 'dia 2'
+    assert forecast_cache.get((1, DIA)) == 'dia 1'
+
+def test_preferencias_de_um_usuario():
+    _notificar(json.dumps({'table': 'user_spot_preferences', 'user_id': 1}))
+    assert len(preference_cache) == 0
+    assert len(forecast_cache) == 2
+
+@pytest.mark.parametrize("payload", ['não é json', json.dumps({'table': 'desconhecida', 'spot_id': 1})])
+def test_notificacao_invalida_limpa_todos_os_caches(payload):
+    _notificar(payload)
+    assert all(len(cache) == 0 for cache in CACHES)
+
+def test_queda_do_listener_limpa_todos_os_caches(monkeypatch):
+    monkeypatch.setattr(notifications, '_stopping', True)
+    notifications._handle_listener_termination(None)
+    # Parando a aplicação: nada é limpo nem reconectado.
+    assert all(len(cache) == 2 for cache in CACHES)
+
+    class LoopFalso:
+        def create_task(self, coro):
+            coro.close()
+
+    monkeypatch.setattr(notifications, '_stopping', False)
+    monkeypatch.setattr(notifications.asyncio, 'get_running_loop', LoopFalso)
+    notifications._handle_listener_termination(None)
+    assert all(len(cache) == 0 for cache in CACHES)
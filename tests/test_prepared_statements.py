@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+
+import asyncpg
+import dotenv
+import pytest
+
+from src.db import connection
+from src.db.connection import _prepare_registered_statements, fetch_statement, fetchrow_statement
+from src.utils import config
+
+STATEMENTS = {
+    'spots': "SELECT * FROM spots;",
+    'spot_por_id': "SELECT * FROM spots WHERE spot_id = $1;",
+    'level_scores': "SELECT * FROM level_scores WHERE spot_id = $1;",
+}
+
+class StatementFalso:
+    def __init__(self, sql, chamadas):
+        self.sql = sql
+        self.chamadas = chamadas
+        self.invalido = False
+
+    async def fetch(self, *args):
+        self.chamadas.append(('prepared fetch', self.sql, args))
+        if self.invalido:
+            raise asyncpg.exceptions.InvalidCachedStatementError("cached statement plan is invalid")
+        return [args]
+
+    async def fetchrow(self, *args):
+        self.chamadas.append(('prepared fetchrow', self.sql, args))
+        return args
+
+class ConexaoFalsa:
+    def __init__(self, tabelas_ausentes=()):
+        self.prepared_statements = {}
+        self.tabelas_ausentes = tabelas_ausentes
+        self.chamadas = []
+
+    async def prepare(self, sql):
+        self.chamadas.append(('prepare', sql, ()))
+        if any(tabela in sql for tabela in self.tabelas_ausentes):
+            raise asyncpg.exceptions.UndefinedTableError("relation does not exist")
+        return StatementFalso(sql, self.chamadas)
+
+    async def fetch(self, sql, *args):
+        self.chamadas.append(('fetch', sql, args))
+        return [args]
+
+    async def fetchrow(self, sql, *args):
+        self.chamadas.append(('fetchrow', sql, args))
+        return args
+
+@pytest.fixture
+def statements(monkeypatch):
+    monkeypatch.setattr(connection, '_registered_statements', dict(STATEMENTS))
+    monkeypatch.setattr(connection, '_unprepared_statements', set())
+
+def test_desligado_por_padrao_executa_o_sql_normalmente(statements, monkeypatch):
+    monkeypatch.setattr(connection, 'DB_PREPARED_STATEMENTS_ENABLED', False)
+    conn = ConexaoFalsa()
+    asyncio.run(_prepare_registered_statements(conn))
+    assert conn.prepared_statements == {}
+
+    assert asyncio.run(fetchrow_statement(conn, 'spot_por_id', 7)) == (7,)
+    assert conn.chamadas == [('fetchrow', STATEMENTS['spot_por_id'], (7,))]
+
+def test_statements_preparados_uma_vez_e_reutilizados(statements, monkeypatch):
+    monkeypatch.setattr(connection, 'DB_PREPARED_STATEMENTS_ENABLED', True)
+    conn = ConexaoFalsa()
+    asyncio.run(_prepare_registered_statements(conn))
+    assert set(conn.prepared_statements) == set(STATEMENTS)
+
+    async def consultar():
+        for spot_id in (1, 2, 3):
+            await fetch_statement(conn, 'spot_por_id', spot_id)
+
+    asyncio.run(consultar())
+    prepares = [chamada for chamada in conn.chamadas if chamada[0] == 'prepare']
+    assert len(prepares) == len(STATEMENTS)
+    assert [chamada[0] for chamada in conn.chamadas[len(prepares):]] == ['prepared fetch'] * 3
+
+def test_prepare_com_falha_nao_impede_a_conexao(statements, monkeypatch, capsys):
+    monkeypatch.setattr(connection, 'DB_PREPARED_STATEMENTS_ENABLED', True)
+    conexoes = [ConexaoFalsa(tabelas_ausentes=('level_scores',)) for _ in range(3)]
+    for conn in conexoes:
+        asyncio.run(_prepare_registered_statements(conn))
+    # A falha é registrada no log uma vez, não por conexão.
+    assert capsys.readouterr().out.count("Could not prepare statement level_scores") == 1
+
+    conn = conexoes[0]
+    assert 'level_scores' not in conn.prepared_statements and 'spots' in conn.prepared_statements
+    asyncio.run(fetch_statement(conn, 'level_scores', 1))
+    assert conn.chamadas[-1] == ('fetch', STATEMENTS['level_scores'], (1,))
+
+def test_statement_invalidado_e_preparado_de_novo(statements, monkeypatch):
+    monkeypatch.setattr(connection, 'DB_PREPARED_STATEMENTS_ENABLED', True)
+    conn = ConexaoFalsa()
+    asyncio.run(_prepare_registered_statements(conn))
+    antigo = conn.prepared_statements['spots']
+    antigo.invalido = True
+
+    assert asyncio.run(fetch_statement(conn, 'spots')) == [()]
+    novo = conn.prepared_statements['spots']
+    assert novo is not antigo
+    assert [chamada[0] for chamada in conn.chamadas[-3:]] == ['prepared fetch', 'prepare', 'prepared fetch']
+
+def test_conexao_sem_prepared_statements(statements):
+    # Conexões fora do pool (ex.: a do listener) não têm o atributo.
+    class ConexaoSimples:
+        async def fetch(self, sql, *args):
+            return sql
+
+    assert asyncio.run(fetch_statement(ConexaoSimples(), 'spots')) == STATEMENTS['spots']
+
+def test_configuracao_padrao_desliga_os_prepared_statements(monkeypatch):
+    # Sem o .env local, que pode ligar a opção.
+    monkeypatch.setattr(dotenv, 'load_dotenv', lambda *args, **kwargs: False)
+    monkeypatch.delenv('DB_PREPARED_STATEMENTS_ENABLED', raising=False)
+    try:
+        assert importlib.reload(config).DB_PREPARED_STATEMENTS_ENABLED is False
+        monkeypatch.setenv('DB_PREPARED_STATEMENTS_ENABLED', 'true')
+        assert importlib.reload(config).DB_PREPARED_STATEMENTS_ENABLED is True
+    finally:
+        monkeypatch.undo()
+        importlib.reload(config)
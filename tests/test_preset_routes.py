@@ -0,0 +1,60 @@
+import datetime
+
+import pytest
+
+from src.api.routes.preset_routes import preset_day_offsets, spot_local_dates
+from src.utils.config import FORECAST_DAYS
+
+UTC = datetime.timezone.utc
+SABADO = datetime.date(2026, 10, 17)
+
+# Dias da semana dos presets: 0 = Domingo ... 6 = Sábado.
+DOMINGO, SEGUNDA, SEXTA, SABADO_PRESET = 0, 1, 5, 6
+
+def test_sem_weekdays_todos_os_dias_do_horizonte():
+    assert preset_day_offsets(None, SABADO) == list(range(FORECAST_DAYS + 1))
+    # Lista vazia também não filtra.
+    assert preset_day_offsets([], SABADO) == list(range(FORECAST_DAYS + 1))
+
+def test_semana_que_vira():
+    # Hoje é sábado: domingo e segunda são os offsets 1 e 2.
+    assert preset_day_offsets([SEGUNDA, DOMINGO], SABADO, forecast_days=5) == [1, 2]
+    assert preset_day_offsets([SABADO_PRESET], SABADO, forecast_days=7) == [0, 7]
+
+def test_dia_fora_do_horizonte():
+    # A próxima sexta é daqui a 6 dias.
+    assert preset_day_offsets([SEXTA], SABADO, forecast_days=5) == []
+    assert preset_day_offsets([SEXTA], SABADO, forecast_days=6) == [6]
+
+@pytest.mark.parametrize("hoje", [SABADO + datetime.timedelta(days=dias) for dias in range(7)])
+def test_offsets_batem_com_o_dia_da_semana(hoje):
+    for weekday in range(7):
+        offsets = preset_day_offsets([weekday], hoje, forecast_days=6)
+        assert len(offsets) == 1
+        dia = hoje + datetime.timedelta(days=offsets[0])
+        assert (dia.weekday() + 1) % 7 == weekday
+
+def test_data_local_de_cada_fuso():
+    spots = [
+        {'spot_id': 1, 'timezone': 'America/Sao_Paulo'},
+        {'spot_id': 2, 'timezone': 'Pacific/Auckland'},
+        {'spot_id': 3, 'timezone': 'Europe/Lisbon'},
+        {'spot_id': 4, 'timezone': None},
+    ]
+    # 01h UTC de sábado: ainda sexta em São Paulo, já sábado à tarde em Auckland.
+    datas = spot_local_dates(spots, datetime.datetime(2026, 10, 17, 1, tzinfo=UTC))
+    assert datas == {
+        'America/Sao_Paulo': datetime.date(2026, 10, 16),
+        'Pacific/Auckland': datetime.date(2026, 10, 17),
+        'Europe/Lisbon': datetime.date(2026, 10, 17),
+    }
+    # Com a data local de cada fuso, o mesmo weekday dá offsets diferentes.
+    assert preset_day_offsets([SABADO_PRESET], datas['America/Sao_Paulo']) == [1]
+    assert preset_day_offsets([SABADO_PRESET], datas['Pacific/Auckland']) == [0]
+
+def test_fuso_invalido_fica_de_fora():
+    spots = [{'spot_id': 1, 'timezone': 'Marte/Olympus'}, {'spot_id': 2, 'timezone': 'UTC'}]
+    assert spot_local_dates(spots, datetime.datetime(2026, 10, 17, 1, tzinfo=UTC)) == {'UTC': SABADO}
+
+def test_sem_spots():
+    assert spot_local_dates([]) == {}
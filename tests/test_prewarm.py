@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+
+import pytest
+
+from src.api import prewarm
+from src.api.routes import preset_routes
+from src.db.cache import TTLCache, preset_result_cache
+
+def _preset(preset_id, user_id=None):
+    return {
+        'preset_id': preset_id, 'preset_name': f'Preset {preset_id}', 'user_id': user_id or f'usuario-{preset_id}',
+        'spot_ids': [1], 'start_time': datetime.time(6), 'end_time': datetime.time(10),
+        'weekdays': None, 'updated_at': None,
+    }
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    preset_result_cache.clear()
+    yield
+    preset_result_cache.clear()
+
+@pytest.fixture
+def presets(monkeypatch):
+    estado = {'presets': [_preset(i) for i in range(6)], 'executados': [], 'ativos': 0, 'pico': 0, 'falhar': set()}
+
+    async def get_active_default_presets():
+        return list(estado['presets'])
+
+    async def run_preset_logic(user_id, preset):
+        estado['ativos'] += 1
+        estado['pico'] = max(estado['pico'], estado['ativos'])
+        try:
+            await asyncio.sleep(0.001)
+            estado['executados'].append(preset['preset_id'])
+            if preset['preset_id'] in estado['falhar']:
+                raise RuntimeError("falhou")
+            return {}, 200
+        finally:
+            estado['ativos'] -= 1
+
+    monkeypatch.setattr(prewarm, 'get_active_default_presets', get_active_default_presets)
+    monkeypatch.setattr(prewarm, 'run_preset_logic', run_preset_logic)
+    return estado
+
+def test_pre_aquece_todos_com_concorrencia_limitada(presets):
+    presets['falhar'] = {3}
+    assert asyncio.run(prewarm.prewarm_default_presets(concurrency=2)) == 5
+    assert sorted(presets['executados']) == list(range(6))
+    assert presets['pico'] == 2
+
+def test_para_no_limite_do_cache(presets, monkeypatch, capsys):
+    monkeypatch.setattr(prewarm, 'preset_result_cache', TTLCache(4, 60))
+    assert asyncio.run(prewarm.prewarm_default_presets()) == 4
+    assert sorted(presets['executados']) == [0, 1, 2, 3]
+    assert "só os 4 primeiros" in capsys.readouterr().out
+
+def test_pedidos_durante_a_execucao_sao_agrupados(presets):
+    async def principal():
+        prewarm.schedule_default_preset_prewarm()
+        tarefa = prewarm._prewarm_task
+        # Duas ingestões terminam durante o pré-aquecimento: só mais uma execução.
+        await asyncio.sleep(0)
+        prewarm.schedule_default_preset_prewarm()
+        prewarm.schedule_default_preset_prewarm()
+        await tarefa
+        assert prewarm._prewarm_task is None
+
+    asyncio.run(principal())
+    assert len(presets['executados']) == 12
+
+def test_stop_cancela_o_pre_aquecimento(presets):
+    presets['presets'] = [_preset(1)]
+
+    async def principal():
+        prewarm.schedule_default_preset_prewarm()
+        tarefa = prewarm._prewarm_task
+        while not presets['ativos']:
+            await asyncio.sleep(0)
+        await prewarm.stop_default_preset_prewarm()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+        assert prewarm._prewarm_task is None
+
+    asyncio.run(principal())
+    assert presets['executados'] == [] and presets['ativos'] == 0
+
+def test_resultado_pre_aquecido_atende_a_primeira_requisicao(monkeypatch):
+    chamadas = []
+
+    async def get_spots_by_ids(spot_ids):
+        return {1: {'spot_id': 1, 'timezone': 'America/Sao_Paulo'}}
+
+    async def generate_recommendations_logic(user_id, spot_ids, day_offsets, start, end, weekdays=None):
+        chamadas.append(user_id)
+        return [{'spot_id': 1}], 200
+
+    monkeypatch.setattr(preset_routes, 'get_spots_by_ids', get_spots_by_ids)
+    monkeypatch.setattr(preset_routes, 'generate_recommendations_logic', generate_recommendations_logic)
+    preset = _preset(1, user_id='usuario')
+
+    async def principal():
+        aquecido, _ = await preset_routes.run_preset_logic('usuario', preset)
+        requisicao, status_code = await preset_routes.run_preset_logic('usuario', preset)
+        return aquecido, requisicao, status_code
+
+    aquecido, requisicao, status_code = asyncio.run(principal())
+    assert status_code == 200 and requisicao is aquecido
+    assert chamadas == ['usuario']
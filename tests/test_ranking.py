@@ -0,0 +1,93 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from src.recommendation.ranking import merge_consecutive_slots, top_n_indices
+
+UTC = datetime.timezone.utc
+INICIO = datetime.datetime(2026, 10, 17, 20, tzinfo=UTC)
+
+def _ordem_estavel(scores, n, min_score=None):
+    """Referência: ordenação completa por score decrescente, empates pela ordem dos índices."""
+    indices = [
+        i for i, score in enumerate(scores)
+        if not np.isnan(score) and (min_score is None or score >= min_score)
+    ]
+    return sorted(indices, key=lambda i: (-scores[i], i))[:max(n, 0)]
+
+def test_top_n_em_ordem_decrescente():
+    assert top_n_indices([10.0, 80.0, 35.5, 90.0, 12.0], 3).tolist() == [3, 1, 2]
+
+@pytest.mark.parametrize("n", [5, 6, 100])
+def test_n_maior_ou_igual_ao_tamanho(n):
+    assert top_n_indices([10.0, 80.0, 35.5, 90.0, 12.0], n).tolist() == [3, 1, 2, 4, 0]
+
+@pytest.mark.parametrize("n", [0, -1])
+def test_n_zero_ou_negativo(n):
+    resultado = top_n_indices([10.0, 80.0], n)
+    assert resultado.tolist() == [] and resultado.dtype == np.intp
+
+def test_scores_vazios():
+    assert top_n_indices([], 3).tolist() == []
+
+def test_ignora_nan_e_scores_abaixo_do_minimo():
+    scores = [np.nan, 50.0, 20.0, np.nan, 70.0]
+    assert top_n_indices(scores, 10).tolist() == [4, 1, 2]
+    assert top_n_indices(scores, 10, min_score=50.0).tolist() == [4, 1]
+    assert top_n_indices(scores, 10, min_score=99.0).tolist() == []
+
+def test_empates_no_corte_ficam_com_os_menores_indices():
+    # O argpartition pode escolher qualquer um dos empatados no corte.
+    assert top_n_indices([5.0] * 20, 3).tolist() == [0, 1, 2]
+    assert top_n_indices([1.0, 7.0, 3.0, 7.0, 3.0, 3.0, 0.0, 3.0], 3).tolist() == [1, 3, 2]
+
+def test_empates_aleatorios_iguais_a_ordenacao_completa():
+    rng = np.random.default_rng(3)
+    for _ in range(500):
+        scores = rng.integers(0, 4, rng.integers(1, 40)).astype(float)
+        scores[rng.random(scores.size) < 0.1] = np.nan
+        n = int(rng.integers(0, 10))
+        min_score = [None, 1.0][int(rng.integers(0, 2))]
+        assert top_n_indices(scores, n, min_score).tolist() == _ordem_estavel(scores, n, min_score)
+
+def _slot(spot_id, horas, score):
+    return {'spot_id': spot_id, 'timestamp_utc': INICIO + datetime.timedelta(hours=horas), 'suitability_score': score}
+
+def test_junta_horas_consecutivas_de_um_spot():
+    slots = [_slot(1, 2, 60.0), _slot(1, 0, 40.0), _slot(1, 1, 80.0)]
+    sessoes = merge_consecutive_slots(slots)
+    assert len(sessoes) == 1
+    sessao = sessoes[0]
+    assert sessao['start_utc'] == INICIO and sessao['end_utc'] == INICIO + datetime.timedelta(hours=2)
+    assert [slot['suitability_score'] for slot in sessao['slots']] == [40.0, 80.0, 60.0]
+    assert sessao['best_score'] == 80.0
+    assert sessao['average_score'] == pytest.approx(60.0)
+
+def test_horas_nao_contiguas_viram_sessoes_separadas():
+    slots = [_slot(1, 0, 50.0), _slot(1, 1, 55.0), _slot(1, 3, 90.0), _slot(1, 5, 10.0)]
+    sessoes = merge_consecutive_slots(slots)
+    # Ordenadas pelo melhor score de cada sessão.
+    assert [(sessao['start_utc'].hour, sessao['end_utc'].hour) for sessao in sessoes] == [(23, 23), (20, 21), (1, 1)]
+    assert [sessao['best_score'] for sessao in sessoes] == [90.0, 55.0, 10.0]
+
+def test_sessao_atravessa_a_virada_do_dia():
+    # 20h..03h UTC do dia seguinte.
+    slots = [_slot(1, horas, 50.0 + horas) for horas in range(8)]
+    sessoes = merge_consecutive_slots(slots)
+    assert len(sessoes) == 1
+    assert sessoes[0]['start_utc'].date() != sessoes[0]['end_utc'].date()
+    assert len(sessoes[0]['slots']) == 8
+
+def test_spots_diferentes_nao_se_juntam():
+    slots = [_slot(1, 0, 50.0), _slot(2, 1, 60.0), _slot(1, 1, 40.0)]
+    sessoes = merge_consecutive_slots(slots)
+    assert [(sessao['spot_id'], len(sessao['slots'])) for sessao in sessoes] == [(2, 1), (1, 2)]
+
+def test_passo_diferente_de_uma_hora():
+    slots = [_slot(1, 0, 50.0), _slot(1, 1, 60.0)]
+    assert len(merge_consecutive_slots(slots, step=datetime.timedelta(minutes=30))) == 2
+    assert len(merge_consecutive_slots(slots, step=datetime.timedelta(hours=1))) == 1
+
+def test_sem_horarios():
+    assert merge_consecutive_slots([]) == []
@@ -0,0 +1,197 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from src.db.records import ForecastHour, SpotPreferences
+from src.recommendation.current_score import calcular_score_corrente
+from src.recommendation.recommendation_logic import (
+    DETAILED_SCORE_KEYS,
+    build_forecast_matrix,
+    calculate_suitability_scores_batch,
+)
+from src.recommendation.temperature_score import calcular_score_temperatura_agua, calcular_score_temperatura_ar
+from src.recommendation.tide_score import calcular_score_mare
+from src.recommendation.wave_score import calcular_score_onda
+from src.recommendation.wind_score import calcular_score_vento
+
+# Paridade de calculate_suitability_scores_batch com o antigo cálculo escalar por hora
+# (calculate_suitability_score, removido), copiado abaixo como referência.
+
+TOLERANCIA = 0.01
+
+def _como_float(valor):
+    return float(valor.item()) if isinstance(valor, np.ndarray) else float(valor)
+
+def _score_escalar(forecast_entry, spot_preferences, tide_phase):
+    """
+    O cálculo escalar antigo. `forecast_entry` e `spot_preferences` são dicts sem as chaves
+    nulas: o código antigo lia com dict.get(chave, padrão), que só usa o padrão quando a chave falta.
+    """
+    detailed_scores = {}
+
+    def previsao(chave):
+        valor = forecast_entry.get(chave)
+        return float(valor) if valor is not None else None
+
+    previsao_tamanho = previsao('wave_height_sg')
+    previsao_direcao = previsao('wave_direction_sg')
+    previsao_periodo = previsao('wave_period_sg')
+    previsao_sec_tamanho = float(forecast_entry.get('secondary_swell_height_sg', 0.0))
+    previsao_sec_direcao = float(forecast_entry.get('secondary_swell_direction_sg', 0.0))
+    previsao_sec_periodo = float(forecast_entry.get('secondary_swell_period_sg', 0.0))
+    score_onda = 0
+    if all(v is not None for v in [previsao_tamanho, previsao_direcao, previsao_periodo]):
+        score_onda = _como_float(calcular_score_onda(
+            previsao_tamanho, previsao_direcao, previsao_periodo,
+            float(spot_preferences.get('min_wave_height', 0.5)),
+            float(spot_preferences.get('ideal_wave_height', 1.5)),
+            float(spot_preferences.get('max_wave_height', 2.5)),
+            float(spot_preferences.get('ideal_wave_direction', 180.0)),
+            float(spot_preferences.get('ideal_wave_period', 10.0)),
+            previsao_sec_tamanho, previsao_sec_direcao, previsao_sec_periodo
+        ))
+    detailed_scores['wave_score'] = score_onda
+
+    wind_speed = previsao('wind_speed_sg')
+    wind_dir = previsao('wind_direction_sg')
+    score_vento = 0.0
+    if wind_speed is not None and wind_dir is not None:
+        score_vento = _como_float(calcular_score_vento(
+            wind_speed, wind_dir,
+            float(spot_preferences.get('ideal_wind_direction', 0.0)),
+            float(spot_preferences.get('ideal_wind_speed', 5.0)),
+            float(spot_preferences.get('max_wind_speed', 20.0))
+        ))
+    detailed_scores['wind_score'] = score_vento
+
+    previsao_mare = forecast_entry.get('sea_level_sg')
+    mare_tipo_ideal = spot_preferences.get('ideal_tide_type')
+    score_mare = 0.0
+    if all(v is not None for v in [previsao_mare, tide_phase, mare_tipo_ideal]):
+        score_mare = _como_float(calcular_score_mare(
+            previsao_mare, float(spot_preferences.get('ideal_tide_height', 0.0)), tide_phase, mare_tipo_ideal
+        ))
+    detailed_scores['tide_score'] = score_mare
+
+    water_temp = forecast_entry.get('water_temperature_sg')
+    score_temperatura_agua = 0.0
+    if water_temp is not None:
+        score_temperatura_agua = _como_float(calcular_score_temperatura_agua(
+            water_temp, float(spot_preferences.get('ideal_water_temperature', 22.0))
+        ))
+    detailed_scores['water_temperature_score'] = score_temperatura_agua
+
+    air_temp = forecast_entry.get('air_temperature_sg')
+    score_temperatura_ar = 0.0
+    if air_temp is not None:
+        score_temperatura_ar = _como_float(calcular_score_temperatura_ar(
+            air_temp, float(spot_preferences.get('ideal_air_temperature', 25.0))
+        ))
+    detailed_scores['air_temperature_score'] = score_temperatura_ar
+
+    current_speed = forecast_entry.get('current_speed_sg')
+    score_corrente = 0.0
+    if current_speed is not None:
+        score_corrente = _como_float(calcular_score_corrente(
+            current_speed, float(spot_preferences.get('ideal_current_speed', 0.0))
+        ))
+    detailed_scores['current_score'] = score_corrente
+
+    final_suitability_score = (
+        score_onda * 0.50 +
+        score_vento * 0.25 +
+        score_mare * 0.15 +
+        score_corrente * 0.05 +
+        score_temperatura_agua * 0.03 +
+        score_temperatura_ar * 0.02
+    )
+    final_suitability_score = round(float(np.clip(final_suitability_score, 0, 100)), 2)
+    return final_suitability_score, detailed_scores
+
+INICIO = datetime.datetime(2026, 10, 17, 8, tzinfo=datetime.timezone.utc)
+
+def _hora(i, **valores):
+    base = dict(
+        wave_height_sg=1.4, wave_direction_sg=170.0, wave_period_sg=9.0,
+        secondary_swell_height_sg=0.4, secondary_swell_direction_sg=200.0, secondary_swell_period_sg=7.0,
+        wind_speed_sg=4.0, wind_direction_sg=20.0, sea_level_sg=0.6,
+        water_temperature_sg=21.0, air_temperature_sg=24.0, current_speed_sg=0.2,
+    )
+    base.update(valores)
+    return ForecastHour(timestamp_utc=INICIO + datetime.timedelta(hours=i), **base)
+
+# (hora, fase da maré)
+HORAS = [
+    (_hora(0), 'rising'),
+    (_hora(1, wave_height_sg=2.1, wave_direction_sg=355.0, wave_period_sg=13.0), 'falling'),
+    # Swell secundário ausente (None) ou NaN: nenhum impacto.
+    (_hora(2, secondary_swell_height_sg=None, secondary_swell_direction_sg=None, secondary_swell_period_sg=None), 'high'),
+    (_hora(3, secondary_swell_height_sg=float('nan'), secondary_swell_period_sg=float('nan')), 'low'),
+    (_hora(4, secondary_swell_height_sg=2.5, secondary_swell_direction_sg=10.0, secondary_swell_period_sg=15.0), 'rising'),
+    # Vento ausente.
+    (_hora(5, wind_speed_sg=None), 'rising'),
+    (_hora(6, wind_direction_sg=None, wind_speed_sg=18.0), 'falling'),
+    # Sem fase da maré ou sem nível do mar.
+    (_hora(7), None),
+    (_hora(8, sea_level_sg=None), 'falling'),
+    # Onda ausente ou fora dos limites (score de onda negativo).
+    (_hora(9, wave_period_sg=None), 'rising'),
+    (_hora(10, wave_height_sg=4.5), 'rising'),
+    (_hora(11, wave_height_sg=0.1), 'before_low'),
+    (_hora(12, water_temperature_sg=None, air_temperature_sg=None, current_speed_sg=None), 'unknown'),
+    (_hora(13, wave_period_sg=0.0, wind_speed_sg=0.0), 'high'),
+]
+
+PREFERENCIAS = [
+    # Todas as preferências usadas pelo cálculo.
+    {
+        'min_wave_height': 0.8, 'ideal_wave_height': 1.5, 'max_wave_height': 2.5,
+        'ideal_wave_direction': 175.0, 'ideal_wave_period': 10.0,
+        'ideal_wind_direction': 30.0, 'ideal_wind_speed': 6.0, 'max_wind_speed': 22.0,
+        'ideal_tide_type': 'rising', 'ideal_tide_height': 0.7,
+        'ideal_water_temperature': 20.0, 'ideal_air_temperature': 26.0, 'ideal_current_speed': 0.1,
+    },
+    # Só algumas: as demais usam os padrões de _preferencia.
+    {'min_wave_height': 1.0, 'ideal_wave_height': 2.0, 'max_wave_height': 3.0, 'ideal_tide_type': 'qualquer'},
+    # Sem tipo de maré ideal: score de maré 0.
+    {'ideal_wave_height': 1.2, 'max_wind_speed': 15.0},
+    # Nenhuma preferência.
+    {},
+]
+
+@pytest.mark.parametrize("preferencias", PREFERENCIAS)
+def test_batch_igual_ao_calculo_escalar(preferencias):
+    horas = [hora for hora, _ in HORAS]
+    fases = [fase for _, fase in HORAS]
+    matriz = build_forecast_matrix([horas], [fases])
+    final_scores, detailed_scores = calculate_suitability_scores_batch(matriz, [SpotPreferences.from_mapping(preferencias)])
+
+    for h, (hora, fase) in enumerate(HORAS):
+        # O cálculo escalar recebia o dict sem as chaves nulas (e NaN, que vinha como None do banco).
+        entrada = {
+            chave: valor for chave, valor in hora.as_dict().items()
+            if valor is not None and not (isinstance(valor, float) and np.isnan(valor))
+        }
+        esperado_final, esperado_detalhado = _score_escalar(entrada, preferencias, fase)
+        assert final_scores[0, h] == pytest.approx(esperado_final, abs=TOLERANCIA), f"hora {h}"
+        for chave in DETAILED_SCORE_KEYS:
+            assert detailed_scores[chave][0, h] == pytest.approx(esperado_detalhado[chave], abs=TOLERANCIA), f"hora {h}, {chave}"
+
+def test_batch_com_varias_linhas_de_tamanhos_diferentes():
+    linhas = [[hora for hora, _ in HORAS[:5]], [hora for hora, _ in HORAS[5:]]]
+    fases = [[fase for _, fase in HORAS[:5]], [fase for _, fase in HORAS[5:]]]
+    preferencias = [PREFERENCIAS[0], PREFERENCIAS[1]]
+    matriz = build_forecast_matrix(linhas, fases)
+    final_scores, _ = calculate_suitability_scores_batch(matriz, [SpotPreferences.from_mapping(p) for p in preferencias])
+
+    assert final_scores.shape == (2, len(HORAS) - 5)
+    for i, (linha, fases_linha, preferencia) in enumerate(zip(linhas, fases, preferencias)):
+        for h, (hora, fase) in enumerate(zip(linha, fases_linha)):
+            entrada = {
+                chave: valor for chave, valor in hora.as_dict().items()
+                if valor is not None and not (isinstance(valor, float) and np.isnan(valor))
+            }
+            assert final_scores[i, h] == pytest.approx(_score_escalar(entrada, preferencia, fase)[0], abs=TOLERANCIA)
+    # Posições além do fim da linha mais curta ficam com score 0.
+    assert np.all(final_scores[0, 5:] == 0.0)
@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+
+import orjson
+import pytest
+
+from src.api.responses import FastJSONResponse
+from src.db import queries
+from src.db.cache import tide_cache
+from src.db.records import ForecastHour, LevelScoreHour, SpotPreferences, TideExtreme
+
+UTC = datetime.timezone.utc
+HORA = datetime.datetime(2026, 10, 17, 9, tzinfo=UTC)
+
+def test_forecast_hour_de_uma_linha():
+    linha = {campo: float(i) for i, campo in enumerate(ForecastHour.FIELDS)}
+    linha['timestamp_utc'] = HORA
+    linha['spot_id'] = 3  # colunas a mais são ignoradas
+    hora = ForecastHour.from_record(linha)
+    assert hora.timestamp_utc == HORA and hora.wave_height_sg == 1.0 and hora.sea_level_sg == 16.0
+    assert hora.as_dict() == {campo: linha[campo] for campo in ForecastHour.FIELDS}
+
+def test_registros_sao_imutaveis_e_sem_dict():
+    hora = ForecastHour(HORA, wave_height_sg=1.2)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        hora.wave_height_sg = 2.0
+    assert not hasattr(hora, '__dict__')
+    # Imutáveis e comparáveis por valor: podem ser compartilhados pelos caches.
+    assert hora == ForecastHour(HORA, wave_height_sg=1.2)
+    assert hash(hora) == hash(ForecastHour(HORA, wave_height_sg=1.2))
+
+def test_tide_extreme_e_level_score_hour():
+    extremo = TideExtreme.from_record({'timestamp_utc': HORA, 'tide_type': 'high', 'height': 1.4, 'spot_id': 1})
+    assert extremo == TideExtreme(HORA, 'high', 1.4)
+    assert extremo.as_dict() == {'timestamp_utc': HORA, 'tide_type': 'high', 'height': 1.4}
+
+    linha = {'timestamp_utc': HORA, 'suitability_score': 71.5, 'wave_score': 80.0, 'wind_score': 60.0, 'tide_score': 50.0,
+             'water_temperature_score': 90.0, 'air_temperature_score': 95.0, 'current_score': 100.0, 'window_index': 0}
+    assert LevelScoreHour.from_record(linha).suitability_score == 71.5
+
+def test_spot_preferences_de_um_mapping():
+    preferencias = SpotPreferences.from_mapping({
+        'spot_id': 1, 'ideal_wave_height': 1.5, 'ideal_tide_type': 'rising', 'is_active': True,
+        # Colunas de auditoria e desconhecidas ficam de fora.
+        'created_at': HORA, 'updated_at': HORA, 'is_deleted': False,
+    })
+    assert preferencias.ideal_wave_height == 1.5 and preferencias.max_wave_height is None
+    assert preferencias.as_dict() == {'spot_id': 1, 'ideal_wave_height': 1.5, 'ideal_tide_type': 'rising', 'is_active': True}
+    assert SpotPreferences.from_mapping({}).as_dict() == {}
+
+def test_registros_serializados_em_json():
+    corpo = orjson.loads(FastJSONResponse({
+        'hora': ForecastHour(HORA, wave_height_sg=1.2),
+        'mare': TideExtreme(HORA, 'low'),
+    }).body)
+    assert corpo['hora']['wave_height_sg'] == 1.2 and corpo['hora']['wind_speed_sg'] is None
+    assert corpo['mare'] == {'timestamp_utc': '2026-10-17T09:00:00+00:00', 'tide_type': 'low', 'height': None}
+
+def test_consulta_de_mares_devolve_registros_e_usa_o_cache(monkeypatch):
+    linhas = [
+        {'spot_id': 1, 'timestamp_utc': HORA - datetime.timedelta(hours=8), 'tide_type': 'low', 'height': 0.2},
+        {'spot_id': 1, 'timestamp_utc': HORA, 'tide_type': 'high', 'height': 1.4},
+        {'spot_id': 1, 'timestamp_utc': HORA + datetime.timedelta(hours=19), 'tide_type': 'low', 'height': 0.3},
+        {'spot_id': 1, 'timestamp_utc': HORA + datetime.timedelta(hours=22), 'tide_type': 'high', 'height': 1.3},
+    ]
+    consultas = []
+
+    @contextlib.asynccontextmanager
+    async def acquire_db_connection(query_name):
+        yield None
+
+    async def fetch_statement(conn, name, spot_ids, start_utc, end_utc):
+        consultas.append((spot_ids, start_utc, end_utc))
+        return [linha for linha in linhas if linha['spot_id'] in spot_ids and start_utc <= linha['timestamp_utc'] <= end_utc]
+
+    monkeypatch.setattr(queries, 'acquire_db_connection', acquire_db_connection)
+    monkeypatch.setattr(queries, 'fetch_statement', fetch_statement)
+    tide_cache.clear()
+    try:
+        inicio, fim = HORA - datetime.timedelta(hours=2), HORA + datetime.timedelta(hours=20)
+        primeira = asyncio.run(queries.get_tides_forecast_for_spots_from_db([1, 2], inicio, fim))
+        assert len(consultas) == 1
+        # Dias inteiros são buscados, mas o resultado fica restrito à janela pedida.
+        assert primeira == {
+            1: {
+                HORA.date(): [TideExtreme(HORA, 'high', 1.4)],
+                HORA.date() + datetime.timedelta(days=1): [TideExtreme(linhas[2]['timestamp_utc'], 'low', 0.3)],
+            },
+            2: {},
+        }
+
+        segunda = asyncio.run(queries.get_tides_forecast_for_spots_from_db([1, 2], inicio, fim))
+        assert len(consultas) == 1
+        assert segunda == primeira
+        assert segunda[1][HORA.date()][0] is primeira[1][HORA.date()][0]
+    finally:
+        tide_cache.clear()
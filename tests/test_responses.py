@@ -0,0 +1,34 @@
+import datetime
+import decimal
+
+import numpy as np
+import orjson
+
+from src.api.responses import FastJSONResponse, ndjson_line
+
+def test_fast_json_response_serializa_arrays_numpy_e_decimal():
+    conteudo = {
+        "scores": np.array([1.5, 2.25, np.nan], dtype=np.float64),
+        "matriz": np.array([[1.0, 2.0], [3.0, 4.0]]),
+        "escalar": np.float64(3.5),
+        "altura": decimal.Decimal("1.25"),
+        "timestamp_utc": datetime.datetime(2026, 10, 17, 12, tzinfo=datetime.timezone.utc),
+    }
+    corpo = FastJSONResponse(content=conteudo).body
+    assert orjson.loads(corpo) == {
+        "scores": [1.5, 2.25, None],
+        "matriz": [[1.0, 2.0], [3.0, 4.0]],
+        "escalar": 3.5,
+        "altura": 1.25,
+        "timestamp_utc": "2026-10-17T12:00:00+00:00",
+    }
+
+def test_fast_json_response_serializa_array_float64_vazio_e_fatiado():
+    valores = np.arange(10, dtype=np.float64)
+    corpo = FastJSONResponse(content={"pares": valores[::2], "vazio": np.array([], dtype=np.float64)}).body
+    assert orjson.loads(corpo) == {"pares": [0.0, 2.0, 4.0, 6.0, 8.0], "vazio": []}
+
+def test_ndjson_line_termina_com_quebra_de_linha():
+    linha = ndjson_line({"valores": np.array([0.5]), "altura": decimal.Decimal("2")})
+    assert linha.endswith(b"\n")
+    assert orjson.loads(linha) == {"valores": [0.5], "altura": 2.0}
@@ -0,0 +1,56 @@
+import datetime
+from zoneinfo import ZoneInfoNotFoundError
+
+import pytest
+
+from src.utils.utils import spot_local_window
+
+UTC = datetime.timezone.utc
+INICIO = datetime.time(6, 0)
+FIM = datetime.time(9, 30)
+
+def _utc(*args):
+    return datetime.datetime(*args, tzinfo=UTC)
+
+def test_janela_no_horario_local():
+    data, inicio, fim = spot_local_window({'timezone': 'America/Sao_Paulo'}, 0, INICIO, FIM, _utc(2026, 10, 17, 12))
+    assert data == datetime.date(2026, 10, 17)
+    assert inicio == _utc(2026, 10, 17, 9)
+    # O fim inclui o minuto inteiro.
+    assert fim == _utc(2026, 10, 17, 12, 30, 59, 999999)
+
+def test_data_local_anterior_a_data_utc():
+    # 01h UTC ainda é o dia anterior em São Paulo (22h).
+    data, inicio, _ = spot_local_window({'timezone': 'America/Sao_Paulo'}, 0, INICIO, FIM, _utc(2026, 10, 17, 1))
+    assert data == datetime.date(2026, 10, 16)
+    assert inicio == _utc(2026, 10, 16, 9)
+
+def test_data_local_posterior_a_data_utc():
+    # 12h UTC já é o dia seguinte em Auckland (01h, NZDT +13).
+    data, inicio, fim = spot_local_window({'timezone': 'Pacific/Auckland'}, 1, INICIO, FIM, _utc(2026, 10, 17, 12))
+    assert data == datetime.date(2026, 10, 19)
+    assert inicio == _utc(2026, 10, 18, 17)
+    assert fim == _utc(2026, 10, 18, 20, 30, 59, 999999)
+
+def test_janela_no_dia_da_mudanca_de_horario():
+    # Lisboa volta para WET (+00) às 02h locais de 25/10/2026: o dia tem 25 horas.
+    data, inicio, fim = spot_local_window(
+        {'timezone': 'Europe/Lisbon'}, 0, datetime.time(0, 0), datetime.time(23, 59), _utc(2026, 10, 25, 12)
+    )
+    assert data == datetime.date(2026, 10, 25)
+    assert inicio == _utc(2026, 10, 24, 23)
+    assert fim == _utc(2026, 10, 25, 23, 59, 59, 999999)
+
+def test_offset_de_dias_e_fuso_com_minutos():
+    data, inicio, _ = spot_local_window({'timezone': 'Asia/Kathmandu'}, 3, INICIO, FIM, _utc(2026, 10, 17, 20))
+    assert data == datetime.date(2026, 10, 21)
+    assert inicio == _utc(2026, 10, 21, 0, 15)
+
+def test_fuso_padrao_sem_timezone():
+    assert spot_local_window({'timezone': None}, 0, INICIO, FIM, _utc(2026, 10, 17, 1)) == \
+        spot_local_window({'timezone': 'America/Sao_Paulo'}, 0, INICIO, FIM, _utc(2026, 10, 17, 1))
+    assert spot_local_window({}, 0, INICIO, FIM, _utc(2026, 10, 17, 1))[0] == datetime.date(2026, 10, 16)
+
+def test_fuso_invalido():
+    with pytest.raises(ZoneInfoNotFoundError):
+        spot_local_window({'timezone': 'Marte/Olympus'}, 0, INICIO, FIM, _utc(2026, 10, 17, 12))
@@ -0,0 +1,160 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.forecast import stormglass_client
+from src.forecast.stormglass_client import StormGlassClient, TokenBucket
+
+URL = "https://stub.stormglass.local/v2/weather/point"
+
+class RelogioFalso:
+    """Substitui time.monotonic e asyncio.sleep do módulo: as esperas avançam o relógio sem bloquear."""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def monotonic(self):
+        return self.agora
+
+    async def sleep(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(stormglass_client.time, 'monotonic', relogio.monotonic)
+    monkeypatch.setattr(stormglass_client.asyncio, 'sleep', relogio.sleep)
+    # Jitter fixo: o backoff fica exatamente backoff_seconds * 2 ** tentativa.
+    monkeypatch.setattr(stormglass_client.random, 'random', lambda: 1.0)
+    return relogio
+
+def _respostas(*respostas):
+    """Handler do MockTransport que devolve `respostas` em ordem e registra as requisições."""
+    requisicoes = []
+    fila = list(respostas)
+
+    def handler(request):
+        requisicoes.append(request)
+        resposta = fila.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+    return handler, requisicoes
+
+def _get_json(handler, **kwargs):
+    async def executar():
+        kwargs.setdefault('rate_per_second', 1000)
+        kwargs.setdefault('rate_burst', 1000)
+        async with StormGlassClient(api_key='chave', transport=httpx.MockTransport(handler), **kwargs) as client:
+            return await client.get_json(URL, {'lat': 1}, 'teste')
+    return asyncio.run(executar())
+
+def test_sucesso_sem_novas_tentativas(relogio):
+    handler, requisicoes = _respostas(httpx.Response(200, json={'hours': []}))
+    assert _get_json(handler) == {'hours': []}
+    assert len(requisicoes) == 1
+    assert requisicoes[0].headers['Authorization'] == 'chave'
+    assert relogio.esperas == []
+
+def test_429_respeita_retry_after(relogio):
+    handler, requisicoes = _respostas(
+        httpx.Response(429, headers={'Retry-After': '7'}),
+        httpx.Response(429, headers={'Retry-After': '2.5'}),
+        httpx.Response(200, json={'ok': True}),
+    )
+    assert _get_json(handler, backoff_seconds=1.0) == {'ok': True}
+    assert len(requisicoes) == 3
+    assert relogio.esperas == [7.0, 2.5]
+
+def test_retry_after_invalido_usa_backoff_exponencial(relogio):
+    handler, _ = _respostas(
+        httpx.Response(429, headers={'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}),
+        httpx.Response(200, json={}),
+    )
+    assert _get_json(handler, backoff_seconds=1.5) == {}
+    assert relogio.esperas == [1.5]
+
+def test_5xx_esgota_as_tentativas_com_backoff_exponencial(relogio):
+    handler, requisicoes = _respostas(*[httpx.Response(503) for _ in range(4)])
+    assert _get_json(handler, max_retries=3, backoff_seconds=1.0) is None
+    assert len(requisicoes) == 4
+    assert relogio.esperas == [1.0, 2.0, 4.0]
+
+def test_erro_de_rede_e_repetido(relogio):
+    handler, requisicoes = _respostas(
+        httpx.ConnectError("conexão recusada"),
+        httpx.Response(502),
+        httpx.Response(200, json={'ok': 1}),
+    )
+    assert _get_json(handler, backoff_seconds=0.5) == {'ok': 1}
+    assert len(requisicoes) == 3
+    assert relogio.esperas == [0.5, 1.0]
+
+def test_erro_do_cliente_nao_e_repetido(relogio):
+    handler, requisicoes = _respostas(httpx.Response(404), httpx.Response(200, json={}))
+    assert _get_json(handler) is None
+    assert len(requisicoes) == 1
+    assert relogio.esperas == []
+
+def test_token_bucket_limita_a_taxa(relogio):
+    bucket = TokenBucket(rate_per_second=2, capacity=3)
+    instantes = []
+
+    async def consumir():
+        for _ in range(9):
+            await bucket.acquire()
+            instantes.append(relogio.agora)
+    asyncio.run(consumir())
+
+    # As 3 primeiras usam a capacidade inicial; as demais saem a 2 por segundo.
+    assert instantes[:3] == [0.0, 0.0, 0.0]
+    for i, instante in enumerate(instantes):
+        assert instante >= (i - 3 + 1) / 2 - 1e-9
+    assert instantes[-1] == pytest.approx(3.0)
+
+def test_cliente_respeita_o_limite_de_taxa(relogio):
+    instantes = []
+
+    def handler(request):
+        instantes.append(relogio.agora)
+        return httpx.Response(200, json={})
+
+    async def executar():
+        async with StormGlassClient(
+            api_key='chave', transport=httpx.MockTransport(handler), rate_per_second=4, rate_burst=2
+        ) as client:
+            await asyncio.gather(*(client.get_json(URL, {}, 'teste') for _ in range(10)))
+    asyncio.run(executar())
+
+    assert len(instantes) == 10
+    # Em qualquer intervalo de t segundos saem no máximo burst + t * taxa requisições.
+    for i in range(len(instantes)):
+        for j in range(i + 1, len(instantes)):
+            assert j - i + 1 <= 2 + (instantes[j] - instantes[i]) * 4 + 1e-9
+    assert instantes[-1] == pytest.approx((10 - 2) / 4)
+
+def test_semaforo_limita_requisicoes_simultaneas():
+    em_andamento = 0
+    pico = 0
+
+    async def handler(request):
+        nonlocal em_andamento, pico
+        em_andamento += 1
+        pico = max(pico, em_andamento)
+        await asyncio.sleep(0.01)
+        em_andamento -= 1
+        return httpx.Response(200, json={})
+
+    async def executar():
+        async with StormGlassClient(
+            api_key='chave', transport=httpx.MockTransport(handler),
+            max_concurrency=3, rate_per_second=1000, rate_burst=1000
+        ) as client:
+            return await asyncio.gather(*(client.get_json(URL, {}, 'teste') for _ in range(12)))
+    resultados = asyncio.run(executar())
+
+    assert resultados == [{}] * 12
+    assert pico == 3
@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import datetime
+
+import pytest
+
+from src.db import queries
+from src.db.cache import tide_cache
+
+UTC = datetime.timezone.utc
+SPOT_ID = 1
+
+class ConexaoFalsa:
+    """
+    Conexão asyncpg mínima para tides_forecast: transações aninhadas (savepoints) desfazem
+    as próprias alterações em caso de erro, como no Postgres.
+    """
+
+    def __init__(self, linhas, falhar_copy=True, falhar_delete=False):
+        # {(spot_id, timestamp_utc, tide_type): height}
+        self.linhas = dict(linhas)
+        self.falhar_copy = falhar_copy
+        self.falhar_delete = falhar_delete
+        self.profundidade = 0
+        self.comandos = []
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        copia = dict(self.linhas)
+        self.profundidade += 1
+        try:
+            yield
+        except BaseException:
+            self.linhas = copia
+            raise
+        finally:
+            self.profundidade -= 1
+
+    async def execute(self, sql, *args):
+        comando = 'INSERT VALUES' if 'VALUES' in sql else sql.split()[0]
+        self.comandos.append((comando, self.profundidade))
+        if comando == 'DELETE':
+            if self.falhar_delete:
+                raise RuntimeError("conexão perdida")
+            spot_id, inicio, fim = args
+            self.linhas = {chave: altura for chave, altura in self.linhas.items() if not (chave[0] == spot_id and inicio <= chave[1] <= fim)}
+        elif comando == 'INSERT VALUES':
+            spot_id, timestamp_utc, tide_type, height = args
+            if not isinstance(height, (int, float)):
+                raise ValueError(f"invalid input for height: {height!r}")
+            self.linhas[(spot_id, timestamp_utc, tide_type)] = height
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.comandos.append(('COPY', self.profundidade))
+        if self.falhar_copy:
+            raise RuntimeError("COPY falhou")
+
+@pytest.fixture
+def conexao(monkeypatch):
+    conexoes = []
+
+    @contextlib.asynccontextmanager
+    async def acquire_db_connection(query_name):
+        yield conexoes[0]
+
+    monkeypatch.setattr(queries, 'acquire_db_connection', acquire_db_connection)
+    return conexoes
+
+def _horario(hora):
+    return datetime.datetime(2026, 10, 17, hora, tzinfo=UTC)
+
+LINHAS_ANTIGAS = {
+    (SPOT_ID, _horario(2), 'low'): 0.1,
+    (SPOT_ID, _horario(8), 'high'): 1.5,
+    (SPOT_ID, _horario(23), 'low'): 0.2,   # fora da janela nova
+    (2, _horario(8), 'high'): 1.1,         # outro spot
+}
+
+EXTREMOS = [
+    {'time': _horario(3).isoformat(), 'type': 'low', 'height': 0.3},
+    {'time': _horario(9).isoformat(), 'type': 'high', 'height': 'inválido'},
+    {'time': _horario(15).isoformat(), 'type': 'low', 'height': 0.4},
+]
+
+def test_fallback_pula_linhas_invalidas_dentro_da_transacao(conexao):
+    conexao.append(ConexaoFalsa(LINHAS_ANTIGAS))
+    geracao = tide_cache.generation
+    asyncio.run(queries.insert_extreme_tides_data(SPOT_ID, EXTREMOS))
+
+    conn = conexao[0]
+    # A janela nova vai das 3h às 15h: o extremo das 8h sai, os das 2h e 23h ficam.
+    assert conn.linhas == {
+        (SPOT_ID, _horario(2), 'low'): 0.1,
+        (SPOT_ID, _horario(3), 'low'): 0.3,
+        (SPOT_ID, _horario(15), 'low'): 0.4,
+        (SPOT_ID, _horario(23), 'low'): 0.2,
+        (2, _horario(8), 'high'): 1.1,
+    }
+    # O delete do fallback roda na transação externa e cada linha em um savepoint dentro dela.
+    fallback = conn.comandos[[comando for comando, _ in conn.comandos].index('COPY') + 1:]
+    assert fallback[0] == ('DELETE', 1)
+    assert [comando for comando in fallback if comando[0] == 'INSERT VALUES'] == [('INSERT VALUES', 2)] * 3
+    # O NOTIFY vai depois do commit.
+    assert fallback[-1] == ('SELECT', 0)
+    assert tide_cache.generation > geracao
+
+def test_erro_fora_das_linhas_mantem_os_extremos_antigos(conexao):
+    conexao.append(ConexaoFalsa(LINHAS_ANTIGAS, falhar_delete=True))
+    geracao = tide_cache.generation
+    with pytest.raises(RuntimeError):
+        asyncio.run(queries.insert_extreme_tides_data(SPOT_ID, EXTREMOS))
+    assert conexao[0].linhas == LINHAS_ANTIGAS
+    assert tide_cache.generation > geracao
+
+def test_caminho_em_lote_nao_usa_o_fallback(conexao):
+    conexao.append(ConexaoFalsa(LINHAS_ANTIGAS, falhar_copy=False))
+    asyncio.run(queries.insert_extreme_tides_data(SPOT_ID, EXTREMOS))
+    comandos = [comando for comando, _ in conexao[0].comandos]
+    assert comandos.count('DELETE') == 1 and 'COPY' in comandos
+    assert 'INSERT VALUES' not in comandos
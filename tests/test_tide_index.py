@@ -0,0 +1,127 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from src.db.records import TideExtreme
+from src.utils.tide_index import TideIndex
+from src.utils.utils import determine_tide_phase
+
+# Paridade do TideIndex com a busca linear anterior de determine_tide_phase,
+# copiada abaixo como referência (adaptada de dicts para TideExtreme).
+
+UTC = datetime.timezone.utc
+DIA = datetime.datetime(2026, 10, 17, tzinfo=UTC)
+
+def _fase_linear(current_timestamp, tides_extremes):
+    if not tides_extremes:
+        return 'unknown'
+
+    if current_timestamp.tzinfo is None:
+        current_timestamp = current_timestamp.replace(tzinfo=datetime.timezone.utc)
+    else:
+        current_timestamp = current_timestamp.astimezone(datetime.timezone.utc)
+
+    sorted_extremes = sorted(tides_extremes, key=lambda x: x.timestamp_utc)
+
+    previous_extreme = None
+    next_extreme = None
+    for extreme in sorted_extremes:
+        if extreme.timestamp_utc <= current_timestamp:
+            previous_extreme = extreme
+        elif extreme.timestamp_utc > current_timestamp:
+            next_extreme = extreme
+            break
+
+    if previous_extreme is None and next_extreme is None:
+        return 'unknown'
+    if previous_extreme and current_timestamp == previous_extreme.timestamp_utc:
+        return previous_extreme.tide_type
+    if next_extreme and current_timestamp == next_extreme.timestamp_utc:
+        return next_extreme.tide_type
+    if previous_extreme and not next_extreme:
+        return f"after_{previous_extreme.tide_type}"
+    if not previous_extreme and next_extreme:
+        return f"before_{next_extreme.tide_type}"
+    if previous_extreme and next_extreme:
+        if previous_extreme.tide_type == 'low' and next_extreme.tide_type == 'high':
+            return 'rising'
+        elif previous_extreme.tide_type == 'high' and next_extreme.tide_type == 'low':
+            return 'falling'
+    return 'unknown'
+
+def _extremo(hora, minuto, tipo, altura=1.0):
+    return TideExtreme(DIA + datetime.timedelta(hours=hora, minutes=minuto), tipo, altura)
+
+EXTREMOS = [
+    _extremo(2, 10, 'low', 0.2),
+    _extremo(8, 25, 'high', 1.4),
+    _extremo(14, 40, 'low', 0.3),
+    _extremo(20, 55, 'high', 1.2),
+]
+
+def _horarios():
+    # Cada 15 minutos de um dia e meio, mais os horários exatos dos extremos e vizinhos de 1 µs.
+    horarios = [DIA - datetime.timedelta(hours=6) + datetime.timedelta(minutes=15 * i) for i in range(4 * 36)]
+    for extremo in EXTREMOS:
+        for delta in (-1, 0, 1):
+            horarios.append(extremo.timestamp_utc + datetime.timedelta(microseconds=delta))
+    return horarios
+
+def _comparar(extremos, horarios):
+    obtido = TideIndex(extremos).phases(horarios)
+    esperado = [_fase_linear(horario, extremos) for horario in horarios]
+    assert obtido.tolist() == esperado
+    # determine_tide_phase (um horário por vez) usa o mesmo índice.
+    assert [determine_tide_phase(horario, extremos) for horario in horarios] == esperado
+
+def test_fases_iguais_a_busca_linear():
+    _comparar(EXTREMOS, _horarios())
+
+def test_extremos_fora_de_ordem():
+    _comparar(list(reversed(EXTREMOS)), _horarios())
+
+def test_exatamente_em_um_extremo():
+    indice = TideIndex(EXTREMOS)
+    assert indice.phases([extremo.timestamp_utc for extremo in EXTREMOS]).tolist() == ['low', 'high', 'low', 'high']
+    assert indice.phase(EXTREMOS[1].timestamp_utc - datetime.timedelta(microseconds=1)) == 'rising'
+    assert indice.phase(EXTREMOS[1].timestamp_utc + datetime.timedelta(microseconds=1)) == 'falling'
+
+def test_antes_do_primeiro_e_depois_do_ultimo():
+    indice = TideIndex(EXTREMOS)
+    assert indice.phase(DIA) == 'before_low'
+    assert indice.phase(DIA + datetime.timedelta(hours=23)) == 'after_high'
+    _comparar(EXTREMOS, [DIA, DIA + datetime.timedelta(hours=23)])
+
+def test_lista_vazia():
+    _comparar([], _horarios())
+    _comparar(None, [DIA])
+    assert TideIndex([]).phases([]).tolist() == []
+
+def test_um_unico_extremo():
+    _comparar([EXTREMOS[0]], _horarios())
+
+def test_extremos_consecutivos_do_mesmo_tipo():
+    extremos = [_extremo(2, 0, 'low'), _extremo(8, 0, 'low'), _extremo(14, 0, 'high'), _extremo(20, 0, 'high')]
+    _comparar(extremos, _horarios())
+    assert TideIndex(extremos).phase(DIA + datetime.timedelta(hours=5)) == 'unknown'
+
+def test_extremos_com_o_mesmo_horario():
+    # Empate: a ordenação estável mantém a ordem de entrada, como o sorted() da busca linear.
+    extremos = [_extremo(2, 0, 'low'), _extremo(8, 0, 'high'), _extremo(8, 0, 'low'), _extremo(14, 0, 'high')]
+    _comparar(extremos, _horarios() + [DIA + datetime.timedelta(hours=8)])
+
+@pytest.mark.parametrize("fuso", [
+    datetime.timezone(datetime.timedelta(hours=-3)),
+    datetime.timezone(datetime.timedelta(hours=5, minutes=45)),
+])
+def test_horarios_em_outro_fuso(fuso):
+    _comparar(EXTREMOS, [horario.astimezone(fuso) for horario in _horarios()])
+
+def test_horarios_sem_fuso_sao_tratados_como_utc():
+    horarios = [horario.replace(tzinfo=None) for horario in _horarios()]
+    _comparar(EXTREMOS, horarios)
+
+def test_phases_at_com_microssegundos():
+    indice = TideIndex(EXTREMOS)
+    assert np.array_equal(indice.phases_at(indice.times), np.array(['low', 'high', 'low', 'high'], dtype=object))
@@ -0,0 +1,132 @@
+import datetime
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import forecast_routes
+from src.db.cache import tide_cache, tide_model_cache
+from src.db.records import TideExtreme
+from src.utils.tide_model import TideModel, get_tide_model, time_grid
+
+UTC = datetime.timezone.utc
+HOJE = datetime.datetime.now(UTC).date()
+
+def _extremo(dia, hora, minuto, tipo, altura):
+    return TideExtreme(datetime.datetime.combine(dia, datetime.time(hora, minuto), tzinfo=UTC), tipo, altura)
+
+def _extremos_do_dia(dia):
+    return [
+        _extremo(dia, 2, 0, 'low', 0.2),
+        _extremo(dia, 8, 10, 'high', 1.4),
+        _extremo(dia, 14, 20, 'low', 0.3),
+        _extremo(dia, 20, 30, 'high', 1.2),
+    ]
+
+@pytest.fixture(autouse=True)
+def limpar_caches():
+    tide_cache.clear()
+    tide_model_cache.clear()
+    yield
+    tide_cache.clear()
+    tide_model_cache.clear()
+
+def test_altura_nos_extremos_e_no_meio_do_intervalo():
+    extremos = _extremos_do_dia(HOJE)
+    modelo = TideModel(extremos)
+    alturas, fases = modelo.evaluate([extremo.timestamp_utc for extremo in extremos])
+    np.testing.assert_allclose(alturas, [0.2, 1.4, 0.3, 1.2])
+    assert fases.tolist() == ['low', 'high', 'low', 'high']
+
+    meio = extremos[0].timestamp_utc + (extremos[1].timestamp_utc - extremos[0].timestamp_utc) / 2
+    alturas, fases = modelo.evaluate([meio])
+    assert alturas[0] == pytest.approx((0.2 + 1.4) / 2)
+    assert fases[0] == 'rising'
+
+def test_curva_monotona_entre_baixa_e_alta():
+    extremos = _extremos_do_dia(HOJE)
+    grade = time_grid(extremos[0].timestamp_utc, extremos[1].timestamp_utc, datetime.timedelta(minutes=15))
+    alturas, _ = TideModel(extremos).evaluate(grade)
+    assert np.all(np.diff(alturas) > 0)
+
+def test_altura_nan_fora_dos_extremos_e_entre_extremos_do_mesmo_tipo():
+    extremos = [
+        _extremo(HOJE, 2, 0, 'low', 0.2),
+        _extremo(HOJE, 8, 0, 'low', 0.3),
+        _extremo(HOJE, 14, 0, 'high', 1.3),
+    ]
+    alturas, fases = TideModel(extremos).evaluate([
+        datetime.datetime.combine(HOJE, datetime.time(1, 0), tzinfo=UTC),
+        datetime.datetime.combine(HOJE, datetime.time(5, 0), tzinfo=UTC),
+        datetime.datetime.combine(HOJE, datetime.time(11, 0), tzinfo=UTC),
+        datetime.datetime.combine(HOJE, datetime.time(15, 0), tzinfo=UTC),
+    ])
+    assert np.isnan(alturas[0]) and np.isnan(alturas[1]) and np.isnan(alturas[3])
+    assert alturas[2] == pytest.approx(0.8)
+    assert fases.tolist() == ['before_low', 'unknown', 'rising', 'after_high']
+
+def test_time_grid_de_15_minutos():
+    inicio = datetime.datetime.combine(HOJE, datetime.time.min, tzinfo=UTC)
+    grade = time_grid(inicio, inicio + datetime.timedelta(hours=1))
+    assert grade == [inicio + datetime.timedelta(minutes=15 * i) for i in range(5)]
+
+def test_get_tide_model_reutiliza_o_modelo_ate_tide_cache_ser_invalidado():
+    tides_by_day = {HOJE: _extremos_do_dia(HOJE)}
+    modelo = get_tide_model(1, HOJE, tides_by_day, tide_cache.generation)
+    assert get_tide_model(1, HOJE, tides_by_day, tide_cache.generation) is modelo
+
+    tide_cache.invalidate_spot(1)
+    assert get_tide_model(1, HOJE, tides_by_day, tide_cache.generation) is not modelo
+
+def test_get_tide_model_nao_guarda_modelo_de_extremos_invalidados_durante_a_busca():
+    geracao = tide_cache.generation
+    tide_cache.invalidate_spot(1)
+    get_tide_model(1, HOJE, {HOJE: _extremos_do_dia(HOJE)}, geracao)
+    assert len(tide_model_cache) == 0
+
+def test_get_tide_model_usa_os_extremos_dos_dias_vizinhos():
+    ontem, amanha = HOJE - datetime.timedelta(days=1), HOJE + datetime.timedelta(days=1)
+    tides_by_day = {dia: _extremos_do_dia(dia) for dia in (ontem, HOJE, amanha)}
+    meia_noite = datetime.datetime.combine(HOJE, datetime.time.min, tzinfo=UTC)
+    alturas, fases = get_tide_model(1, HOJE, tides_by_day, tide_cache.generation).evaluate([meia_noite])
+    assert not np.isnan(alturas[0])
+    assert fases[0] == 'falling'
+
+@pytest.fixture
+def cliente(monkeypatch):
+    async def get_spots_by_ids(spot_ids):
+        return {1: {'spot_id': 1, 'spot_name': 'Spot 1', 'timezone': 'America/Sao_Paulo'}}
+
+    async def get_tides_forecast_for_spots_from_db(spot_ids, start_utc, end_utc):
+        dias = [HOJE + datetime.timedelta(days=offset) for offset in range(-1, 3)]
+        return {1: {dia: _extremos_do_dia(dia) for dia in dias}}
+
+    monkeypatch.setattr(forecast_routes, 'get_spots_by_ids', get_spots_by_ids)
+    monkeypatch.setattr(forecast_routes, 'get_tides_forecast_for_spots_from_db', get_tides_forecast_for_spots_from_db)
+    app = FastAPI()
+    app.include_router(forecast_routes.router)
+    return TestClient(app)
+
+def test_endpoint_de_curva_de_mare(cliente):
+    resposta = cliente.post('/forecasts/tides', json={'spot_ids': [1], 'day_offset': [0, 1]})
+    assert resposta.status_code == 200
+    curvas = resposta.json()
+    assert [curva['date'] for curva in curvas] == [HOJE.isoformat(), (HOJE + datetime.timedelta(days=1)).isoformat()]
+    pontos = curvas[0]['points']
+    assert len(pontos) == 24 * 4
+    assert all(ponto['tide_height'] is not None for ponto in pontos)
+    ponto_das_2h = pontos[2 * 4]
+    assert ponto_das_2h['tide_phase'] == 'low'
+    assert ponto_das_2h['tide_height'] == pytest.approx(0.2)
+
+def test_endpoint_de_curva_de_mare_com_erros(cliente):
+    resposta = cliente.post('/forecasts/tides', json={'spot_ids': [1, 9], 'day_offset': [0, 5], 'step_minutes': 30})
+    assert resposta.status_code == 207
+    corpo = resposta.json()
+    assert len(corpo['data']) == 1 and len(corpo['data'][0]['points']) == 48
+    assert len(corpo['errors']) == 3
+
+def test_endpoint_de_curva_de_mare_valida_step_minutes(cliente):
+    resposta = cliente.post('/forecasts/tides', json={'spot_ids': [1], 'day_offset': [0], 'step_minutes': 0})
+    assert resposta.status_code == 400
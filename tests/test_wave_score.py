@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+from src.recommendation.wave_score import (
+    calcular_impacto_swell_secundario,
+    calcular_score_direcao_onda,
+    calcular_score_onda,
+    calcular_score_periodo_onda,
+    calcular_score_tamanho_onda,
+)
+
+# Paridade da versão vetorizada de calcular_score_onda / calcular_impacto_swell_secundario
+# com a implementação escalar anterior (copiada abaixo como referência), com tolerância de 0.01.
+
+TOLERANCIA = 0.01
+
+def _impacto_swell_secundario_escalar(
+    sec_tamanho, sec_periodo, sec_direcao, onda_tamanho, onda_periodo, onda_direcao
+):
+    diferenca_direcao = np.abs(sec_direcao - onda_direcao)
+    diferenca_direcao = min(diferenca_direcao, 360 - diferenca_direcao)
+    if diferenca_direcao > 90:
+        score_direcao = -1.0
+    else:
+        score_direcao = np.cos(np.deg2rad(diferenca_direcao))
+
+    if onda_tamanho == 0:
+        return 0
+    ratio_tamanho = sec_tamanho / onda_tamanho
+    score_tamanho = np.exp(-((ratio_tamanho - 0.45)**2) / (0.5**2))
+    if ratio_tamanho > 1.2:
+        score_tamanho *= -1 * (ratio_tamanho - 1.2)
+
+    if onda_periodo == 0:
+        return 0
+    ratio_periodo = sec_periodo / onda_periodo
+    score_periodo = np.exp(-((ratio_periodo - 1.0)**2) / (0.8**2))
+
+    impacto_final = (score_direcao * 0.60) + (score_tamanho * 0.20) + (score_periodo * 0.20)
+    return np.clip(impacto_final, -1.0, 1.0)
+
+def _score_onda_escalar(
+    tamanho, direcao, periodo,
+    tamanho_minimo, tamanho_ideal, tamanho_maximo, direcao_ideal, periodo_ideal,
+    sec_tamanho=0, sec_direcao=0, sec_periodo=0
+):
+    score_tamanho = calcular_score_tamanho_onda(tamanho, tamanho_minimo, tamanho_ideal, tamanho_maximo)
+    if score_tamanho < 0:
+        return score_tamanho
+    score_direcao = calcular_score_direcao_onda(direcao, direcao_ideal)
+    score_periodo = calcular_score_periodo_onda(periodo, periodo_ideal)
+    score_base = (score_tamanho * 0.50) + (score_periodo * 0.30) + (score_direcao * 0.20)
+
+    score_final = score_base
+    if sec_tamanho > 0 and sec_periodo > 0:
+        impacto = _impacto_swell_secundario_escalar(sec_tamanho, sec_periodo, sec_direcao, tamanho, periodo, direcao)
+        modificador = impacto * 0.10 if impacto > 0 else impacto * 0.20
+        score_final = score_base * (1 + modificador)
+    return np.round(np.clip(score_final, -100, 100), 2)
+
+# (mínimo, ideal, máximo, direção ideal, período ideal)
+PREFERENCIAS = [
+    (0.5, 1.5, 2.5, 180.0, 10.0),
+    (1.0, 2.0, 3.0, 350.0, 12.0),
+    (0.3, 0.8, 1.2, 5.0, 8.0),
+    (1.0, 2.0, 2.0, 90.0, 0.0),
+]
+
+def _esperado_onda(entradas, preferencias):
+    return np.array([_score_onda_escalar(*linha[:3], *preferencias, *linha[3:]) for linha in zip(*entradas)], dtype=float)
+
+def _esperado_impacto(entradas):
+    return np.array([_impacto_swell_secundario_escalar(*linha) for linha in zip(*entradas)], dtype=float)
+
+def _entradas_aleatorias(rng, n):
+    return [
+        rng.uniform(0, 4, n),       # tamanho
+        rng.uniform(0, 360, n),     # direção
+        rng.uniform(0, 18, n),      # período
+        rng.uniform(0, 3, n),       # tamanho do secundário
+        rng.uniform(0, 360, n),     # direção do secundário
+        rng.uniform(0, 18, n),      # período do secundário
+    ]
+
+@pytest.mark.parametrize("preferencias", PREFERENCIAS)
+def test_score_onda_aleatorio(preferencias):
+    rng = np.random.default_rng(42)
+    tamanho, direcao, periodo, sec_tamanho, sec_direcao, sec_periodo = _entradas_aleatorias(rng, 3000)
+    # Parte das horas sem swell secundário.
+    sem_secundario = rng.random(3000) < 0.3
+    sec_tamanho[sem_secundario] = 0
+    sec_periodo[sem_secundario] = 0
+    entradas = [tamanho, direcao, periodo, sec_tamanho, sec_direcao, sec_periodo]
+
+    obtido = calcular_score_onda(tamanho, direcao, periodo, *preferencias, sec_tamanho, sec_direcao, sec_periodo)
+    esperado = _esperado_onda(entradas, preferencias)
+    # O teste só vale se houver scores de tamanho positivos e negativos misturados.
+    assert (esperado < 0).any() and (esperado > 0).any()
+    np.testing.assert_allclose(obtido, esperado, atol=TOLERANCIA, rtol=0)
+
+def test_impacto_swell_secundario_aleatorio():
+    rng = np.random.default_rng(7)
+    tamanho, direcao, periodo, sec_tamanho, sec_direcao, sec_periodo = _entradas_aleatorias(rng, 3000)
+    entradas = [sec_tamanho, sec_periodo, sec_direcao, tamanho, periodo, direcao]
+    obtido = calcular_impacto_swell_secundario(*entradas)
+    np.testing.assert_allclose(obtido, _esperado_impacto(entradas), atol=TOLERANCIA, rtol=0)
+
+def test_impacto_swell_secundario_sem_swell_principal():
+    # Tamanho ou período zero no swell principal: impacto zero, sem divisão por zero.
+    entradas = [
+        np.array([1.0, 1.0, 0.0, 1.0]),     # tamanho do secundário
+        np.array([10.0, 10.0, 10.0, 0.0]),  # período do secundário
+        np.array([180.0, 90.0, 0.0, 45.0]), # direção do secundário
+        np.array([0.0, 1.5, 0.0, 2.0]),     # tamanho
+        np.array([12.0, 0.0, 0.0, 12.0]),   # período
+        np.array([180.0, 90.0, 0.0, 45.0]), # direção
+    ]
+    obtido = calcular_impacto_swell_secundario(*entradas)
+    np.testing.assert_allclose(obtido, _esperado_impacto(entradas), atol=TOLERANCIA, rtol=0)
+    assert obtido[0] == 0 and obtido[1] == 0 and obtido[2] == 0
+
+@pytest.mark.parametrize("sec_direcao, direcao", [
+    (359.0, 1.0), (1.0, 359.0), (0.0, 360.0), (360.0, 0.0), (350.0, 80.0), (270.0, 0.0), (10.0, 190.0),
+])
+def test_impacto_swell_secundario_angulo_cruzando_360(sec_direcao, direcao):
+    entradas = [np.array([0.6]), np.array([9.0]), np.array([sec_direcao]), np.array([1.5]), np.array([11.0]), np.array([direcao])]
+    np.testing.assert_allclose(
+        calcular_impacto_swell_secundario(*entradas), _esperado_impacto(entradas), atol=TOLERANCIA, rtol=0
+    )
+
+@pytest.mark.parametrize("preferencias", PREFERENCIAS)
+def test_score_onda_casos_de_borda(preferencias):
+    nan = np.nan
+    # (tamanho, direção, período, tamanho sec., direção sec., período sec.)
+    casos = [
+        (1.5, 180.0, 0.0, 0.5, 180.0, 8.0),    # período zero no principal
+        (1.5, 180.0, 10.0, 0.5, 180.0, 0.0),   # período zero no secundário
+        (1.5, 180.0, nan, 0.5, 180.0, 8.0),    # período NaN no principal
+        (1.5, 180.0, 10.0, 0.5, 180.0, nan),   # período NaN no secundário
+        (0.0, 180.0, 10.0, 0.5, 180.0, 8.0),   # sem onda
+        (1.5, 359.0, 10.0, 0.5, 1.0, 8.0),     # direções dos dois lados de 0/360
+        (1.5, 0.0, 10.0, 0.5, 360.0, 8.0),
+        (1.5, 355.0, 10.0, 0.5, 175.0, 8.0),   # swell oposto
+        (1.5, 180.0, 10.0, 0.0, 0.0, 0.0),     # sem swell secundário
+        (5.0, 180.0, 10.0, 4.0, 180.0, 10.0),  # tamanho acima do máximo (score negativo)
+        (0.1, 180.0, 10.0, 0.1, 180.0, 10.0),  # tamanho abaixo do mínimo (score negativo)
+        (1.5, 180.0, 10.0, 3.0, 90.0, 15.0),   # secundário maior que o principal
+    ]
+    entradas = [np.array(coluna, dtype=float) for coluna in zip(*casos)]
+    obtido = calcular_score_onda(*entradas[:3], *preferencias, *entradas[3:])
+    esperado = _esperado_onda(entradas, preferencias)
+    np.testing.assert_allclose(obtido, esperado, atol=TOLERANCIA, rtol=0, equal_nan=True)
+
+def test_score_onda_sem_swell_secundario_por_padrao():
+    # Sem os parâmetros do secundário, nenhum impacto é aplicado.
+    tamanho = np.array([0.2, 1.0, 1.5, 2.4, 3.5])
+    direcao = np.array([0.0, 90.0, 180.0, 270.0, 359.9])
+    periodo = np.array([6.0, 8.0, 10.0, 0.0, 14.0])
+    obtido = calcular_score_onda(tamanho, direcao, periodo, 0.5, 1.5, 2.5, 180.0, 10.0)
+    esperado = [_score_onda_escalar(*linha, 0.5, 1.5, 2.5, 180.0, 10.0) for linha in zip(tamanho, direcao, periodo)]
+    np.testing.assert_allclose(obtido, np.array(esperado, dtype=float), atol=TOLERANCIA, rtol=0)
+
+def test_score_onda_escalar_continua_funcionando():
+    obtido = calcular_score_onda(1.5, 180.0, 10.0, 0.5, 1.5, 2.5, 180.0, 10.0, 0.5, 170.0, 9.0)
+    esperado = _score_onda_escalar(1.5, 180.0, 10.0, 0.5, 1.5, 2.5, 180.0, 10.0, 0.5, 170.0, 9.0)
+    assert np.ndim(obtido) == 0
+    assert abs(float(obtido) - float(esperado)) <= TOLERANCIA